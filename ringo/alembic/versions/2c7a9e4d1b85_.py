@@ -0,0 +1,67 @@
+"""Add search document to the tables of searchable moduls
+
+The names of the tables of the moduls using the Searchable mixin must be
+passed in as comma separated list in the "searchable" argument::
+
+    ringo-admin db upgrade --searchable foo,bar
+    alembic -x searchable=foo,bar upgrade head
+
+The search documents of existing items are not built by the migration.
+Run "ringo-admin db rebuildsearch <modul>" for every modul afterwards.
+Until then existing items are only found by searching the columns one by
+one.
+
+Revision ID: 2c7a9e4d1b85
+Revises: 5d1e6b8f0c3a
+Create Date: 2026-10-18 21:42:37.118203
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '2c7a9e4d1b85'
+down_revision = '5d1e6b8f0c3a'
+
+import sqlalchemy as sa
+from alembic import op, context
+
+
+def _get_searchable_tables():
+    """Returns the names of the tables passed in the "searchable"
+    argument."""
+    tables = context.get_x_argument(as_dictionary=True).get("searchable")
+    return [table.strip() for table in (tables or "").split(",")
+            if table.strip()]
+
+
+def upgrade():
+    conn = op.get_bind()
+    postgres = conn.dialect.name == "postgresql"
+    tables = _get_searchable_tables()
+    if postgres and tables:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    inspector = sa.inspect(conn)
+    for table in tables:
+        columns = [col['name'] for col in inspector.get_columns(table)]
+        for name in ['search_document', 'search_phonetics']:
+            if name not in columns:
+                op.add_column(table, sa.Column(name, sa.Text))
+        index = 'ix_%s_search_document' % table
+        if postgres and index not in [ix['name'] for ix
+                                      in inspector.get_indexes(table)]:
+            op.create_index(index, table, ['search_document'],
+                            postgresql_using='gin',
+                            postgresql_ops={'search_document':
+                                            'gin_trgm_ops'})
+
+
+def downgrade():
+    conn = op.get_bind()
+    inspector = sa.inspect(conn)
+    for table in _get_searchable_tables():
+        index = 'ix_%s_search_document' % table
+        if index in [ix['name'] for ix in inspector.get_indexes(table)]:
+            op.drop_index(index, table)
+        columns = [col['name'] for col in inspector.get_columns(table)]
+        for name in ['search_document', 'search_phonetics']:
+            if name in columns:
+                op.drop_column(table, name)
@@ -0,0 +1,27 @@
+"""Add version of the configuration of the moduls
+
+Revision ID: 5d1e6b8f0c3a
+Revises: 4618c1f51917
+Create Date: 2026-10-18 20:10:12.402514
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = '5d1e6b8f0c3a'
+down_revision = '4618c1f51917'
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    modul_versions = op.create_table(
+        'modul_versions',
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('version', sa.Integer, nullable=False)
+    )
+    op.bulk_insert(modul_versions, [{'id': 1, 'version': 0}])
+
+
+def downgrade():
+    op.drop_table('modul_versions')
@@ -3,8 +3,9 @@ import re
 import logging
 import pkg_resources
 import transaction
-from pyramid.events import NewRequest
+from sqlalchemy.exc import DBAPIError
 from ringo.lib import helpers
+from ringo.lib.cache import MODUL_REGISTRY
 from ringo.lib.extension import check_unregister_modul
 from ringo.lib.sql.db import DBSession, NTDBSession
 from ringo.lib.helpers import get_action_routename
@@ -12,7 +13,6 @@ from ringo.lib.form import get_formbar_css, get_formbar_js
 from ringo.model.modul import ModulItem
 from ringo.model import extensions
 from ringo.model.mixins import Mixin
-from ringo.model.base import get_item_list
 from ringo.resources import get_resource_factory
 from ringo.views.base import (
     web_action_view_mapping,
@@ -38,13 +38,6 @@ class IgnoreStaticUrls(object):
         return not static_urls.match(event.request.path)
 
 
-def preload_modules(event):
-    """Preload all modules on each request and put them into the request
-    cache for the modules to save additional SQL queries as the modules
-    are needed anyway."""
-    for modul in get_item_list(event.request, ModulItem):
-        event.request.cache_item_modul.set(modul.id, modul)
-
 def setup(config):
     """Setup method which is called on application initialition and
     takes care that many ringo specific things are setup correctly."""
@@ -64,7 +57,16 @@ def setup(config):
     config.include('ringo.lib.security.setup_ringo_security')
     config.include('ringo.lib.cache.setup_cache')
     config.include('ringo.lib.request.app')
-    config.add_subscriber(preload_modules, NewRequest, ignore_static_urls="")
+    # Load the moduls into the process wide registry of the moduls. If
+    # the database is not migrated yet the moduls are loaded on the
+    # first request.
+    try:
+        MODUL_REGISTRY.get_moduls(NTDBSession)
+        NTDBSession.commit()
+    except DBAPIError:
+        NTDBSession.rollback()
+        log.warning("Can not load the moduls into the registry. "
+                    "Please upgrade the database.")
 
 
 def setup_extensions(config):
@@ -131,6 +133,19 @@ def _setup_web_action(config, action, clazz, view_mapping):
                         renderer=renderer,
                         permission=action.permission or action_name,
                         http_cache=int(http_cache))
+    ## Add server-side datatables action.
+    if action_name == "list":
+        route_name = "%s-%s" % (name, "dtlist")
+        route_url = "%s/%s" % (name, "dtlist")
+        view_func = get_action_view(view_mapping,
+                                    "dtlist",
+                                    name)
+        log.debug("Adding route: %s, %s" % (route_name, route_url))
+        config.add_route(route_name, route_url,
+                         factory=get_resource_factory(clazz))
+        config.add_view(view_func, route_name=route_name,
+                        renderer='json',
+                        permission='list')
     ## Add bundle action.
     if action_name == "list":
        action_name = "bundle"
@@ -1,6 +1,12 @@
 """Caching of items."""
+import os
+import sys
+import time
 import logging
-import datetime
+import warnings
+import threading
+import collections
+import cPickle as pickle
 from pyramid.events import NewRequest
 
 log = logging.getLogger(__name__)
@@ -8,9 +14,15 @@ log = logging.getLogger(__name__)
 
 class Cache(object):
 
-    """Cache container to store elements"""
+    """Thread safe cache container to store elements. The number of
+    elements and the estimated memory used by the elements can be
+    limited. If the cache is full the least recently used elements are
+    removed. Elements can expire after a given number of seconds. The
+    number of hits, misses and evictions are counted (See
+    :meth:`stats`)."""
 
-    def __init__(self, validity_period=0):
+    def __init__(self, validity_period=0, maxsize=0, ttl=0, maxmemory=0,
+                 sizeof=sys.getsizeof):
         """Intitialises a new Cache container. You can set the the
         validity_period in seconds. This parameter will ensure that the
         cache will stay available at least the amount of seconds defined
@@ -20,11 +32,29 @@ class Cache(object):
 
         :validity_period: Number of seconds the cache will be available,
         before it can be cleared.
+        :maxsize: Maximum number of elements. If 0 the number is not
+        limited.
+        :ttl: Default number of seconds an element is valid. If 0 the
+        elements are valid until they are deleted or the cache is
+        cleared.
+        :maxmemory: Maximum number of bytes used by the elements. If 0
+        the memory is not limited.
+        :sizeof: Function to estimate the number of bytes used by an
+        element. Defaults to sys.getsizeof.
 
         """
-        self._created = datetime.datetime.now()
+        self._created = time.time()
         self._validity_period = validity_period
-        self._data = {}
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxmemory = maxmemory
+        self._sizeof = sizeof
+        self._data = collections.OrderedDict()
+        self._memory = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
         log.debug("New cache created")
 
     def clear(self, force=False):
@@ -36,20 +66,41 @@ class Cache(object):
         :returns: None
 
         """
-        td = (datetime.datetime.now() - self._created)
-        if force or td.seconds > self._validity_period:
-            self._data = {}
+        with self._lock:
+            now = time.time()
+            if force or now - self._created >= self._validity_period:
+                self._data.clear()
+                self._memory = 0
 
-    def set(self, key, value):
+    def _remove(self, key):
+        value, size, expires = self._data.pop(key)
+        self._memory -= size
+
+    def set(self, key, value, ttl=None):
         """Will set a new value for the given key in the cache. If there
         is already a value stored then the value will be overwritten.
 
         :key: String idenditifier for the cached value
         :value: The value to cache
+        :ttl: Number of seconds the value is valid. Defaults to the ttl
+        of the cache.
         :returns: None
 
         """
-        self._data[key] = value
+        if ttl is None:
+            ttl = self.ttl
+        expires = ttl and time.time() + ttl or None
+        size = self.maxmemory and self._sizeof(value) or 0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, size, expires)
+            self._memory += size
+            while self._data and (
+                    (self.maxsize and len(self._data) > self.maxsize)
+                    or (self.maxmemory and self._memory > self.maxmemory)):
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
 
     def get(self, key):
         """Will return the cached value for the key. If there is no
@@ -59,7 +110,19 @@ class Cache(object):
         :returns: The cached value
 
         """
-        return self._data.get(key)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[2] and entry[2] < time.time():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # Mark the element as recently used.
+            del self._data[key]
+            self._data[key] = entry
+            return entry[0]
 
     def delete(self, key):
         """Will delete the cache value for the key.
@@ -69,16 +132,374 @@ class Cache(object):
         :returns: None
 
         """
-        if key in self._data:
-            del self._data[key]
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+    def all(self):
+        """Returns a dictionary with all valid values in the cache.
+
+        :returns: Dictionary
+        """
+        now = time.time()
+        with self._lock:
+            return dict((key, entry[0])
+                        for key, entry in self._data.iteritems()
+                        if not entry[2] or entry[2] >= now)
+
+    def stats(self):
+        """Returns a dictionary with the number of hits, misses and
+        evictions, the number of elements and the estimated memory
+        used by the elements. The memory is only estimated if the
+        memory is limited.
+
+        :returns: Dictionary
+        """
+        with self._lock:
+            return {"hits": self.hits,
+                    "misses": self.misses,
+                    "evictions": self.evictions,
+                    "size": len(self._data),
+                    "memory": self._memory}
+
+
+class ItemListCache(Cache):
+
+    """Bounded cache container for the results of list queries which
+    is shared between the requests of a process. Every entry has a set
+    of names of the tables its value depends on. The entries are
+    invalidated if one of the tables is modified. Eviction of the least
+    recently used entries, expiration and the statistics are inherited
+    from :class:`Cache`."""
+
+    def __init__(self, maxsize=0, timeout=0):
+        """Intitialises a new ItemListCache container.
+
+        :maxsize: Maximum number of entries. If 0 nothing is cached.
+        :timeout: Number of seconds the entries are valid. If 0 entries
+                  are valid until they are invalidated. As the cache
+                  only knows about modifications in the current process
+                  you should set a timeout if the application runs in
+                  more than one process.
+        """
+        Cache.__init__(self, maxsize=maxsize, ttl=timeout)
+        self._version = 0
+        self._invalidated = {}
+
+    @property
+    def timeout(self):
+        """Number of seconds the entries are valid. Alias of the ttl
+        of the cache."""
+        return self.ttl
+
+    @timeout.setter
+    def timeout(self, timeout):
+        self.ttl = timeout
+
+    def version(self):
+        """Returns the current version of the cache. The version is
+        increased on every invalidation. Provide the version to
+        :meth:`set` to ensure that values which were loaded before a
+        modification of one of their tables are not stored."""
+        return self._version
+
+    def get(self, key):
+        """Will return the cached value for the key. If there is no
+        valid value stored for the given key None will be returned.
+
+        :key: Hashable idenditifier for the cached value
+        :returns: The cached value
+        """
+        entry = Cache.get(self, key)
+        if entry is None:
+            return None
+        return entry[0]
+
+    def set(self, key, value, tables, version=None):
+        """Will set a new value for the given key in the cache.
+
+        :key: Hashable idenditifier for the cached value
+        :value: The value to cache
+        :tables: Names of the tables the value depends on
+        :version: Version of the cache when the value was loaded. If
+                  one of the tables has been invalidated since then
+                  the value is not stored.
+        :returns: None
+        """
+        if not self.maxsize:
+            return
+        with self._lock:
+            if version is not None and any(
+                    self._invalidated.get(table, 0) > version
+                    for table in tables):
+                return
+            Cache.set(self, key, (value, frozenset(tables)))
+
+    def all(self):
+        """Returns a dictionary with all valid values in the cache.
+
+        :returns: Dictionary
+        """
+        return dict((key, entry[0])
+                    for key, entry in Cache.all(self).iteritems())
+
+    def invalidate(self, table):
+        """Will delete all values which depend on the given table.
+
+        :table: Name of the modified table
+        :returns: None
+        """
+        with self._lock:
+            self._version += 1
+            self._invalidated[table] = self._version
+            for key in [key for key, entry in self._data.iteritems()
+                        if table in entry[0][1]]:
+                self._remove(key)
+
+    def clear(self, force=True):
+        """Will delete all values.
+
+        :returns: None
+        """
+        with self._lock:
+            self._version += 1
+            Cache.clear(self, force=True)
+
+
+class FileCache(object):
 
+    """Cache for values which are loaded from files (e.g parsed
+    configuration files). A cached value is reloaded if the
+    modification time, size or inode of its file has changed. The file
+    is checked at most every `interval` seconds. The cached values are
+    shared between the requests and must not be modified."""
+
+    def __init__(self, interval=0, maxsize=0):
+        """Intitialises a new FileCache container.
+
+        :interval: Number of seconds between two checks of a file. If 0
+                   the file is checked on every access.
+        :maxsize: Maximum number of values. If 0 the number is not
+                  limited.
+        """
+        self.interval = interval
+        self._data = Cache(maxsize=maxsize)
+
+    def _stat(self, path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime, stat.st_size)
+
+    def get(self, path, loader, key=None):
+        """Will return the cached value for the file in path. If there
+        is no valid value the value is loaded by calling the loader
+        with the path.
+
+        :path: Path to the file
+        :loader: Function which returns the value for the path
+        :key: Optional key of the value. Defaults to the path. Can be
+              used to cache more than one value per file.
+        :returns: The cached value
+        """
+        if key is None:
+            key = path
+        now = time.time()
+        entry = self._data.get(key)
+        if entry is not None:
+            value, stamp, checked = entry
+            if now - checked < self.interval:
+                return value
+            if self._stat(path) == stamp:
+                self._data.set(key, (value, stamp, now))
+                return value
+        stamp = self._stat(path)
+        value = loader(path)
+        self._data.set(key, (value, stamp, now))
+        return value
+
+    def reload(self):
+        """Will reload all values on next access."""
+        self._data.clear(force=True)
+
+
+class ModulRegistry(object):
+
+    """Process wide registry of the moduls of the application. The
+    moduls are loaded once with their default group, their actions and
+    the roles of the actions and shared between the requests. The
+    loaded moduls are detached from any session and must not be
+    modified. Other relations of the moduls can not be loaded. Use
+    :meth:`merge` to get a modul attached to the session of a request.
+
+    The registry is refreshed if the version of the configuration of
+    the moduls changes (See :func:`ringo.model.modul.get_modul_version`).
+    The version is checked at most every `interval` seconds. Moduls
+    modified in the current process are refreshed immediately."""
+
+    def __init__(self, interval=1):
+        """Intitialises a new ModulRegistry.
+
+        :interval: Number of seconds between two checks of the version.
+        """
+        self.interval = interval
+        self._moduls = None
+        self._clazzes = {}
+        self._version = None
+        self._checked = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _load(self, db):
+        from sqlalchemy.orm import joinedload
+        from sqlalchemy.orm.attributes import set_committed_value
+        from ringo.lib.helpers import dynamic_import
+        from ringo.model.modul import ModulItem
+        moduls = db.query(ModulItem).options(
+            joinedload("actions").joinedload("roles"),
+            joinedload("default_group")).all()
+        for modul in moduls:
+            for action in modul.actions:
+                set_committed_value(action, "modul", modul)
+        # Detach a copy of the moduls from the session.
+        moduls = pickle.loads(pickle.dumps(moduls, pickle.HIGHEST_PROTOCOL))
+        clazzes = {}
+        for modul in moduls:
+            try:
+                clazzes[modul.clazzpath] = dynamic_import(modul.clazzpath)
+            except (ImportError, AttributeError):
+                log.warning("Can not import clazz of modul %s" % modul.name)
+        log.debug("Loaded %s moduls into the registry" % len(moduls))
+        return dict((modul.id, modul) for modul in moduls), clazzes
+
+    def get_moduls(self, db):
+        """Returns a dictionary with all moduls. The id of the modul is
+        the key.
+
+        :db: Database session used to check the version and to load
+             the moduls.
+        :returns: Dictionary of moduls
+        """
+        from ringo.model.modul import get_modul_version
+        now = time.time()
+        moduls = self._moduls
+        if moduls is not None and now - self._checked < self.interval:
+            return moduls
+        with self._lock:
+            generation = self._generation
+        version = get_modul_version(db)
+        with self._lock:
+            if self._moduls is not None and version == self._version:
+                self._checked = now
+                return self._moduls
+        moduls, clazzes = self._load(db)
+        with self._lock:
+            if generation == self._generation:
+                self._moduls = moduls
+                self._clazzes = clazzes
+                self._version = version
+                self._checked = now
+        return moduls
+
+    def merge(self, db, id):
+        """Returns the modul with the given id attached to the given
+        session. The modul is merged into the session without loading
+        it again from the database. Use this method if the modul needs
+        to be modified or if other relations of the modul are needed.
+
+        :db: Database session
+        :id: ID of the modul
+        :returns: ModulItem or None
+        """
+        modul = self.get_moduls(db).get(id)
+        if modul is None:
+            return None
+        return db.merge(modul, load=False)
+
+    def get_clazz(self, modul):
+        """Returns the clazz of the given modul.
+
+        :modul: ModulItem
+        :returns: Clazz
+        """
+        clazz = self._clazzes.get(modul.clazzpath)
+        if clazz is None:
+            clazz = modul.get_clazz()
+        return clazz
+
+    def invalidate(self):
+        """Will refresh the moduls on next access."""
+        with self._lock:
+            self._generation += 1
+            self._moduls = None
+
+
+class ModulCache(object):
+
+    """Deprecated cache of the moduls. The moduls are read from the
+    :data:`MODUL_REGISTRY`. Only available for backwards compatibility
+    as `request.cache_item_modul` and :data:`CACHE_MODULES`. Use
+    :func:`ringo.lib.helpers.misc.get_moduls` instead."""
+
+    def __init__(self, request=None):
+        self._request = request
+
+    def _warn(self):
+        warnings.warn("The cache of the moduls is deprecated. Use "
+                      "ringo.lib.helpers.get_moduls instead",
+                      DeprecationWarning, stacklevel=3)
+
+    def _moduls(self):
+        from ringo.lib.helpers.misc import get_moduls
+        return get_moduls(self._request)
+
+    def get(self, key):
+        self._warn()
+        return self._moduls().get(key)
 
     def all(self):
-        return self._data
+        self._warn()
+        return dict(self._moduls())
+
+    def set(self, key, value, ttl=None):
+        self._warn()
+
+    def delete(self, key):
+        self._warn()
+
+    def clear(self, force=False):
+        pass
+
 
 def setup_cache(config):
+    settings = config.registry.settings
+    CACHE_ITEM_LISTS.maxsize = int(settings.get("app.cache.itemlists", 0))
+    CACHE_ITEM_LISTS.timeout = int(settings.get("app.cache.itemlists.timeout",
+                                                0))
+    CACHE_ITEM_COUNTS.maxsize = int(settings.get("app.cache.itemcounts",
+                                                 1000))
+    CACHE_ITEM_COUNTS.timeout = int(settings.get(
+        "app.cache.itemcounts.timeout", 60))
+    CACHE_USERS.maxsize = int(settings.get("app.cache.users", 0))
+    CACHE_USERS.timeout = int(settings.get("app.cache.users.timeout", 0))
+    MODUL_REGISTRY.interval = float(settings.get("app.modules.interval", 1))
+    CACHE_CONFIG_FILES.interval = float(settings.get(
+        "app.cache.configfiles.interval", 0))
+    CACHE_BLOBFORM_CONFIG.maxsize = int(settings.get("app.cache.blobforms",
+                                                     100))
     config.add_subscriber(_init_cache, NewRequest)
 
+def reload_configs():
+    """Will reload the table and form configurations from the files on
+    next access. Use this function if the configuration files have been
+    changed and the files are only checked periodically or changes of
+    included files must be noticed."""
+    CACHE_CONFIG_FILES.reload()
+    CACHE_TABLE_CONFIG.clear(force=True)
+    CACHE_FORM_CONFIG.clear(force=True)
+
+
 def _init_cache(event):
     init_cache(event.request)
 
@@ -90,18 +511,20 @@ def init_cache(request):
     else:
         request.cache_item_list = Cache()
 
-    if hasattr(request, "cache_item_modul"):
-        request.cache_item_modul.clear()
-    else:
-        request.cache_item_modul = Cache()
+    request.cache_item_modul = ModulCache(request)
 
-    CACHE_TABLE_CONFIG.clear()
     if settings.get("app.cache.formconfig") != "true":
         CACHE_FORM_CONFIG.clear()
-    CACHE_MODULES.clear()
 
-CACHE_MODULES = Cache()
+CACHE_MODULES = ModulCache()
 # GLOBAL CACHE INSTANCES
-CACHE_TABLE_CONFIG = Cache()
-CACHE_FORM_CONFIG = Cache()
-CACHE_MISC = Cache()
+CACHE_TABLE_CONFIG = Cache(maxsize=1000)
+CACHE_FORM_CONFIG = Cache(maxsize=1000)
+CACHE_MISC = Cache(maxsize=1000)
+CACHE_CONFIG_FILES = FileCache(maxsize=1000)
+CACHE_BLOBFORM_CONFIG = Cache(maxsize=100)
+CACHE_ITEM_LISTS = ItemListCache()
+CACHE_ITEM_COUNTS = ItemListCache(maxsize=1000, timeout=60)
+CACHE_ACL_TEMPLATES = ItemListCache(maxsize=1000)
+CACHE_USERS = ItemListCache()
+MODUL_REGISTRY = ModulRegistry()
@@ -1,12 +1,17 @@
 """Functiont to work with forms."""
 import os
 import inspect
+import hashlib
 from threading import Lock
 from formbar.form import Form
 from formbar.config import Config, load, parse
 from formbar.helpers import get_css_files, get_js_files
 from ringo.model.mixins import Blobform
-from ringo.lib.cache import CACHE_FORM_CONFIG
+from ringo.lib.cache import (
+    CACHE_FORM_CONFIG,
+    CACHE_CONFIG_FILES,
+    CACHE_BLOBFORM_CONFIG
+)
 from ringo.lib.helpers import (
     get_path_to,
     get_app_inheritance_path
@@ -87,12 +92,14 @@ def get_form_config(item, formname):
         filename = "%s.xml" % item.__class__.__tablename__
     name = item.__module__.split(".")[0]
 
+    if is_blobform:
+        # The configuration of blobforms depends on the form of the
+        # item and is cached separately.
+        return get_form_config_from_db(item.fid, formname)
+
     with form_lock:
         if not CACHE_FORM_CONFIG.get(cachename):
-            if is_blobform:
-                config = get_form_config_from_db(item.fid, formname)
-            else:
-                config = get_form_config_from_file(name, filename, formname)
+            config = get_form_config_from_file(name, filename, formname)
             CACHE_FORM_CONFIG.set(cachename, config)
     return CACHE_FORM_CONFIG.get(cachename)
 
@@ -101,22 +108,28 @@ def get_form_config_from_file(name, filename, formname):
     """Return the file based configuration for a given form. The
     configuration tried to be loaded from the current application (and
     its origins) first.  If this fails it tries to load it from the
-    extension."""
-    loaded_config = None
+    extension.
+
+    The parsed configuration is cached until the file changes (See
+    :class:`ringo.lib.cache.FileCache`)."""
+    config = None
     try:
         path = get_path_to_form_config(filename)
-        if os.path.exists(path):
-            loaded_config = load(path)
-        elif name.startswith("ringo_"):
-            loaded_config = load(get_path_to_form_config(filename,
-                                                         name, location="."))
+        if not os.path.exists(path) and name.startswith("ringo_"):
+            path = get_path_to_form_config(filename, name, location=".")
+        config = CACHE_CONFIG_FILES.get(path, _load_config)
     except:
         pass
     # If we can't load the config file, raise an IOError. Hint: Maybe
     # you missed to set the app.base config variable?
-    if loaded_config is None:
+    if config is None:
         raise IOError("Could not load form configuration for %s" % filename)
-    return Config(loaded_config).get_form(formname)
+    return CACHE_CONFIG_FILES.get(path, lambda path: config.get_form(formname),
+                                  key=(path, formname))
+
+
+def _load_config(path):
+    return Config(load(path))
 
 
 def get_form_config_from_db(fid, formname):
@@ -124,7 +137,42 @@ def get_form_config_from_db(fid, formname):
     from ringo.model.form import Form
     factory = Form.get_item_factory()
     form = factory.load(fid)
-    return Config(parse(form.definition.encode('utf-8'))).get_form(formname)
+    return get_config_from_blobform(form).get_form(formname)
+
+
+def get_config_from_blobform(form):
+    """Returns the parsed configuration of the definition of the given
+    stored form. The configuration is cached until the form is
+    updated.
+
+    :form: :class:`ringo.model.form.Form` instance
+    :returns: Config
+    """
+    key = ("form", form.id)
+    entry = CACHE_BLOBFORM_CONFIG.get(key)
+    if entry is not None and entry[0] == form.updated:
+        return entry[1]
+    config = Config(parse(form.definition.encode('utf-8')))
+    if form.id is not None:
+        CACHE_BLOBFORM_CONFIG.set(key, (form.updated, config))
+    return config
+
+
+def get_config_from_definition(definition):
+    """Returns the parsed configuration of the given definition of a
+    form. The configuration is cached by the hash of the definition.
+
+    :definition: XML definition of the form
+    :returns: Config
+    """
+    if isinstance(definition, unicode):
+        definition = definition.encode('utf-8')
+    key = ("definition", hashlib.sha1(definition).hexdigest())
+    config = CACHE_BLOBFORM_CONFIG.get(key)
+    if config is None:
+        config = Config(parse(definition))
+        CACHE_BLOBFORM_CONFIG.set(key, config)
+    return config
 
 
 def get_formbar_css():
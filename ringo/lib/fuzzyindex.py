@@ -0,0 +1,154 @@
+"""Modul with an index to speed up the fuzzy search ("~" operator) in
+listings. The fuzzy search compares the values of the items with the
+search string using the Double Metaphone phonetic encoding and the
+Levenshtein distance as second indicator (see
+:func:`ringo.model.base.smatch`).
+
+Instead of comparing the search with every single value the index
+precomputes the phonetic codes of all values and maps the codes and the
+bigrams of the values to the values. On a search only the values
+sharing a phonetic code or enough bigrams with the search string are
+compared in detail."""
+import math
+import collections
+import fuzzy
+import Levenshtein
+
+_dmeta = fuzzy.DMetaphone()
+
+THRESHOLD = 0.3
+"""Maximum allowed single-character edits relative to the length of
+the longer word in the Levenshtein fallback."""
+
+
+def get_dmetaphone(value):
+    """Returns the primary and secondary Double Metaphone code of the
+    value as tuple. The secondary code may be None.
+
+    :value: String
+    :returns: Tuple of codes
+    """
+    return tuple(_dmeta(value.encode("utf-8")))
+
+
+def match_dmetaphone(value_codes, search_codes):
+    """Returns True if the phonetic codes of a value and the search
+    match. If both have a secondary code all combinations of the codes
+    are compared. Otherwise both codes must be equal.
+
+    :value_codes: Codes of the value. See :func:`get_dmetaphone`
+    :search_codes: Codes of the search. See :func:`get_dmetaphone`
+    :returns: True or False
+    """
+    if value_codes[1] is not None and search_codes[1] is not None:
+        for v in value_codes:
+            for s in search_codes:
+                if v == s:
+                    return True
+    return tuple(value_codes) == tuple(search_codes)
+
+
+def get_max_distance(len_value, len_search, t=THRESHOLD):
+    """Returns the maximum Levenshtein distance for a value and a
+    search with the given lengths to be considered as similar."""
+    return math.ceil(max(len_value, len_search) * t)
+
+
+def _get_bigrams(value):
+    return collections.Counter([value[i:i + 2]
+                                for i in range(len(value) - 1)])
+
+
+class FuzzyIndex(object):
+    """Index for the fuzzy search on a set of values. Each value is
+    added with a key (e.g the item the value belongs to). A search
+    returns all keys with values matching the search the same way as
+    :func:`ringo.model.base.smatch` does."""
+
+    def __init__(self):
+        self._values = {}
+        """Mapping of the (lowered) values to the keys"""
+        self._codes = {}
+        """Mapping of the values to their phonetic codes"""
+        self._phonetic = {}
+        """Mapping of the phonetic codes to the values"""
+        self._bigrams = {}
+        """Mapping of bigrams to the values and the number of
+        occurrences of the bigram in the value"""
+        self._lengths = {}
+        """Mapping of the length of the value and the length of the
+        encoded value to the values"""
+
+    def add(self, key, value, codes=None):
+        """Adds the value for the given key to the index.
+
+        :key: Key which is returned on a search
+        :value: String value
+        :codes: Precomputed phonetic codes of the lowered value. See
+                :func:`get_dmetaphone`. If not provided the codes
+                will be computed.
+        """
+        value = value.lower()
+        if value in self._values:
+            self._values[value].append(key)
+            return
+        self._values[value] = [key]
+        if codes is None:
+            codes = get_dmetaphone(value)
+        self._codes[value] = codes
+        for code in codes:
+            self._phonetic.setdefault(code, set()).add(value)
+        encoded = value.encode("utf-8")
+        for bigram, num in _get_bigrams(encoded).iteritems():
+            self._bigrams.setdefault(bigram, {})[value] = num
+        lengths = (len(value), len(encoded))
+        self._lengths.setdefault(lengths, set()).add(value)
+
+    def _get_candidates(self, search):
+        """Returns values which may be within the allowed Levenshtein
+        distance of the search. Like in :func:`ringo.model.base.smatch`
+        the distance is calculated on the UTF-8 encoded values. A value
+        with a distance of k to the search differs at most k in length
+        and shares at least max(len) - 1 - 2k bigrams with the search."""
+        candidates = set()
+        encoded = search.encode("utf-8")
+        counts = {}
+        for bigram, num in _get_bigrams(encoded).iteritems():
+            for value, vnum in self._bigrams.get(bigram, {}).iteritems():
+                counts[value] = counts.get(value, 0) + min(num, vnum)
+        for (length, encoded_length), values in self._lengths.iteritems():
+            k = get_max_distance(length, len(search))
+            if abs(encoded_length - len(encoded)) > k:
+                continue
+            required = max(encoded_length, len(encoded)) - 1 - 2 * k
+            if required <= 0:
+                candidates.update(values)
+            else:
+                candidates.update([v for v in values
+                                   if counts.get(v, 0) >= required])
+        return candidates
+
+    def search(self, search):
+        """Returns a set of keys with values matching the search.
+
+        :search: Search string
+        :returns: Set of keys
+        """
+        search = search.lower()
+        matches = set()
+        if search in self._values:
+            matches.add(search)
+        search_codes = get_dmetaphone(search)
+        for code in search_codes:
+            for value in self._phonetic.get(code, ()):
+                if match_dmetaphone(self._codes[value], search_codes):
+                    matches.add(value)
+        for value in self._get_candidates(search) - matches:
+            distance = Levenshtein.distance(search.encode("utf-8"),
+                                            value.encode("utf-8"))
+            if distance <= get_max_distance(len(value), len(search)):
+                matches.add(value)
+        keys = set()
+        for value in matches:
+            keys.update(self._values[value])
+        return keys
@@ -34,6 +34,7 @@ from ringo.lib.helpers.misc import (
     get_modul_by_name,
     import_model,
     get_item_modul,
+    get_moduls,
     get_modules,
     get_item_actions,
     get_action_routename,
@@ -250,6 +250,29 @@ def import_model(clazzpath):
         return import_model(modul.clazzpath)
 
 
+def get_moduls(request=None):
+    """Returns a dictionary with all moduls of the application from the
+    process wide registry of the moduls. The id of the modul is the
+    key. Within a request the same moduls are returned on every call.
+
+    :request: Current request
+    :returns: Dictionary of moduls
+    """
+    from ringo.lib.cache import MODUL_REGISTRY
+    if not request:
+        request = get_current_request()
+    db = getattr(request, "db", None)
+    if db is None:
+        db = DBSession
+    if request is None:
+        return MODUL_REGISTRY.get_moduls(db)
+    moduls = getattr(request, "_moduls", None)
+    if moduls is None:
+        moduls = MODUL_REGISTRY.get_moduls(db)
+        request._moduls = moduls
+    return moduls
+
+
 def get_item_modul(request, item):
     if hasattr(item, "_modul_id"):
         return _get_item_modul(request, item)
@@ -266,23 +289,19 @@ def _get_item_modul(request, item):
         # years and it currently doesn't seem to cause problems in the
         # real world. (ti) <2016-01-12 08:55>
         request = get_current_request()
-    if not request or not request.cache_item_modul.get(item._modul_id):
-        from ringo.model.modul import ModulItem
-        factory = ModulItem.get_item_factory()
-        if item._modul_id is None:
-            # FIXME: Special case when loading fixtures for extensions.
-            # As the id of an extension is set dynamically on
-            # application startup the id is not yet present at time of
-            # fixture loading. (ti) <2015-02-17 23:00>
-            modul = factory.load(item.__tablename__, field="name")
-        else:
-            modul = factory.load(item._modul_id)
-        if request:
-            if not request.cache_item_modul.get(item._modul_id):
-                request.cache_item_modul.set(item._modul_id, modul)
-        else:
+    if item._modul_id is not None:
+        modul = get_moduls(request).get(item._modul_id)
+        if modul is not None:
             return modul
-    return request.cache_item_modul.get(item._modul_id)
+    from ringo.model.modul import ModulItem
+    factory = ModulItem.get_item_factory()
+    if item._modul_id is None:
+        # FIXME: Special case when loading fixtures for extensions.
+        # As the id of an extension is set dynamically on
+        # application startup the id is not yet present at time of
+        # fixture loading. (ti) <2015-02-17 23:00>
+        return factory.load(item.__tablename__, field="name")
+    return factory.load(item._modul_id)
 
 
 def get_item_actions(request, item):
@@ -377,16 +396,17 @@ def get_saved_searches(request, name):
 
 def get_modules(request, display):
     # FIXME: Circular import (ti) <2015-05-11 21:52>
-    from ringo.lib.security import has_permission
-    user_moduls = []
+    from ringo.lib.security import has_permission_many
+    from ringo.lib.cache import MODUL_REGISTRY
+    moduls = []
     # The modules has been load already and are cached. So get them from
-    # the cache
-    for modul in request.cache_item_modul.all().values():
+    # the registry
+    for modul in get_moduls(request).values():
         # Only show the modul if it matches the desired display location
         # and if the modul has an "list" action which usually is used as
         # entry point into a modul.
         if (modul.display == display and modul.has_action('list')):
-            clazz = dynamic_import(modul.clazzpath)
-            if has_permission('list', clazz, request):
-                user_moduls.append(modul)
-    return user_moduls
+            moduls.append(modul)
+    clazzes = [MODUL_REGISTRY.get_clazz(modul) for modul in moduls]
+    allowed = has_permission_many('list', clazzes, request)
+    return [modul for modul, flag in zip(moduls, allowed) if flag]
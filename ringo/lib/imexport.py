@@ -13,7 +13,8 @@ except ImportError:
 import xlsxwriter
 import sqlalchemy as sa
 
-from ringo.model.base import BaseItem
+from ringo.model.base import BaseItem, update_search_index
+from ringo.model.mixins import Searchable
 from ringo.model.user import UserSetting
 from ringo.lib.helpers import serialize, deserialize
 from ringo.lib.sql import DBSession
@@ -462,6 +463,8 @@ class Importer(object):
                 item = factory.create(user=user, values=values)
                 self._db.add(item)
                 operation = _("CREATE")
+            if isinstance(item, Searchable):
+                update_search_index(None, item)
             imported_items.append((item, operation))
         return imported_items
 
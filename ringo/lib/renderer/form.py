@@ -93,9 +93,11 @@ def filter_options_on_permissions(request, options):
 
     """
     filtered_options = []
+    allowed = iter(security.has_permission_many(
+        'link', [option[0] for option in options if option[2]], request))
     for option in options:
         linkable = False
-        if (option[2] and (security.has_permission('link', option[0], request) or
+        if (option[2] and (next(allowed) or
            not hasattr(option[0], 'owner'))):
             linkable = True
         filtered_options.append((option[0], option[1], linkable))
@@ -341,19 +343,16 @@ class ListingFieldRenderer(FormbarSelectionField):
     @property
     def itemlist(self):
         clazz = self.get_class()
+        table = self._field._config.renderer.table or "overview"
         if self.showall == 'true':
             itemlist = get_item_list(self._field._form._request,
-                                     clazz)
+                                     clazz, table=table)
         else:
             itemlist = get_item_list(self._field._form._request,
                                      clazz,
-                                     user=self._field._form._request.user)
-        config = get_table_config(itemlist.clazz,
-                                  self._field._config.renderer.table)
-        sort_field = config.get_default_sort_column()
-        sort_order = config.get_default_sort_order()
-        itemlist.sort(sort_field, sort_order)
-
+                                     user=self._field._form._request.user,
+                                     table=table)
+        config = get_table_config(itemlist.clazz, table)
         # Warning filtering items here can cause loosing relations to
         # the filtered items. This is esspecially true if the item which
         # was related to the item before now gets filtered because of a
@@ -362,6 +361,11 @@ class ListingFieldRenderer(FormbarSelectionField):
         # request. This will result in removing the relation!
         search = config.get_default_search()
         itemlist.filter(search)
+
+        # Sort after filtering to only sort the remaining items.
+        sort_field = config.get_default_sort_column()
+        sort_order = config.get_default_sort_order()
+        itemlist.sort(sort_field, sort_order)
         return itemlist
 
     def _get_selected_items(self, items):
@@ -10,6 +10,7 @@ from ringo.lib.helpers import (
     get_action_routename
 )
 from ringo.lib.table import get_table_config
+from ringo.model.base import ProjectionRow
 import ringo.lib.security as security
 
 base_dir = pkg_resources.get_distribution("ringo").location
@@ -24,11 +25,39 @@ log = logging.getLogger(__name__)
 ###########################################################################
 
 
-def get_read_update_url(request, item, clazz, prefilterd=False):
-    """Helper method to get the URL to read or update in item in various
-    overviews. If the user of this request is not allowed to see the
-    item at all, None will be returned as the url."""
+def _get_permissions(permission, listing, request):
+    """Returns a dictionary with the permission of the user on every
+    item in the listing."""
+    allowed = security.has_permission_many(permission, listing.items,
+                                           request)
+    return dict(zip(listing.items, allowed))
+
+
+def _has_permission(permission, item, clazz, request, listing=None):
+    """Returns True if the user of the request has the permission on
+    the item. :class:`.ProjectionRow` instances do not provide an ACL
+    and are checked against the grants of the clazz which are cached in
+    the listing. The permissions of other items in a listing are
+    checked for all items of the listing at once."""
+    if isinstance(item, ProjectionRow):
+        if listing is not None:
+            grants = listing.materialize(("grants", permission),
+                                         security.get_permission_grants,
+                                         permission, clazz, request)
+        else:
+            grants = security.get_permission_grants(permission, clazz,
+                                                    request)
+        return security.check_permission_grants(grants, item, request)
+    if listing is not None:
+        allowed = listing.materialize(("permissions", permission),
+                                      _get_permissions, permission,
+                                      listing, request)
+        if item in allowed:
+            return allowed[item]
+    return security.has_permission(permission, item, request)
 
+
+def _get_read_update_url(request, item, clazz, prefilterd, listing):
     permissions = ['read']
     # If the application is configured to open items in readmode on
     # default then we will not add the update action to the actions to
@@ -36,29 +65,104 @@ def get_read_update_url(request, item, clazz, prefilterd=False):
     if not request.registry.settings.get("app.readmode") in ["True", "true"]:
         permissions.append('update')
 
-    is_admin = request.user.has_role("admin")
+    is_admin = security.get_identity(request).admin
     url = None
     for permission in permissions:
         if (permission == 'read' and prefilterd) \
            or is_admin \
-           or security.has_permission(permission, item, request):
+           or _has_permission(permission, item, clazz, request, listing):
             url = request.route_path(get_action_routename(clazz, permission), id=item.id)
         else:
             break
     return url
 
 
+def get_read_update_url(request, item, clazz, prefilterd=False, listing=None):
+    """Helper method to get the URL to read or update in item in various
+    overviews. If the user of this request is not allowed to see the
+    item at all, None will be returned as the url. If a listing is
+    given the URL is cached in the listing."""
+    if listing is not None:
+        return listing.materialize((item, "url"), _get_read_update_url,
+                                   request, item, clazz, prefilterd,
+                                   listing)
+    return _get_read_update_url(request, item, clazz, prefilterd, None)
+
+
+def render_responsive_class(visibleonsize):
+    """Will return a string containing BS3 responsve classes to hide
+    elements on different screen sizes."""
+    if not visibleonsize:
+        return ""
+    elif visibleonsize == "small":
+        return ""
+    elif visibleonsize == "medium":
+        return "hidden-xs"
+    elif visibleonsize == "large":
+        return "hidden-sm hidden-xs"
+    elif visibleonsize == "xlarge":
+        return "hidden-md hidden-sm hidden-xs"
+    else:
+        return ""
+
+
 class ListRenderer(object):
     """Docstring for ListRenderer """
 
+    rows_placeholder = "<!-- ringo-listing-rows -->"
+    """Placeholder for the rows in the listing if the rows are rendered
+    separately. See :func:`render_chunked`"""
+
     def __init__(self, listing, tablename=None):
         """@todo: to be defined """
         self.listing = listing
         self.config = get_table_config(self.listing.clazz, tablename)
         self.template = template_lookup.get_template("internal/list.mako")
+        self.rows_template = template_lookup.get_template("internal/listrows.mako")
 
     def render(self, request):
         """Initialize renderer"""
+        values = self._get_values(request)
+        return literal(self.template.render(**values))
+
+    def is_streamed(self):
+        """Returns True if the rows of the listing can be sent to the
+        client in chunks (See :func:`render_chunked`). This is only
+        possible if streaming is enabled in the table config and the
+        items are loaded as :class:`.ProjectionRow` instances."""
+        if not self.config.is_streamed():
+            return False
+        for item in self.listing.items:
+            if not isinstance(item, ProjectionRow):
+                return False
+        return True
+
+    def render_chunked(self, request, chunksize=100):
+        """Returns a tuple with the rendered header of the listing, a
+        generator of the rendered rows and the rendered footer of the
+        listing. The rows are rendered in chunks of the given number of
+        items when the generator is consumed, which usually happens
+        after the transaction of the request has been committed.
+        Therefore everything which needs the database is computed
+        before and the listing must only contain
+        :class:`.ProjectionRow` instances. See :func:`is_streamed`.
+
+        :request: Current request
+        :chunksize: Number of items rendered per chunk
+        :returns: Tuple of header, generator of rows and footer
+        """
+        values = self._get_values(request)
+        values['rows_placeholder'] = self.rows_placeholder
+        for permission in ["read", "update"]:
+            self.listing.materialize(("grants", permission),
+                                     security.get_permission_grants,
+                                     permission, self.listing.clazz,
+                                     request)
+        header, footer = self.template.render(**values).split(
+            self.rows_placeholder, 1)
+        return header, self._render_rows(values, chunksize), footer
+
+    def _get_values(self, request):
         # TODO: Enabled sorting of lists. Mind that these lists might be
         # presorted if the user clicked on the header. In this case some
         # get params with sort configurations are in the session. This
@@ -97,8 +201,10 @@ class ListRenderer(object):
                   'regexpr': regexpr,
                   'search_field': search_field,
                   'saved_searches': ssearch,
+                  'rows_placeholder': None,
+                  'columns': self.config.get_columns(request.user),
                   'tableconfig': self.config}
-        return literal(self.template.render(**values))
+        return values
 
 
 class DTListRenderer(object):
@@ -123,6 +229,7 @@ class DTListRenderer(object):
                   'table_id': table_id,
                   'request': request,
                   'bundled_actions': bundled_actions,
+                  'h': ringo.lib.helpers,
                   '_': request.translate}
         return self.js_template.render(**values)
 
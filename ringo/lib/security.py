@@ -1,8 +1,15 @@
+import os
+import time
+import atexit
 import logging
 import hashlib
 import uuid
 import string
 import random
+import weakref
+import threading
+import multiprocessing
+import sqlalchemy as sa
 from passlib.context import CryptContext
 from datetime import datetime
 from pyramid.events import ContextFound, NewRequest
@@ -11,12 +18,19 @@ from pyramid.security import unauthenticated_userid, \
     Allow, ALL_PERMISSIONS
 from pyramid.authentication import AuthTktAuthenticationPolicy
 from pyramid.authorization import ACLAuthorizationPolicy
+from pyramid.interfaces import IAuthenticationPolicy, IAuthorizationPolicy
 from pyramid.httpexceptions import HTTPUnauthorized
 from sqlalchemy.orm.exc import NoResultFound
 from ringo.lib.helpers import get_item_modul, dynamic_import
 from ringo.lib.sql import DBSession
+from ringo.lib.cache import (
+    CACHE_ITEM_LISTS,
+    CACHE_ACL_TEMPLATES,
+    CACHE_USERS
+)
 from ringo.lib.alchemy import get_relations_from_clazz
-from ringo.model.base import BaseItem
+from ringo.lib.table import get_table_config
+from ringo.model.base import BaseItem, ProjectionRow
 from ringo.model.modul import ModulItem
 from ringo.model.user import User, PasswordResetRequest, Login
 
@@ -119,6 +133,216 @@ def passwords_needs_update(pwhash):
         return True
 
 
+def _verify_password(password, pwhash):
+    """Will verify the password and return a tuple of the result and a
+    new hash of the password if the given pwhash needs to be updated.
+    Else the new hash is None. This function is called in the processes
+    of the :class:`PasswordPool`."""
+    if not verify_password(password, pwhash):
+        return False, None
+    if passwords_needs_update(pwhash):
+        return True, encrypt_password(password)
+    return True, None
+
+
+class PasswordPool(object):
+
+    """Bounded pool of processes to verify and update passwords. Hashing
+    passwords is expensive by design. The pool ensures that many
+    concurrent logins do not block all threads of the application.
+    Only `concurrency` passwords are verified at the same time. Further
+    verifications wait up to `wait` seconds for a free slot before a
+    :class:`PasswordPoolBusyException` is raised. The exception is
+    raised as well if a process of the pool does not return a result
+    within `timeout` seconds. The slot of the verification is kept
+    until the process has finished its job, so the pool never runs more
+    than `concurrency` verifications.
+
+    The processes are forked on :meth:`start` which is called on setup
+    of the application before the server starts any threads. Forking
+    a threaded process is not safe. Therefore processes forked later
+    (e.g. by a server forking worker processes after the setup) do not
+    create a new pool if they already run other threads. In this case
+    the passwords are verified in the calling thread."""
+
+    def __init__(self, processes=0, concurrency=0, wait=10, timeout=10):
+        """Intitialises a new PasswordPool.
+
+        :processes: Number of processes. If 0 the passwords are
+                    verified in the calling thread.
+        :concurrency: Maximum number of concurrent verifications. If 0
+                      the number of processes is used. If there are no
+                      processes the number is not limited.
+        :wait: Number of seconds to wait for a free slot.
+        :timeout: Number of seconds to wait for the result of a process.
+        """
+        self.processes = processes
+        self.concurrency = concurrency
+        self.wait = wait
+        self.timeout = timeout
+        self._pool = None
+        self._pid = None
+        self._running = 0
+        self._pending = []
+        self._condition = threading.Condition()
+
+    def start(self):
+        """Forks the processes of the pool. Must be called before any
+        other threads are started."""
+        with self._condition:
+            if self.processes and self._pid != os.getpid():
+                self._pool = multiprocessing.Pool(self.processes)
+                self._pid = os.getpid()
+
+    def _get_pool(self):
+        # The processes of the pool can not be shared with forked server
+        # processes. A new pool is only created if it is safe to fork.
+        with self._condition:
+            if self._pid != os.getpid():
+                self._pool = None
+                self._pid = os.getpid()
+                # Jobs of the pool of the parent process never finish
+                # in this process.
+                self._running -= len(self._pending)
+                self._pending = []
+                if threading.active_count() == 1:
+                    self._pool = multiprocessing.Pool(self.processes)
+                else:
+                    log.warning("Can not start the password pool in a "
+                                "threaded process. Passwords are "
+                                "verified in the calling thread.")
+            return self._pool
+
+    def _acquire(self):
+        limit = self.concurrency or self.processes
+        if not limit:
+            return
+        deadline = time.time() + self.wait
+        with self._condition:
+            while True:
+                self._collect()
+                if self._running < limit:
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise PasswordPoolBusyException("Too many concurrent "
+                                                    "password checks")
+                # Timed out jobs do not notify when they are finished.
+                if self._pending:
+                    remaining = min(remaining, 0.1)
+                self._condition.wait(remaining)
+            self._running += 1
+
+    def _collect(self):
+        # Frees the slots of timed out jobs which are finished now.
+        for result in [r for r in self._pending if r.ready()]:
+            self._pending.remove(result)
+            self._running -= 1
+
+    def _release(self):
+        with self._condition:
+            self._running = max(self._running - 1, 0)
+            self._condition.notify()
+
+    def verify(self, password, pwhash):
+        """Will verify the password and return a tuple of the result
+        and a new hash of the password if the pwhash needs to be
+        updated (else None).
+
+        :password: unencrypted password
+        :pwhash: encrypted password
+        :returns: Tuple (True or False, new pwhash or None)
+        """
+        self._acquire()
+        release = True
+        try:
+            pool = self.processes and self._get_pool()
+            if not pool:
+                return _verify_password(password, pwhash)
+            result = pool.apply_async(_verify_password, (password, pwhash))
+            try:
+                return result.get(self.timeout)
+            except multiprocessing.TimeoutError:
+                # The process is still busy with the job. Its slot is
+                # freed when the job is finished. See _collect.
+                release = False
+                with self._condition:
+                    self._pending.append(result)
+                log.warning("Password check in the pool timed out.")
+                raise PasswordPoolBusyException("Password check timed "
+                                                "out")
+        finally:
+            if release:
+                self._release()
+
+
+class LoginAudit(object):
+
+    """Buffer for the :class:`Login` entries of login attempts. If a
+    batch size is set the entries are collected and written together
+    if the batch is full or at the latest after `interval` seconds by a
+    timer. Else the entries are added to the session of the user. Every
+    process writes its own buffer."""
+
+    def __init__(self, batch=0, interval=5):
+        """Intitialises a new LoginAudit buffer.
+
+        :batch: Number of entries written together. If 0 the entries
+                are not buffered.
+        :interval: Maximum number of seconds an entry is buffered.
+        """
+        self.batch = batch
+        self.interval = interval
+        self._rows = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def add(self, user, success):
+        """Will add a new login attempt of the user.
+
+        :user: User instance
+        :success: True if the login was successfull
+        :returns: None
+        """
+        if not self.batch:
+            Login(user, success=success)
+            return
+        with self._lock:
+            if not self._rows:
+                self._timer = threading.Timer(self.interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+            self._rows.append({"uid": user.id,
+                               "success": success,
+                               "datetime": datetime.utcnow()})
+            flush = len(self._rows) >= self.batch
+        if flush:
+            self.flush()
+
+    def flush(self):
+        """Will write all buffered entries to the database.
+
+        :returns: None
+        """
+        with self._lock:
+            rows, self._rows = self._rows, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not rows:
+            return
+        try:
+            with DBSession.bind.begin() as connection:
+                connection.execute(Login.__table__.insert(), rows)
+        except Exception:
+            log.exception("Can not write %s login attempts" % len(rows))
+
+
+PASSWORD_POOL = PasswordPool()
+LOGIN_AUDIT = LoginAudit()
+atexit.register(LOGIN_AUDIT.flush)
+
+
 def load_user(login):
     """Will return the user with the given login
     name. If no user can be found with the given login "None" will be
@@ -178,6 +402,22 @@ def setup_ringo_security(config):
     #            pyramid_cookbook/en/latest/auth/ \
     #            user_object.html
     config.add_request_method(get_user, 'user', reify=True)
+    # Make a cached snapshot of the identity of the user available as
+    # attribute "identity" in the request. See :func:`get_identity`.
+    config.add_request_method(get_identity, 'identity', reify=True)
+
+    # Setup the pool to verify passwords and the buffer for the logins.
+    PASSWORD_POOL.processes = int(settings.get("security.password_workers",
+                                               0))
+    PASSWORD_POOL.concurrency = int(settings.get(
+        "security.password_concurrency", 0))
+    PASSWORD_POOL.wait = float(settings.get("security.password_wait", 10))
+    PASSWORD_POOL.timeout = float(settings.get("security.password_timeout",
+                                               10))
+    PASSWORD_POOL.start()
+    LOGIN_AUDIT.batch = int(settings.get("security.login_audit_batch", 0))
+    LOGIN_AUDIT.interval = float(settings.get(
+        "security.login_audit_interval", 5))
 
     # Add subscriber to check the CSRF token in POST requests. You can
     # disable this for testing by setting the
@@ -213,6 +453,69 @@ def get_user(request):
     return None
 
 
+class UserSnapshot(object):
+
+    """Read only snapshot of the identity of a user. The snapshot holds
+    everything which is needed to check the permissions of the user
+    without loading the user from the database. See
+    :func:`get_identity`."""
+
+    __slots__ = ("id", "login", "roles", "groups", "principals")
+
+    def __init__(self, user):
+        self.id = user.id
+        """ID of the user"""
+        self.login = user.login
+        """Login of the user"""
+        self.roles = frozenset([role.name for role in user.roles])
+        """Names of the roles of the user"""
+        self.groups = frozenset([group.id for group in user.groups])
+        """IDs of the groups of the user"""
+        self.principals = tuple(get_user_principals(user))
+        """Principals of the user. See :func:`get_user_principals`"""
+
+    @property
+    def admin(self):
+        """True if the user has the admin role"""
+        return "admin" in self.roles
+
+    def has_role(self, role):
+        """Return True if the user has the given role. Else False"""
+        return role in self.roles
+
+
+def get_identity(request):
+    """Returns a :class:`UserSnapshot` of the current user or None if
+    there is no user. The snapshot is only built once per request.
+
+    If the cache of users is enabled the snapshots of authenticated
+    users are cached between the requests. Cached snapshots are
+    invalidated if users, roles or usergroups are modified. This way
+    the user only needs to be loaded from the database if its
+    attributes are actually needed (e.g by accessing `request.user`).
+
+    :request: Current request
+    :returns: :class:`UserSnapshot` or None
+    """
+    identity = getattr(request, "_identity", False)
+    if identity is not False:
+        return identity
+    userid = unauthenticated_userid(request)
+    identity = None
+    if userid is not None:
+        identity = CACHE_USERS.get(userid)
+    if identity is None:
+        version = CACHE_USERS.version()
+        user = request.user
+        if user is not None:
+            identity = UserSnapshot(user)
+            if userid is not None and user.id == userid:
+                CACHE_USERS.set(userid, identity,
+                                ["users", "roles", "usergroups"], version)
+    request._identity = identity
+    return identity
+
+
 def has_permission(permission, context, request):
     """Wrapper for pyramid's buitin has_permission function.  This
     wrapper sets dynamically the __acl__ attribute of the given context
@@ -222,13 +525,17 @@ def has_permission(permission, context, request):
     Context can be:
     * Instance of BaseItem
     * Subclass of BaseItem
+    * Instance of ProjectionRow
     * Ressource, built from a RessourceFactory
 
     If context is an instance or subclass of BaseItem the wrapper will
     dynamically set the __acl__ attribute. This attribute is used by the
     pyramid's has_permission function the check the permission. If the
     context is a resource the function does nothing as the resource
-    already has the __acl__ attribute set.
+    already has the __acl__ attribute set. :class:`.ProjectionRow`
+    instances do not provide an ACL and are checked against the grants
+    of their clazz using the owner, group and states of the row. See
+    :func:`check_permission_grants`.
 
     If the user has the permission the it returns True, else False
     (Actually it returns a boolean like object, see pyramids
@@ -240,14 +547,98 @@ def has_permission(permission, context, request):
     :returns: True or False (Boolean like object)
 
     """
+    if isinstance(context, ProjectionRow):
+        identity = get_identity(request)
+        if identity is not None and identity.admin:
+            return True
+        grants = get_permission_grants(permission, context.__model__,
+                                       request)
+        return check_permission_grants(grants or [], context, request)
     if isinstance(context, BaseItem) or hasattr(context, "_modul_id"):
         modul = get_item_modul(request, context)
+        # Items with the default permissions are checked directly
+        # against the principals of the user without building the ACL.
+        principals = get_principal_set(request)
+        if principals is not None and _has_default_permissions(context):
+            return check_permission(permission, modul, context, principals)
         context.__acl__ = context._get_permissions(modul, context, request)
     # Call of has_permission will trigger 4 additional SQL-Queries. The
     # query will only be trigger once per request.
     return has_permission_(permission, context, request)
 
 
+def has_permission_many(permission, items, request):
+    """Returns a list of flags which tell if the user of the request
+    has the permission on the item at the same position in the given
+    list of items. Items with the default permissions are grouped by
+    their clazz, current states, owner and group as their ACL only
+    depends on these attributes. The permission is only checked once
+    for every group. Other items are checked one by one. See
+    :func:`has_permission`.
+
+    :permission: String. Name of the permission. E.g list, create, read
+    :items: List of instances or subclasses of BaseItem
+    :request: current request
+    :returns: List of True or False
+    """
+    results = []
+    groups = {}
+    for item in items:
+        key = _get_permission_group(item)
+        if key is None:
+            results.append(bool(has_permission(permission, item, request)))
+            continue
+        allowed = groups.get(key)
+        if allowed is None:
+            allowed = bool(has_permission(permission, item, request))
+            groups[key] = allowed
+        results.append(allowed)
+    return results
+
+
+def _get_permission_group(item):
+    """Returns a hashable key of the attributes the ACL of the item
+    depends on. Items with the same key have the same ACL. If the ACL
+    might depend on other attributes None is returned."""
+    if isinstance(item, BaseItem):
+        clazz = item.__class__
+    elif isinstance(item, ProjectionRow):
+        clazz = item.__model__
+    elif isinstance(item, type) and hasattr(item, "_modul_id"):
+        clazz = item
+    else:
+        return None
+    if not _has_default_permissions(clazz):
+        return None
+    if clazz is item:
+        return (clazz,)
+    states = tuple([getattr(item, key) for key
+                    in sorted(getattr(clazz, "_statemachines", {}))])
+    return (clazz, states,
+            getattr(item, "uid", None), getattr(item, "gid", None))
+
+
+def get_principal_set(request):
+    """Returns the effective principals of the current user as
+    frozenset. The principals are only computed once per request. If
+    the permissions are not checked by pyramid's ACL authorization
+    policy None is returned.
+
+    :request: Current request
+    :returns: frozenset of principals or None
+    """
+    principals = getattr(request, "_principal_set", None)
+    if principals is None:
+        registry = request.registry
+        if (not isinstance(registry.queryUtility(IAuthorizationPolicy),
+                           ACLAuthorizationPolicy)
+           or registry.queryUtility(IAuthenticationPolicy) is None):
+            return None
+        principals = frozenset(request.effective_principals)
+        request._principal_set = principals
+    return principals
+
+
 def get_permissions(modul, item=None):
     """Will return a list permissions attached to the modul and
     optionally to particular item of the modul. The returned list is
@@ -275,6 +666,12 @@ def get_permissions(modul, item=None):
     :item: Optional: Item of the model for which the permissons as
            returned
     :returns: List of permissions
+
+    The permissions only depend on the modul, the current states and
+    the owner and group of the item. So the ACL is compiled once for
+    every combination of modul and states into a template (See
+    :func:`_get_acl_template`) in which only the owner and group of the
+    item are filled in.
     """
     perms = []
     # Default permisson. Admins should be allowed to to everything.
@@ -282,6 +679,58 @@ def get_permissions(modul, item=None):
     if not modul:
         return perms
 
+    mode, current_states = _get_acl_context(item)
+    template = _get_acl_template(modul, mode, current_states)
+    if mode == "owned":
+        uid = ';uid:%s' % item.uid
+        gid = ';group:%s' % item.gid
+    for principal, permission, owned in template:
+        if owned:
+            perms.append((Allow, principal + uid, permission))
+            perms.append((Allow, principal + gid, permission))
+        else:
+            perms.append((Allow, principal, permission))
+    return perms
+
+
+def check_permission(permission, modul, item, principals):
+    """Returns True if a user with the given principals has the
+    permission on the item of the modul. The result is the same as
+    checking the permission with pyramid's ACL authorization policy on
+    the ACL returned by :func:`get_permissions` but without building
+    and walking the ACL. Instead the principals of the user are
+    intersected with the principals which are granted the permission
+    in the compiled ACL template.
+
+    :permission: Name of the permission. E.g read
+    :modul: The modul of the item
+    :item: Instance or subclass of BaseItem
+    :principals: frozenset of the principals of the user. See
+                 :func:`get_principal_set`
+    :returns: True or False
+    """
+    if 'role:admin' in principals:
+        return True
+    if not modul:
+        return False
+    mode, states = _get_acl_context(item)
+    granted, owned = _get_acl_principals(modul, mode, states).get(
+        permission, (frozenset(), ()))
+    if not granted.isdisjoint(principals):
+        return True
+    if owned:
+        uid = ';uid:%s' % item.uid
+        gid = ';group:%s' % item.gid
+        for principal in owned:
+            if principal + uid in principals or principal + gid in principals:
+                return True
+    return False
+
+
+def _get_acl_context(item):
+    """Returns a tuple of the mode and the current states of the item
+    which determine the ACL template of the item. See
+    :func:`_get_acl_template`."""
     # Load current states for the item as we need to check which
     # permissions the user has depending on the current states of the item.
     current_states = []
@@ -289,8 +738,104 @@ def get_permissions(modul, item=None):
         for smname in item._statemachines:
             sm = item.get_statemachine(smname)
             state = sm.get_state()
-            current_states.append(state)
+            current_states.append((smname, state))
 
+    if not isinstance(item, BaseItem):
+        mode = "class"
+    elif item and hasattr(item, 'uid'):
+        mode = "owned"
+    else:
+        mode = "item"
+    return mode, current_states
+
+
+_acl_signatures = weakref.WeakKeyDictionary()
+"""Signatures of the loaded moduls. See :func:`_get_acl_signature`"""
+
+
+def _get_acl_signature(modul):
+    """Returns a hashable signature of the actions of the modul and the
+    roles which are allowed to call the actions. The signature changes
+    if actions, roles or permissions of the modul are changed. It is
+    only computed once for every loaded modul."""
+    signature = _acl_signatures.get(modul)
+    if signature is None:
+        actions = []
+        for action in modul.actions:
+            roles = tuple([(role.name, role.admin) for role in action.roles])
+            actions.append((action.name, action.permission,
+                            action.admin, roles))
+        signature = (modul.id, tuple(actions))
+        _acl_signatures[modul] = signature
+    return signature
+
+
+def _get_acl_template(modul, mode, states):
+    """Returns the compiled ACL template for items of the modul in the
+    given states. Templates are cached process wide. The key of a
+    template includes the signature of the modul (See
+    :func:`_get_acl_signature`) so that modified actions, roles or
+    permissions are respected even if they are modified in another
+    process. Further the templates are invalidated if moduls, actions
+    or roles are modified in this process.
+
+    Every entry of the template is a tuple of the principal, the
+    permission and a flag if the principal must be bound to the owner
+    and group of the item.
+
+    :modul: The modul of the items
+    :mode: "class" for permissions on modul level, "owned" for items
+           with an owner and group and "item" for other items.
+    :states: List of tuples with the name of the statemachine and the
+             current state of the item.
+    :returns: Tuple of template entries
+    """
+    key = (_get_acl_signature(modul), mode,
+           tuple([(smname, state._id) for smname, state in states]))
+    template = CACHE_ACL_TEMPLATES.get(key)
+    if template is None:
+        version = CACHE_ACL_TEMPLATES.version()
+        template = _compile_acl_template(modul, mode,
+                                         [state for smname, state in states])
+        CACHE_ACL_TEMPLATES.set(key, template,
+                                ["modules", "actions", "roles"], version)
+    return template
+
+
+def _get_acl_principals(modul, mode, states):
+    """Returns a dictionary with the permissions of the ACL template as
+    key and a tuple of a frozenset of principals which are granted the
+    permission and a tuple of principals which are granted the
+    permission if they are bound to the owner or group of the item. See
+    :func:`_get_acl_template`."""
+    key = (_get_acl_signature(modul), mode,
+           tuple([(smname, state._id) for smname, state in states]),
+           "principals")
+    principals = CACHE_ACL_TEMPLATES.get(key)
+    if principals is None:
+        version = CACHE_ACL_TEMPLATES.version()
+        granted = {}
+        owned = {}
+        for principal, permission, bound in _get_acl_template(modul, mode,
+                                                              states):
+            if bound:
+                owned.setdefault(permission, []).append(principal)
+            else:
+                granted.setdefault(permission, set()).add(principal)
+        principals = {}
+        for permission in set(granted.keys()) | set(owned.keys()):
+            principals[permission] = (
+                frozenset(granted.get(permission, [])),
+                tuple(owned.get(permission, [])))
+        CACHE_ACL_TEMPLATES.set(key, principals,
+                                ["modules", "actions", "roles"], version)
+    return principals
+
+
+def _compile_acl_template(modul, mode, states):
+    """Compiles the ACL template for items of the modul in the given
+    states. See :func:`_get_acl_template`."""
+    template = []
     # No need to call get_item_actions. We only need the modul actions
     # here as all other ActionItem added dynamically to the items clazz
     # (e.g Mixin actions), will map their permission to one of the
@@ -308,7 +853,7 @@ def get_permissions(modul, item=None):
 
             # Check if the actions is available in the current state of
             # the item if the item has states.
-            for state in current_states:
+            for state in states:
                 if str(action.name.lower()) in state.get_disabled_actions(role.name):
                     add_perm = False
                     continue
@@ -317,31 +862,218 @@ def get_permissions(modul, item=None):
             # ownership checks. If item is class than check is on modul
             # level.
             if (role.admin is True or action.admin is True) and add_perm:
-                perms.append((Allow, default_principal, permission))
+                template.append((default_principal, permission, False))
 
             # Modul level (class level) permissions.
             # Always add the default principals for the create and list
             # actions as those actions can not be checked on item level
             # anyway.
             elif permission in ['create', 'list']:
-                perms.append((Allow, default_principal, permission))
+                template.append((default_principal, permission, False))
 
             # If the item is not an instance of a BaseItem then add
             # we want to get the permission on modul
             # level too. So again add the default principal
-            elif not isinstance(item, BaseItem) and add_perm:
-                perms.append((Allow, default_principal, permission))
+            elif mode == "class" and add_perm:
+                template.append((default_principal, permission, False))
 
             # If the item has a uuid the we want get the permission on
             # Item level. Only allow the owner or members of the items
             # group.
-            elif item and hasattr(item, 'uid') and add_perm:
-                principal = default_principal + ';uid:%s' % item.uid
-                perms.append((Allow, principal, permission))
-                principal = default_principal + ';group:%s' % item.gid
-                perms.append((Allow, principal, permission))
+            elif mode == "owned" and add_perm:
+                template.append((default_principal, permission, True))
 
-    return perms
+    return tuple(template)
+
+
+def _has_default_permissions(clazz):
+    """Returns True if the permissions of the clazz are build by
+    :func:`get_permissions`. If the clazz implements its own
+    `_get_permissions` method the permissions can only be checked by
+    building the ACL for every single item."""
+    return (clazz._get_permissions.__func__ is
+            BaseItem._get_permissions.__func__)
+
+
+def get_permission_grants(permission, clazz, request):
+    """Returns a list of grants for the given permission on items of
+    the clazz for the current user. The grants are compiled from the
+    actions of the modul and the roles of the user the same way as the
+    ACL is build in :func:`get_permissions`. This way the permission of
+    many items can be checked without building the ACL for every item.
+
+    Every grant is a tuple of two elements:
+
+    1. A flag if the user must be the owner or member of the group of
+       the item.
+    2. A tuple of statemachine restrictions. Every restriction is a
+       tuple of the name of the state attribute, the ids of the states
+       in which the action is disabled, the ids of all states and the id
+       of the initial state of the statemachine.
+
+    The user has the permission on an item if at least one of the
+    grants is fulfilled. See :func:`check_permission_grants` and
+    :func:`get_permission_filter`.
+
+    If the clazz implements its own permission checks None is returned.
+
+    :permission: Name of the permission. E.g read
+    :clazz: Subclass of BaseItem
+    :request: Current request
+    :returns: List of grants or None
+    """
+    if not _has_default_permissions(clazz):
+        return None
+    grants = []
+    user = get_identity(request)
+    if user is None:
+        return grants
+    modul = get_item_modul(request, clazz)
+    roles = user.roles
+
+    statemachines = {}
+    for key, sm in getattr(clazz, "_statemachines", {}).iteritems():
+        sm = sm(None, key)
+        statemachines[key] = (sm.get_states(ignore_checks=True), sm._root)
+
+    for action in modul.actions:
+        if (action.permission or action.name.lower()) != permission:
+            continue
+        for role in action.roles:
+            if role.name not in roles:
+                continue
+            if permission in ['create', 'list']:
+                # Modul level permissions. No further checks
+                grant = (False, ())
+            else:
+                restrictions = []
+                for key, (states, root) in statemachines.iteritems():
+                    disabled = frozenset(
+                        [st._id for st in states
+                         if str(action.name.lower())
+                         in st.get_disabled_actions(role.name)])
+                    if disabled:
+                        restrictions.append((key, disabled,
+                                             frozenset([st._id
+                                                        for st in states]),
+                                             root._id))
+                owned = not (role.admin is True or action.admin is True)
+                grant = (owned, tuple(restrictions))
+            if grant not in grants:
+                grants.append(grant)
+    return grants
+
+
+def check_permission_grants(grants, item, request):
+    """Returns True if at least one of the grants is fulfilled for the
+    given item and the current user.
+
+    :grants: List of grants. See :func:`get_permission_grants`
+    :item: Instance of BaseItem or ProjectionRow
+    :request: Current request
+    :returns: True or False
+    """
+    user = get_identity(request)
+    for owned, restrictions in grants:
+        disabled = False
+        for key, disabled_ids, state_ids, root_id in restrictions:
+            # Unknown states are handled as the initial state by the
+            # statemachine.
+            state_id = getattr(item, key)
+            if state_id not in state_ids:
+                state_id = root_id
+            if state_id in disabled_ids:
+                disabled = True
+                break
+        if disabled:
+            continue
+        if not owned:
+            return True
+        if not hasattr(item, 'uid'):
+            continue
+        if item.uid == user.id or item.gid in user.groups:
+            return True
+    return False
+
+
+def get_permission_filter(permission, clazz, request):
+    """Returns a SQL criterion which only matches items of the clazz on
+    which the current user has the given permission. The criterion is
+    the SQL version of the grants returned by
+    :func:`get_permission_grants`.
+
+    If the clazz implements its own permission checks None is returned.
+    In this case the items must be checked in the application.
+
+    :permission: Name of the permission. E.g read
+    :clazz: Subclass of BaseItem
+    :request: Current request
+    :returns: SQL criterion or None
+    """
+    user = get_identity(request)
+    if user is not None and user.admin:
+        return sa.true()
+    grants = get_permission_grants(permission, clazz, request)
+    if grants is None:
+        return None
+    clauses = []
+    for owned, restrictions in grants:
+        criterion = []
+        for key, disabled_ids, state_ids, root_id in restrictions:
+            column = getattr(clazz, key)
+            if root_id in disabled_ids:
+                allowed_ids = state_ids - disabled_ids
+                if not allowed_ids:
+                    criterion = None
+                    break
+                criterion.append(column.in_(list(allowed_ids)))
+            else:
+                criterion.append(sa.or_(column.is_(None),
+                                        ~column.in_(list(disabled_ids))))
+        if criterion is None:
+            continue
+        if owned:
+            if not hasattr(clazz, 'uid'):
+                continue
+            groups = sorted(user.groups)
+            if groups:
+                criterion.append(sa.or_(clazz.uid == user.id,
+                                        clazz.gid.in_(groups)))
+            else:
+                criterion.append(clazz.uid == user.id)
+        if not criterion:
+            # At least one grant without any restrictions.
+            return sa.true()
+        clauses.append(sa.and_(*criterion))
+    if not clauses:
+        return sa.false()
+    return sa.or_(*clauses)
+
+
+def get_permission_fingerprint(permission, clazz, request):
+    """Returns a hashable fingerprint of the grants of the current user
+    for the given permission on items of the clazz. Users with the same
+    fingerprint have the permission on the same items. The fingerprint
+    only includes the user and its groups if the grants depend on the
+    ownership of the items.
+
+    If the clazz implements its own permission checks None is returned.
+
+    :permission: Name of the permission. E.g read
+    :clazz: Subclass of BaseItem
+    :request: Current request
+    :returns: Fingerprint or None
+    """
+    grants = get_permission_grants(permission, clazz, request)
+    if grants is None:
+        return None
+    user = get_identity(request)
+    if user is not None and user.admin:
+        return (permission, "admin")
+    owner = None
+    if [owned for owned, restrictions in grants if owned]:
+        owner = (user.id, user.groups)
+    return (permission, frozenset(grants), owner)
 
 
 def __add_principal(principals, new):
@@ -362,10 +1094,22 @@ def get_principals(userid, request):
     :returns: list with pricipals
 
     """
-    if request.user:
-        user = request.user
+    identity = get_identity(request)
+    if identity is not None and identity.id == userid:
+        principals = list(identity.principals)
     else:
-        user = _load_user(userid, request)
+        principals = get_user_principals(_load_user(userid, request))
+    log.debug('Principals for userid "%s": %s' % (userid, principals))
+    return principals
+
+
+def get_user_principals(user):
+    """Returns a list of principals for the given user. See
+    :func:`get_principals`.
+
+    :user: User instance or None
+    :returns: list with principals
+    """
     principals = []
     if user:
         # Add the roles of the user. The roles will be added in
@@ -386,7 +1130,6 @@ def get_principals(userid, request):
         principal = 'uid:%s' % user.id
         __add_principal(principals, principal)
     principals.sort(key=len, reverse=True)
-    log.debug('Principals for userid "%s": %s' % (userid, principals))
     return principals
 
 
@@ -540,10 +1283,22 @@ def request_password_reset(username, db):
     return user
 
 
+def _is_listed(clazz, name):
+    """Returns True if the column with the given name is displayed in
+    one of the tables of the clazz."""
+    config = get_table_config(clazz).config
+    return any([name in [col.get("name") for col in table.get("columns", [])]
+                for table in config.values()])
+
+
 def login(username, password):
     """Returns a `User` instance if the login does not fail with the
     given login and password.
 
+    The password is verified in the :data:`PASSWORD_POOL`. A
+    :class:`PasswordPoolBusyException` is raised if the password can
+    not be verified because of too many concurrent logins.
+
     :username: username as String
     :password: password as SHA1 encrypted string
     :returns: `User` instance if login is OK else None.
@@ -552,22 +1307,25 @@ def login(username, password):
     log.debug("Login user '%s' with pw '%s'" % (username, password))
     user = load_user(username)
     if user:
-        if verify_password(password, user.password):
+        valid, pwhash = PASSWORD_POOL.verify(password, user.password)
+        if valid:
             if user.activated:
-                Login(user, success=True)
+                LOGIN_AUDIT.add(user, success=True)
                 user.last_login = datetime.utcnow()
+                if _is_listed(User, "last_login"):
+                    CACHE_ITEM_LISTS.invalidate(User.__tablename__)
                 log.info("Login successfull '%s'" % (username))
-                if passwords_needs_update(user.password):
+                if pwhash is not None:
                     log.info("Updating password for user '%s'" % (username))
-                    user.password = encrypt_password(password)
+                    user.password = pwhash
                 return user
             else:
-                Login(user, success=False)
+                LOGIN_AUDIT.add(user, success=False)
                 log.info("Login failed for user '%s'. "
                          "Reason: Not activated" % username)
                 return user
         else:
-            Login(user, success=False)
+            LOGIN_AUDIT.add(user, success=False)
             log.info("Login failed for user '%s'. "
                      "Reason: Wrong password" % username)
     else:
@@ -578,6 +1336,7 @@ def login(username, password):
 
 def get_last_successfull_login(request, user):
     if user is not None:
+        LOGIN_AUDIT.flush()
         result = request.db.query(Login) \
             .filter(Login.success == True, Login.uid == user.id) \
             .order_by(Login.datetime.desc()) \
@@ -590,6 +1349,7 @@ def get_last_successfull_login(request, user):
 def get_last_failed_login(request, user):
     result = None
     if user is not None:
+        LOGIN_AUDIT.flush()
         result = request.db.query(Login) \
             .filter(Login.success == False, Login.uid == user.id) \
             .order_by(Login.datetime.desc()) \
@@ -610,6 +1370,7 @@ def get_last_logins(request, since, success=None):
     if request.user is None:
         return []
 
+    LOGIN_AUDIT.flush()
     result = request.db.query(Login) \
         .filter(Login.datetime > since, Login.uid == request.user.id) \
         .order_by(Login.id.desc()) \
@@ -625,6 +1386,12 @@ class AuthentificationException(Exception):
     pass
 
 
+class PasswordPoolBusyException(AuthentificationException):
+    """Exception to be raise if a password can not be verified because
+    of too many concurrent password checks."""
+    pass
+
+
 class AuthorizationException(Exception):
     """Exception to be raise if a authorization error is detected."""
     pass
@@ -718,16 +1485,21 @@ class ValueChecker(object):
             else:
                 to_check = self._diff(old_values, new_values)
 
+            # If the relation is a ModulItem or is not a Baseitem at
+            # all also do no checks.
+            # Modulitem do not have any uid or gid which will allow
+            # checking permissions. Allowing links to a modul item
+            # is currently not known to be a security thread.
+            checked = [value for value, modifier in to_check
+                       if isinstance(value, BaseItem)
+                       and not isinstance(value, ModulItem)]
+            linkable = iter(has_permission_many("link", checked, request))
+
             # Now iterate over all value which need to be checked.
             for value, modifier in to_check:
-                # If the relation is a ModulItem or is not a Baseitem at
-                # all also do no checks.
-                # Modulitem do not have any uid or gid which will allow
-                # checking permissions. Allowing links to a modul item
-                # is currently not known to be a security thread.
                 if (isinstance(value, ModulItem)
-                    or has_permission("link", value, request)
-                    or not isinstance(value, BaseItem)):
+                    or not isinstance(value, BaseItem)
+                    or next(linkable)):
                     continue
                 else:
                     if modifier > 0:
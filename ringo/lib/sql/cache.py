@@ -1,6 +1,19 @@
 import os
 import md5
+import logging
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
 from dogpile.cache.region import make_region
+from ringo.lib.cache import (
+    CACHE_ITEM_LISTS,
+    CACHE_ITEM_COUNTS,
+    CACHE_ACL_TEMPLATES,
+    CACHE_USERS,
+    CACHE_BLOBFORM_CONFIG,
+    MODUL_REGISTRY
+)
+
+log = logging.getLogger(__name__)
 
 # Cache initialisation
 ########################
@@ -64,3 +77,145 @@ def invalidate_cache(cache_regions=[]):
             regions[key].invalidate()
 
 
+# Process wide cache of item lists
+##################################
+
+
+def _freeze(value):
+    """Returns a hashable version of the value by converting lists
+    and dictionaries into tuples."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.iteritems()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def get_item_list_key(request, clazz, user, params, cache=CACHE_ITEM_LISTS):
+    """Returns the key for a list of items of the clazz in the process
+    wide cache of item lists. The key consists of the modul, the
+    fingerprint of the read permission of the user (see
+    :func:`ringo.lib.security.get_permission_fingerprint`) and the given
+    parameters of the list. If the list can not be cached (e.g. the
+    cache is disabled or the permissions of the clazz can not be
+    fingerprinted) None is returned.
+
+    :request: Current request
+    :clazz: Clazz of the items
+    :user: User for which the items are filtered. None if the items are
+           not filtered.
+    :params: Parameters of the list
+    :cache: Cache for which the key is used. Defaults to the cache of
+            item lists.
+    :returns: Key or None
+    """
+    from ringo.lib.security import get_permission_fingerprint
+    if not cache.maxsize:
+        return None
+    fingerprint = None
+    if user is not None:
+        fingerprint = get_permission_fingerprint("read", clazz, request)
+        if fingerprint is None:
+            return None
+    return (clazz.__tablename__, fingerprint, request.locale_name,
+            _freeze(params))
+
+
+def get_cached_items(request, key):
+    """Returns a tuple with the cached items for the key and the extra
+    value stored with the items. Mapped items are loaded again by their
+    ids in a single query. If there are no cached items or some of the
+    items do not exist anymore None is returned.
+
+    :request: Current request
+    :key: Key of the list. See :func:`get_item_list_key`
+    :returns: Tuple of items and extra value or None
+    """
+    from ringo.lib.sql.loading import eager_load
+    if key is None:
+        return None
+    value = CACHE_ITEM_LISTS.get(key)
+    if value is None:
+        return None
+    rows, mapped, extra = value
+    if rows is not None:
+        return list(rows), extra
+    clazz, ids, plan = mapped
+    if not ids:
+        return [], extra
+    query = request.db.query(clazz).filter(clazz.id.in_(ids))
+    items = dict((item.id, item)
+                 for item in eager_load(query, clazz, plan or {}))
+    if len(items) != len(ids):
+        return None
+    return [items[id] for id in ids], extra
+
+
+def set_cached_items(key, items, tables, version, extra=None, plan=None):
+    """Stores the items in the process wide cache of item lists.
+    Only the ids of mapped items are stored. The items are loaded again
+    by their ids using the given eager load plan. This way only the
+    expensive part of the query (permissions, search, sorting and
+    pagination) is cached and no loaded items are shared between the
+    sessions. Other items (e.g :class:`ringo.model.base.ProjectionRow`)
+    are stored as they are and must not be modified.
+
+    :key: Key of the list. See :func:`get_item_list_key`
+    :items: List of items
+    :tables: Names of the tables the items depend on
+    :version: Version of the cache before loading the items
+    :extra: Extra value stored with the items
+    :plan: Eager load plan to load the mapped items again. See
+           :func:`ringo.lib.sql.loading.get_eager_load_plan`
+    """
+    if key is None:
+        return
+    if items and sa.inspect(items[0], raiseerr=False) is not None:
+        value = (None, (items[0].__class__, [item.id for item in items],
+                        plan), extra)
+    else:
+        value = (list(items), None, extra)
+    CACHE_ITEM_LISTS.set(key, value, tables, version)
+
+
+modul_tables = ["modules", "actions", "roles"]
+"""Names of the tables of the registry of moduls"""
+
+
+def invalidate_item_lists(request, item):
+    """Invalidates the cached item lists, counts of items, ACL
+    templates and users which depend on the table of the given item.
+    The lists are invalidated again after the session of the request
+    has been committed to also invalidate lists which were loaded by
+    other requests before the modification was committed.
+
+    If moduls, actions or roles are modified the version of the moduls
+    is increased to refresh the registry of the moduls in all
+    processes. See :class:`ringo.lib.cache.ModulRegistry`.
+
+    :request: Current request
+    :item: Created, modified or deleted item
+    """
+    table = item.__tablename__
+    CACHE_ITEM_LISTS.invalidate(table)
+    CACHE_ITEM_COUNTS.invalidate(table)
+    CACHE_ACL_TEMPLATES.invalidate(table)
+    CACHE_USERS.invalidate(table)
+    if table in modul_tables:
+        from ringo.model.modul import increase_modul_version
+        MODUL_REGISTRY.invalidate()
+        increase_modul_version(request.db)
+    if table == "forms":
+        CACHE_BLOBFORM_CONFIG.delete(("form", item.id))
+    request.db.info.setdefault("invalidated_tables", set()).add(table)
+
+
+@sa.event.listens_for(Session, "after_commit")
+def _invalidate_item_lists_after_commit(session):
+    for table in session.info.pop("invalidated_tables", ()):
+        CACHE_ITEM_LISTS.invalidate(table)
+        CACHE_ITEM_COUNTS.invalidate(table)
+        CACHE_ACL_TEMPLATES.invalidate(table)
+        CACHE_USERS.invalidate(table)
+        if table in modul_tables:
+            MODUL_REGISTRY.invalidate()
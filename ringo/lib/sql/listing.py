@@ -0,0 +1,622 @@
+"""Modul with functions to build SQL queries for listings of items.
+
+The functions translate the parameters of the overviews (search,
+sorting, pagination...) into SQL clauses. This way the work is done on
+the database and not in the application by the methods of the
+:class:`.BaseList`. Not every parameter can be translated into SQL.
+In this case the functions will tell the caller which parts need
+to be handled in the application."""
+import re
+import json
+import base64
+import decimal
+import logging
+import operator
+import dateutil.parser
+import sqlalchemy as sa
+from sqlalchemy.orm import (
+    ColumnProperty,
+    RelationshipProperty,
+    aliased,
+    class_mapper
+)
+from ringo.model.mixins import Searchable
+
+log = logging.getLogger(__name__)
+
+sql_opmapping = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "!=": operator.ne,
+    "==": operator.eq
+}
+"""Operators of the search which can be expressed in SQL. See
+:data:`ringo.model.base.opmapping` for all available operators."""
+
+search_types = (sa.String, sa.Integer)
+"""Types of columns which can be searched in SQL. Only columns are
+supported where the string representation of the value in the database
+is the same as the string representation of the value in python. This is
+not true e.g for dates (localised) or booleans."""
+
+
+def get_search_column(clazz, name, table_config):
+    """Returns the mapped column of the clazz for the given column name
+    of the table config if a search on this column can be expressed in
+    SQL. Otherwise None is returned.
+
+    A search can not be expressed in SQL if the column
+
+     * is not part of the searchable columns in the table config,
+     * has a renderer or needs to be expanded,
+     * is a relation, a dotted attribute or a python property,
+     * has an unsupported datatype (see :data:`search_types`).
+
+    :clazz: Clazz of the items
+    :name: Name of the column in the table config.
+    :table_config: :class:`.TableConfig` used for the search
+    :returns: Column or None
+    """
+    col = None
+    for tcol in table_config.get_columns():
+        if tcol.get("name") == name and tcol.get("searchable", True):
+            col = tcol
+            break
+    if col is None or col.get("renderer") or col.get("expand"):
+        return None
+    mapper = class_mapper(clazz)
+    if not mapper.has_property(name):
+        return None
+    prop = mapper.get_property(name)
+    if not isinstance(prop, ColumnProperty) or len(prop.columns) != 1:
+        return None
+    column = prop.columns[0]
+    if not isinstance(column.type, search_types):
+        return None
+    return getattr(clazz, name)
+
+
+def _get_search_operand(column, default):
+    """Returns a SQL expression of the string representation of the
+    column. NULL values are replaced by the given `default`. This way
+    the expression behaves like the string representation of the value
+    in python when used in a search."""
+    if not isinstance(column.property.columns[0].type, sa.String):
+        column = sa.cast(column, sa.Unicode)
+    return sa.func.coalesce(column, default)
+
+
+def _get_like_pattern(search):
+    """Returns a pattern for a LIKE expression which matches all values
+    including the search string. Wildcards in the search are escaped."""
+    pattern = (search.replace("\\", "\\\\")
+               .replace("%", "\\%")
+               .replace("_", "\\_"))
+    return u"%%%s%%" % pattern
+
+
+def _get_column_clause(column, search, search_op, regexpr):
+    """Returns a SQL clause for the search in a single column. See
+    :func:`get_search_clause`."""
+    if search_op:
+        operand = _get_search_operand(column, u"None")
+        return sql_opmapping[search_op](operand, search)
+    operand = _get_search_operand(column, u"")
+    if regexpr:
+        return operand.op("~*")(search)
+    return operand.ilike(_get_like_pattern(search), escape="\\")
+
+
+def get_search_clause(clazz, search, search_field, regexpr,
+                      table_config, dialect):
+    """Returns a SQL clause for a single filter of the filter stack.
+    See :func:`.BaseList.filter` for more details on the filter stack and
+    the semantic of the search. If the filter can not be expressed
+    in SQL None is returned.
+
+    :clazz: Clazz of the items
+    :search: Search expression. Optionally prefixed with an operator.
+    :search_field: Name of the column to search in. If empty the search
+                   will be done in all searchable columns.
+    :regexpr: Flag if the search expression is a regular expression.
+    :table_config: :class:`.TableConfig` used for the search
+    :dialect: Name of the SQL dialect of the database.
+    :returns: SQL clause or None
+    """
+    search_op = None
+    x = search.split(" ")
+    if x[0] in sql_opmapping:
+        search_op = x[0]
+        search = " ".join(x[1:])
+    elif x[0] == "~":
+        # Fuzzy search is only available in the application.
+        return None
+    if regexpr and not search_op:
+        # Regular expressions are only supported on PostgreSQL. Further
+        # we leave invalid expressions to the application to get the
+        # same error handling as before.
+        if dialect != "postgresql":
+            return None
+        try:
+            re.compile(search)
+        except re.error:
+            return None
+
+    if search_field:
+        fields = [search_field]
+    else:
+        fields = [col.get("name") for col in table_config.get_columns()
+                  if col.get("searchable", True)]
+
+    use_document = (not search_field and not search_op and
+                    issubclass(clazz, Searchable) and
+                    table_config.name == clazz._search_table)
+    doc_fields = []
+    if use_document:
+        doc_fields = clazz.get_search_fields(table_config)
+
+    clauses = []
+    doc_clauses = []
+    for field in fields:
+        column = get_search_column(clazz, field, table_config)
+        if column is None:
+            # A search over all columns can only be expressed in SQL if
+            # all of the columns can be expressed in SQL.
+            return None
+        clause = _get_column_clause(column, search, search_op, regexpr)
+        if field in doc_fields:
+            doc_clauses.append(clause)
+        else:
+            clauses.append(clause)
+
+    if use_document:
+        # The search document includes the values of the plain string
+        # columns. Do not wrap the column in any function as this would
+        # prevent using the index. The values are separated by newlines,
+        # so the regular expression is matched newline-sensitive. Items
+        # without a document are searched in the single columns.
+        if regexpr:
+            document = clazz.search_document.op("~*")(u"(?n)" + search)
+        else:
+            document = clazz.search_document.ilike(
+                _get_like_pattern(search), escape="\\")
+        clauses.append(document)
+        if doc_clauses:
+            clauses.append(sa.and_(clazz.search_document == None,
+                                   sa.or_(*doc_clauses)))
+    else:
+        clauses.extend(doc_clauses)
+    if not clauses:
+        return None
+    return sa.or_(*clauses)
+
+
+def filter_query(query, clazz, filter_stack, table_config):
+    """Will add the filters of the filter stack to the query. Filters
+    which can not be expressed in SQL are returned in a new filter stack
+    and must be applied later in the application using
+    :func:`.BaseList.filter`.
+
+    :query: SQL query
+    :clazz: Clazz of the items
+    :filter_stack: Filter stack. See :func:`.BaseList.filter`
+    :table_config: :class:`.TableConfig` used for the search
+    :returns: Tuple of the filtered query and the remaining filter stack
+    """
+    dialect = query.session.get_bind().dialect.name
+    remaining = []
+    for search, search_field, regexpr in filter_stack:
+        clause = get_search_clause(clazz, search, search_field, regexpr,
+                                   table_config, dialect)
+        if clause is None:
+            log.debug('Filter "%s" in "%s" is done in the application'
+                      % (search, search_field))
+            remaining.append((search, search_field, regexpr))
+        else:
+            query = query.filter(clause)
+    return query, remaining
+
+
+keyset_types = (sa.String, sa.Integer, sa.Numeric, sa.Date, sa.DateTime)
+"""Types of columns which can be used for keyset pagination. The values
+of the columns must be serializable into the cursor."""
+
+
+def get_keyset_column(clazz, name):
+    """Returns the mapped column of the clazz for the given name if the
+    column can be used for keyset pagination. Otherwise None is
+    returned. Only plain columns of the clazz with a type in
+    :data:`keyset_types` are supported.
+
+    :clazz: Clazz of the items
+    :name: Name of the attribute
+    :returns: Column or None
+    """
+    mapper = class_mapper(clazz)
+    if not name or not mapper.has_property(name):
+        return None
+    prop = mapper.get_property(name)
+    if not isinstance(prop, ColumnProperty) or len(prop.columns) != 1:
+        return None
+    if not isinstance(prop.columns[0].type, keyset_types):
+        return None
+    return getattr(clazz, name)
+
+
+def _dump_value(column, value):
+    if value is None:
+        return None
+    coltype = column.property.columns[0].type
+    if isinstance(coltype, (sa.Date, sa.DateTime)):
+        return value.isoformat()
+    if isinstance(coltype, sa.Numeric):
+        return unicode(value)
+    return value
+
+
+def _load_value(column, value):
+    if value is None:
+        return None
+    coltype = column.property.columns[0].type
+    if isinstance(coltype, sa.DateTime):
+        return dateutil.parser.parse(value)
+    if isinstance(coltype, sa.Date):
+        return dateutil.parser.parse(value).date()
+    if isinstance(coltype, sa.Numeric):
+        return decimal.Decimal(value)
+    return value
+
+
+def encode_cursor(clazz, sorting, size, page, item=None, direction="next"):
+    """Returns an opaque cursor which points to a page of a listing.
+    The cursor always includes the number of the page. If an item is
+    given and the sort column can be used for keyset pagination (see
+    :func:`get_keyset_column`) the cursor additionally includes the
+    sort value and the id of the item. In this case the page can be
+    loaded by seeking to the item instead of skipping all items of the
+    previous pages.
+
+    :clazz: Clazz of the items
+    :sorting: Tuple of fieldname and sortorder of the listing.
+    :size: Number of items per page.
+    :page: Number of the page the cursor points to.
+    :item: Last item of the previous page (direction "next") or the
+           first item of the following page (direction "prev").
+    :direction: Direction of the page relative to the given item.
+    :returns: Cursor as string
+    """
+    cursor = {"field": sorting[0], "order": sorting[1],
+              "size": size, "page": page}
+    column = get_keyset_column(clazz, sorting[0])
+    if item is not None and column is not None:
+        cursor["value"] = _dump_value(column, getattr(item, sorting[0]))
+        cursor["id"] = item.id
+        cursor["direction"] = direction
+    return base64.urlsafe_b64encode(json.dumps(cursor))
+
+
+def decode_cursor(cursor, sorting, size):
+    """Returns the decoded cursor as dictionary. If the cursor is
+    invalid or does not match the given sorting and size of the listing
+    None is returned. In this case the listing should start on the first
+    page.
+
+    :cursor: Cursor as returned by :func:`encode_cursor`
+    :sorting: Tuple of fieldname and sortorder of the listing.
+    :size: Number of items per page.
+    :returns: Dictionary or None
+    """
+    if not cursor:
+        return None
+    try:
+        cursor = json.loads(base64.urlsafe_b64decode(str(cursor)))
+    except (TypeError, ValueError):
+        log.warning("Invalid pagination cursor %s" % cursor)
+        return None
+    if not isinstance(cursor, dict):
+        return None
+    if (cursor.get("field") != sorting[0]
+       or cursor.get("order") != sorting[1]
+       or cursor.get("size") != size):
+        return None
+    return cursor
+
+
+def order_query_keyset(query, clazz, sorting, reverse=False):
+    """Will order the query for keyset pagination. The items are ordered
+    by the sort column and the id of the item as tiebreaker. NULL values
+    are always sorted behind all other values in ascending order
+    regardless of the database. If the sort column can not be used for
+    keyset pagination None is returned.
+
+    :query: SQL query
+    :clazz: Clazz of the items
+    :sorting: Tuple of fieldname and sortorder of the listing.
+    :reverse: Reverse the ordering.
+    :returns: Ordered query or None
+    """
+    column = get_keyset_column(clazz, sorting[0])
+    if column is None:
+        return None
+    nulls = sa.case([(column.is_(None), 1)], else_=0)
+    keys = [nulls, column, clazz.id]
+    if (sorting[1] == "desc") != reverse:
+        keys = [key.desc() for key in keys]
+    return query.order_by(*keys)
+
+
+def paginate_query_keyset(query, clazz, sorting, cursor, size):
+    """Returns the items of the page the cursor points to. The query
+    must not be ordered yet. Instead of skipping the items of the
+    previous pages the query will seek directly to the item in the
+    cursor. This way loading of a page has the same costs for every page
+    if the sort column is indexed.
+
+    If cursor is None the first page is returned. If the cursor does not
+    include an item the page is loaded by skipping the items of the
+    previous pages.
+
+    :query: SQL query
+    :clazz: Clazz of the items
+    :sorting: Tuple of fieldname and sortorder of the listing.
+    :cursor: Decoded cursor. See :func:`decode_cursor`
+    :size: Number of items per page.
+    :returns: List of items or None if the sort column can not be used
+              for keyset pagination.
+    """
+    column = get_keyset_column(clazz, sorting[0])
+    if column is None:
+        return None
+    if cursor is None or "id" not in cursor:
+        # The cursor does not point to a item. Fall back to skipping the
+        # items of the previous pages.
+        page = cursor and cursor.get("page") or 0
+        query = order_query_keyset(query, clazz, sorting)
+        return query.slice(page * size, (page + 1) * size).all()
+
+    value = _load_value(column, cursor["value"])
+    backwards = cursor.get("direction") == "prev"
+    # Seeking forward in ascending order means the items must be
+    # "greater" than the item in the cursor, where NULL is the greatest
+    # value.
+    if (sorting[1] == "desc") == backwards:
+        if value is None:
+            clause = sa.and_(column.is_(None), clazz.id > cursor["id"])
+        else:
+            clause = sa.or_(column > value, column.is_(None),
+                            sa.and_(column == value,
+                                    clazz.id > cursor["id"]))
+    else:
+        if value is None:
+            clause = sa.or_(column.isnot(None),
+                            sa.and_(column.is_(None),
+                                    clazz.id < cursor["id"]))
+        else:
+            clause = sa.or_(column < value,
+                            sa.and_(column == value,
+                                    clazz.id < cursor["id"]))
+    query = order_query_keyset(query.filter(clause), clazz,
+                               sorting, backwards)
+    items = query.limit(size).all()
+    if backwards:
+        items.reverse()
+    return items
+
+
+class ApproximateCount(int):
+
+    """Number of items in a listing which is not exactly known. The
+    kind of the number is "estimated" if the number has been estimated
+    by the database or "next" if it is only known that there is a page
+    after the current page."""
+
+    def __new__(cls, value, kind):
+        count = int.__new__(cls, value)
+        count.kind = kind
+        return count
+
+
+def estimate_query_count(query):
+    """Returns the number of items of the query as estimated by the
+    query planner of the database. Getting the estimate is much cheaper
+    than counting the items as the query is not executed. The estimate
+    is based on the statistics of the tables and might be far off.
+    Estimates are only supported on PostgreSQL. On other databases or
+    if the query can not be explained None is returned.
+
+    :query: SQL query
+    :returns: Estimated number of items or None
+    """
+    bind = query.session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    compiled = query.statement.compile(dialect=bind.dialect)
+    connection = query.session.connection()
+    # A failing statement would abort the whole transaction.
+    savepoint = connection.begin_nested()
+    try:
+        plan = connection.execute("EXPLAIN (FORMAT JSON) %s" % compiled,
+                                  compiled.params).scalar()
+        savepoint.commit()
+    except sa.exc.DBAPIError as e:
+        savepoint.rollback()
+        log.warning("Can not estimate number of items: %s" % e)
+        return None
+    if isinstance(plan, basestring):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def get_column_config(table_config, name):
+    """Returns the configuration of the column with the given name in
+    the table config. If there is no such column an empty dictionary is
+    returned."""
+    for col in table_config.get_columns():
+        if col.get("name") == name:
+            return col
+    return {}
+
+
+def _get_unicode_expression(column):
+    if not isinstance(column.property.columns[0].type, sa.String):
+        return sa.cast(column, sa.Unicode)
+    return column
+
+
+def _get_options_expression(clazz, name, column):
+    """Returns a CASE expression which maps the values of the column to
+    the literal value of the options of the field in the form config.
+    See :func:`ringo.model.base.BaseItem.get_value` for more details on
+    expanding. If the field has no options the column is returned."""
+    from ringo.model.base import get_option_lookup
+    from ringo.model.mixins import Blobform
+    if issubclass(clazz, Blobform):
+        # Form config of blobforms depends on the item.
+        return None
+    lookup = get_option_lookup(clazz, name, "read")
+    if lookup is None or not lookup.options:
+        return column
+    value = _get_unicode_expression(column)
+    whens = [(value == unicode(option), label)
+             for option, label in lookup.options]
+    return sa.case(whens, else_=value)
+
+
+def _get_state_expression(clazz, entity, name):
+    """Returns a CASE expression which maps the value of the state id
+    to the label of the state if the name refers to the state of a
+    statemachine. By convention the state is available in the
+    `<name>` property and the id is stored in the `<name>_id` column.
+    Otherwise None is returned."""
+    key = "%s_id" % name
+    statemachines = getattr(clazz, "_statemachines", {})
+    if key not in statemachines:
+        return None
+    column = getattr(entity, key)
+    statemachine = statemachines[key](None, key)
+    whens = [(column == state._id, state._label)
+             for state in statemachine.get_states(ignore_checks=True)]
+    if not whens:
+        return None
+    return sa.case(whens, else_=sa.null())
+
+
+def _get_str_repr_expression(clazz, entity, request):
+    """Returns an expression which builds the string representation
+    of the items of the clazz as defined in the modul (str_repr). The
+    expression is only available if the format string only has
+    "%s" placeholders and all fields are columns of a type in
+    :data:`search_types`. Otherwise None is returned."""
+    from ringo.lib.helpers.misc import get_item_modul
+    format_str, fields = get_item_modul(request, clazz).get_str_repr()
+    parts = format_str.split("%s")
+    if len(parts) != len(fields) + 1 or "%" in "".join(parts):
+        return None
+    mapper = class_mapper(clazz)
+    expr = sa.literal(unicode(parts[0]), sa.Unicode)
+    for field, part in zip(fields, parts[1:]):
+        if not mapper.has_property(field):
+            return None
+        prop = mapper.get_property(field)
+        if (not isinstance(prop, ColumnProperty)
+           or len(prop.columns) != 1
+           or not isinstance(prop.columns[0].type, search_types)):
+            return None
+        value = _get_unicode_expression(getattr(entity, field))
+        expr = expr + sa.func.coalesce(value, u"") + unicode(part)
+    # No related item has no string representation.
+    return sa.case([(entity.id.is_(None), sa.null())], else_=expr)
+
+
+def get_sort_expression(clazz, field, table_config, request):
+    """Returns a tuple of joins and an expression which can be used to
+    order a query of items of the clazz by the given field. The joins
+    are outer joins which must be added to the query to make the
+    expression available. If the sorting can not be expressed in SQL
+    None is returned.
+
+    The field can be
+
+     * a column of the clazz. If the column is configured to be
+       expanded in the table config the options of the field in the
+       form config are mapped in a CASE expression.
+     * a state of a statemachine. The state is mapped to the label of
+       the state in a CASE expression.
+     * a relation to a single item. The related item is sorted by its
+       string representation. See :func:`_get_str_repr_expression`.
+     * a dotted path (e.g "country.code") along relations to single
+       items ending in one of the fields above.
+
+    :clazz: Clazz of the items
+    :field: Name of the field to sort on.
+    :table_config: :class:`.TableConfig` of the listing
+    :request: Current request
+    :returns: Tuple of joins and expression or None
+    """
+    joins = []
+    current = clazz
+    entity = clazz
+    elements = field.split(".")
+    for num, name in enumerate(elements):
+        mapper = class_mapper(current)
+        if mapper.has_property(name):
+            prop = mapper.get_property(name)
+        else:
+            prop = None
+        if isinstance(prop, RelationshipProperty):
+            if prop.uselist:
+                return None
+            related = aliased(prop.mapper.class_)
+            joins.append(getattr(entity, name).of_type(related))
+            current = prop.mapper.class_
+            entity = related
+        elif num < len(elements) - 1:
+            return None
+    name = elements[-1]
+    if isinstance(prop, RelationshipProperty):
+        expr = _get_str_repr_expression(current, entity, request)
+    elif isinstance(prop, ColumnProperty) and len(prop.columns) == 1:
+        expr = getattr(entity, name)
+        if get_column_config(table_config, field).get("expand"):
+            expr = _get_options_expression(current, name, expr)
+    elif prop is None:
+        expr = _get_state_expression(current, entity, name)
+    else:
+        expr = None
+    if expr is None:
+        return None
+    return joins, expr
+
+
+def sort_query(query, clazz, sorting, table_config, request):
+    """Will order the query by the given sorting. The id of the items is
+    used as tiebreaker to get a stable order. NULL values are sorted
+    behind all other values in ascending order regardless of the
+    database, like in the application (See
+    :func:`ringo.model.base.get_collation_key`). If the sorting can not
+    be expressed in SQL None is returned. See
+    :func:`get_sort_expression`
+
+    :query: SQL query
+    :clazz: Clazz of the items
+    :sorting: Tuple of fieldname and sortorder of the listing.
+    :table_config: :class:`.TableConfig` of the listing
+    :request: Current request
+    :returns: Ordered query or None
+    """
+    result = get_sort_expression(clazz, sorting[0], table_config, request)
+    if result is None:
+        log.debug('Sorting on "%s" is done in the application' % sorting[0])
+        return None
+    joins, expr = result
+    for join in joins:
+        query = query.outerjoin(join)
+    keys = [expr, clazz.id]
+    if query.session.get_bind().dialect.name != "postgresql":
+        # PostgreSQL already sorts NULL values as the greatest values.
+        keys.insert(0, sa.case([(expr.is_(None), 1)], else_=0))
+    if sorting[1] == "desc":
+        keys = [key.desc() for key in keys]
+    return query.order_by(*keys)
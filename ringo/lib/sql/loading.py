@@ -0,0 +1,279 @@
+"""Modul to plan the eager loading of relations when loading items.
+
+Overviews and forms usually display values of related items, either
+by a dotted column name (e.g "owner.profile.last_name") or by the
+string representation of a related item which itself may consist of
+values of related items. Loading the related items lazily will cause
+one query per item and relation. The functions in this modul derive
+the relations which are needed from the table and form configuration
+and the string representation of the modules and build the loader
+options to load these relations together with the items.
+
+Relations to single items are loaded with a JOIN (`joinedload`).
+Relations to many items are loaded in a second query (`selectinload`)
+to not multiply the rows of the items. Relations which are configured
+in the `_sql_eager_loads` attribute of the clazz are always loaded with
+a JOIN.
+
+Further large columns of the items and the loaded related items which
+are not displayed can be deferred (See :func:`prune_columns`). Deferred
+columns are loaded on first access.
+"""
+import logging
+import sqlalchemy as sa
+from sqlalchemy.orm import (
+    ColumnProperty,
+    RelationshipProperty,
+    class_mapper,
+    defer,
+    joinedload,
+    selectinload
+)
+from ringo.model.mixins import Searchable
+
+log = logging.getLogger(__name__)
+
+loaders = {"joined": joinedload, "selectin": selectinload}
+"""Mapping of the strategies in a plan to the SQLAlchemy loaders"""
+
+prunable_types = (sa.Text, sa.LargeBinary)
+"""Types of columns which are deferred if not displayed"""
+
+
+def _get_str_repr_fields(clazz, request):
+    """Returns the list of fields used in the string representation of
+    the items of the clazz. If the modul can not be determined an empty
+    list is returned."""
+    from ringo.lib.helpers.misc import get_item_modul
+    if getattr(clazz, "_modul_id", None) is None:
+        return []
+    try:
+        return get_item_modul(request, clazz).get_str_repr()[1]
+    except Exception:
+        log.warning("Can not get string representation of %s" % clazz)
+        return []
+
+
+def _add_path(plan, clazz, name, request, seen, fields=None):
+    """Adds the relations along the dotted name to the plan. If the
+    name ends in a relation the fields of the string representation of
+    the related clazz are added too, as the related items will be
+    rendered by their string representation. If fields is given the
+    names of the accessed fields are added for each path."""
+    mapper = class_mapper(clazz)
+    path = ()
+    current = clazz
+    for element in name.split("."):
+        if fields is not None:
+            fields.setdefault(path, set()).add(element)
+        if not mapper.has_property(element):
+            return
+        prop = mapper.get_property(element)
+        if not isinstance(prop, RelationshipProperty):
+            return
+        path = path + (element,)
+        strategy = prop.uselist and "selectin" or "joined"
+        plan.setdefault(path, strategy)
+        current = prop.mapper.class_
+        mapper = prop.mapper
+    if current in seen:
+        return
+    for field in _get_str_repr_fields(current, request):
+        sub = {}
+        subfields = None if fields is None else {}
+        _add_path(sub, current, field, request, seen | set([current]),
+                  subfields)
+        for subpath, strategy in sub.iteritems():
+            plan.setdefault(path + subpath, strategy)
+        for subpath, names in (subfields or {}).iteritems():
+            fields.setdefault(path + subpath, set()).update(names)
+
+
+def get_eager_load_plan(clazz, names, request=None, fields=None):
+    """Returns the plan to eager load the relations needed to get the
+    values of the given names of items of the clazz. The plan is a
+    dictionary with tuples of relation names (the path) as keys and the
+    loading strategy ("joined" or "selectin") as value.
+
+    :clazz: Clazz of the items
+    :names: List of (dotted) names of fields
+    :request: Current request
+    :fields: Optional dictionary which will be filled with the names
+             of the accessed fields of the items (empty path) and the
+             related items along the paths of the plan.
+    :returns: Dictionary with the plan
+    """
+    plan = {}
+    for relation in clazz._sql_eager_loads:
+        path = tuple(relation.split("."))
+        for num in range(len(path)):
+            plan[path[:num + 1]] = "joined"
+    if fields is not None:
+        fields.setdefault((), set())
+    for name in names:
+        _add_path(plan, clazz, name, request, set(), fields)
+    return plan
+
+
+def get_table_load_plan(clazz, table_config, request=None, fields=None):
+    """Returns the plan to eager load the relations needed to render
+    the overview of the given table config. The plan includes the
+    relations of all columns (also columns with a renderer) and of the
+    string representation of the clazz. See
+    :func:`get_eager_load_plan`."""
+    names = [col.get("name") for col in table_config.get_columns()]
+    names.extend(_get_str_repr_fields(clazz, request))
+    return get_eager_load_plan(clazz, names, request, fields)
+
+
+def get_form_load_plan(clazz, formname, request=None):
+    """Returns the plan to eager load the relations needed to render
+    the form with the given name. The plan includes the relations of
+    all fields in the form. If the form can not be loaded only the
+    configured `_sql_eager_loads` are planned. See
+    :func:`get_eager_load_plan`."""
+    from ringo.lib.form import get_form_config
+    try:
+        names = get_form_config(clazz, formname).get_fields().keys()
+    except Exception:
+        names = []
+    return get_eager_load_plan(clazz, names, request)
+
+
+def _get_loader(plan, path):
+    """Returns the loader option for the given path in the plan."""
+    option = None
+    for num, element in enumerate(path):
+        strategy = plan[path[:num + 1]]
+        if option is None:
+            option = loaders[strategy](element)
+        else:
+            option = getattr(option, "%sload" % strategy)(element)
+    return option
+
+
+def get_eager_load_options(plan):
+    """Returns a list of loader options for a query to load the
+    relations in the plan.
+
+    :plan: Plan. See :func:`get_eager_load_plan`
+    :returns: List of loader options
+    """
+    options = []
+    paths = sorted(plan.keys())
+    for path in paths:
+        # Paths which are the beginning of a longer path are included
+        # in the options of the longer path.
+        if any([other[:len(path)] == path and other != path
+                for other in paths]):
+            continue
+        options.append(_get_loader(plan, path))
+    return options
+
+
+def eager_load(query, clazz, plan):
+    """Returns the query with the loader options of the plan. The plan
+    is logged.
+
+    :query: Query of items of the clazz
+    :clazz: Clazz of the items
+    :plan: Plan. See :func:`get_eager_load_plan`
+    :returns: Query
+    """
+    log.debug("Eager loading plan for %s: %s"
+              % (clazz.__name__,
+                 ", ".join(["%s (%s)" % (".".join(path), plan[path])
+                            for path in sorted(plan.keys())]) or "None"))
+    options = get_eager_load_options(plan)
+    if options:
+        query = query.options(*options)
+    return query
+
+
+def get_deferred_columns(clazz, fields):
+    """Returns the names of the columns of the clazz which can be
+    deferred if only the given fields are accessed. Only columns of a
+    type in :data:`prunable_types` are deferred. If a field is not a
+    mapped attribute of the clazz (e.g values of a Blob or python
+    properties) nothing is deferred as we do not know which columns
+    are needed to get the value. The columns of the :class:`.Searchable`
+    mixin are never deferred as they are used for searching.
+
+    :clazz: Clazz of the items
+    :fields: Names of the accessed fields
+    :returns: List of column names
+    """
+    mapper = class_mapper(clazz)
+    if not all([mapper.has_property(field) for field in fields]):
+        return []
+    columns = []
+    for prop in mapper.iterate_properties:
+        if (not isinstance(prop, ColumnProperty)
+           or len(prop.columns) != 1
+           or prop.deferred
+           or prop.key in fields):
+            continue
+        column = prop.columns[0]
+        if (not isinstance(column.type, prunable_types)
+           or column.primary_key
+           or column.foreign_keys):
+            continue
+        if (issubclass(clazz, Searchable)
+           and prop.key in ["search_document", "search_phonetics"]):
+            continue
+        columns.append(prop.key)
+    return columns
+
+
+def prune_columns(query, clazz, plan, fields):
+    """Returns the query with options to defer the large columns of the
+    items and the related items in the plan which are not accessed.
+    Related items of relations configured in `_sql_eager_loads` are
+    not pruned. The deferred columns are logged.
+
+    :query: Query of items of the clazz
+    :clazz: Clazz of the items
+    :plan: Plan. See :func:`get_eager_load_plan`
+    :fields: Accessed fields. See :func:`get_eager_load_plan`
+    :returns: Query
+    """
+    configured = set()
+    for relation in clazz._sql_eager_loads:
+        path = tuple(relation.split("."))
+        configured.update([path[:num + 1] for num in range(len(path))])
+    options = []
+    deferred = []
+    for path in sorted(fields.keys()):
+        if path in configured or (path and path not in plan):
+            continue
+        current = clazz
+        for element in path:
+            current = class_mapper(current).get_property(element).mapper.class_
+        for column in get_deferred_columns(current, fields[path]):
+            if path:
+                options.append(_get_loader(plan, path).defer(column))
+            else:
+                options.append(defer(column))
+            deferred.append(".".join(path + (column,)))
+    log.debug("Deferred columns for %s: %s"
+              % (clazz.__name__, ", ".join(deferred) or "None"))
+    if options:
+        query = query.options(*options)
+    return query
+
+
+def get_load_plan_tables(clazz, plan):
+    """Returns the names of the tables of the clazz and of the related
+    items which are loaded with the plan.
+
+    :clazz: Clazz of the items
+    :plan: Plan. See :func:`get_eager_load_plan`
+    :returns: Set of table names
+    """
+    tables = set([clazz.__tablename__])
+    for path in plan:
+        current = clazz
+        for element in path:
+            current = class_mapper(current).get_property(element).mapper.class_
+        tables.add(current.__tablename__)
+    return tables
@@ -4,7 +4,7 @@ import logging
 import os
 import json
 from ringo.lib.helpers import get_path_to, get_app_inheritance_path, dynamic_import
-from ringo.lib.cache import CACHE_TABLE_CONFIG
+from ringo.lib.cache import CACHE_TABLE_CONFIG, CACHE_CONFIG_FILES
 
 log = logging.getLogger(__name__)
 
@@ -13,7 +13,8 @@ def get_table_config(clazz, tablename=None):
     """Returns the table (overview, listing) configuration with the
     name 'tablename' of this Item from the configuration file. If
     the default table configuration will be returned. The table
-    configuration is cached for later requests.
+    configuration is cached for later requests. Its configuration file
+    is reloaded if the file has been modified.
 
     :clazz: @todo
     :tablename: @todo
@@ -148,6 +149,51 @@ class TableConfig:
     * *pagination*: If True pagination of the results will be enabled.
       The table will have gui element to configure pagination of the
       table. Defaults to false.
+    * *keyset-pagination*: If True the pages are loaded by seeking to
+      the last item of the previous page instead of skipping all
+      items of the previous pages. The pages are addressed by an opaque
+      cursor. Loading a page has the same costs for every page but the
+      navigation is limited to the previous and next page.
+      Defaults to false.
+    * *projection*: If True the items of the overview are loaded as
+      lightweight read only rows which only include the values of the
+      columns of the table instead of full items. This is only done if
+      all columns are plain columns of the item without a renderer.
+      Custom templates must not access other attributes of the items.
+      Defaults to false.
+    * *server-side*: If True the items of a DT table (simple overview)
+      are not rendered into the page. Instead the DataTables plugin
+      loads the current page of the items from the server. Searching,
+      sorting and paginating is done on the server using the same
+      search as the advanced overview. Defaults to false.
+    * *streaming*: If True the page of the advanced overview is sent
+      to the client in chunks. The header of the page is sent first
+      and the rows of the table are rendered chunk by chunk while the
+      page is sent, after the transaction of the request has been
+      committed. Therefore streaming is only used if the items are
+      loaded as projection (See *projection*). Otherwise the page is
+      rendered as usual. Custom list views must not modify the values
+      of the list view if enabled. Defaults to false.
+    * *count*: Strategy to get the number of items in a paginated
+      overview. Counting all items can be expensive on large tables.
+      The following strategies are available:
+
+      * *exact*: The items are counted on every request. This is the
+        default.
+      * *cached*: The items are counted and the result is cached until
+        an item of the modul is created, modified or deleted.
+      * *estimated*: The number of items is estimated by the query
+        planner of the database. If the estimate is below the
+        *count-threshold* the items are counted. Only available on
+        PostgreSQL. On other databases the items are counted.
+      * *next*: The items are not counted. Only the information whether
+        there is a next page is loaded.
+
+      The pagination shows "about N" items for estimated numbers and
+      "more" if only the next page is known.
+    * *count-threshold*: Estimated number of items below which the
+      items are counted exactly if the *count* strategy is "estimated".
+      Defaults to 10000.
 
     * *auto-responsive*: If True than only the first column of a table
       will be displayed on small devices. Else you need to configure the
@@ -186,7 +232,13 @@ class TableConfig:
         """
         self.clazz = clazz
         self.name = name or "overview"
-        self.config = _load_overview_config(clazz)
+        self._path = _get_overview_config_path(clazz)
+
+    @property
+    def config(self):
+        """The parsed configuration file. The file is reloaded if it has
+        been modified (See :class:`ringo.lib.cache.FileCache`)."""
+        return CACHE_CONFIG_FILES.get(self._path, _load_json)
 
     def get_settings(self):
         """Returns the settings for the table as dictionary
@@ -224,6 +276,35 @@ class TableConfig:
         settings = self.get_settings()
         return settings.get("pagination", False)
 
+    def is_keyset_paginated(self):
+        settings = self.get_settings()
+        return settings.get("keyset-pagination", False)
+
+    def is_projected(self):
+        settings = self.get_settings()
+        return settings.get("projection", False)
+
+    def is_server_side(self):
+        settings = self.get_settings()
+        return settings.get("server-side", False)
+
+    def is_streamed(self):
+        settings = self.get_settings()
+        return settings.get("streaming", False)
+
+    def get_count_strategy(self):
+        settings = self.get_settings()
+        strategy = settings.get("count", "exact")
+        if strategy not in ["exact", "cached", "estimated", "next"]:
+            log.warning("Unknown count strategy %s in table %s"
+                        % (strategy, self.name))
+            return "exact"
+        return strategy
+
+    def get_count_threshold(self):
+        settings = self.get_settings()
+        return int(settings.get("count-threshold", 10000))
+
     def is_advancedsearch(self, default=False):
         settings = self.get_settings()
         return settings.get("advancedsearch", default)
@@ -297,42 +378,50 @@ class TableConfig:
             return None
 
 
+def _load_json(path):
+    with open(path, "r") as config:
+        return json.load(config)
+
+
 def _load_overview_config(clazz):
     """Return a datastructure representing the overview
     configuration. The configuration is loaded from a JSON
-    configuration file. The function will first try to load the
+    configuration file (See :func:`_get_overview_config_path`).
+
+    The parsed configuration is cached until the file changes (See
+    :class:`ringo.lib.cache.FileCache`) and must not be modified."""
+    return CACHE_CONFIG_FILES.get(_get_overview_config_path(clazz),
+                                  _load_json)
+
+
+def _get_overview_config_path(clazz):
+    """Return the path to the JSON file of the overview
+    configuration. The function will first try to find the
     application specific configuration. If this fails it will try to
-    load it form the extension specific loaction or orign application
-    and finally from ringo.  If no configuration can be found an
+    find it in the extension specific loaction or orign application
+    and finally in ringo.  If no configuration can be found an
     exception is raised."""
     cfile = "%s.json" % clazz.__tablename__
-    config = None
+    path = None
     name = clazz.__module__.split(".")[0]
     for appname in get_app_inheritance_path():
-        try:
-            # Always first try to load from the current application. No
-            # matter what the current name is as name can be different from
-            # the appname in case of loading forms for an extension. In this
-            # case first try to load the form configuration from the
-            # application to be able to overwrite the forms.
-            config = open(get_path_to_overview_config(cfile, appname), "r")
+        # Always first try to load from the current application. No
+        # matter what the current name is as name can be different from
+        # the appname in case of loading forms for an extension. In this
+        # case first try to load the form configuration from the
+        # application to be able to overwrite the forms.
+        candidate = get_path_to_overview_config(cfile, appname)
+        if os.path.isfile(candidate):
+            path = candidate
             break
-        except IOError:
-            # Silently ignore IOErrors here as is Ok when trying to load the
-            # configurations files while iterating over the possible config
-            # file locations. If the file can finally not be loaded an IOError
-            # is raised at the end.
-                pass
     else:
         if name.startswith("ringo_"):
-            config = open(get_path_to_overview_config(cfile,
-                                                      name,
-                                                      location="."), "r")
+            path = get_path_to_overview_config(cfile, name, location=".")
     # If we can't load the config file after searching in all locations, raise
     # an IOError. Hint: Maybe you missed to set the app.base config variable?
-    if not config:
+    if path is None:
         raise IOError("Could not load table configuration for %s" % cfile)
-    return json.load(config)
+    return path
 
 
 class Filter(object):
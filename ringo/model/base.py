@@ -8,30 +8,48 @@ Ringo provides three classes to work with items in general.
 are created by using a :class:`.BaseFactory`.
 """
 import logging
+import json
 import warnings
 import operator
 import math
+import heapq
 import re
+import unicodedata
 import uuid
+import weakref
 import fuzzy
 import Levenshtein
 from sqlalchemy import Column, CHAR
-from sqlalchemy.orm import joinedload, Session
+from sqlalchemy.orm import ColumnProperty, class_mapper
 from sqlalchemy.orm.exc import NoResultFound
 from ringo.lib.helpers import (
     serialize, get_item_modul,
     get_raw_value, set_raw_value,
     prettify
 )
-from ringo.lib.cache import CACHE_MODULES
+from ringo.lib.cache import CACHE_ITEM_LISTS
 from ringo.lib.form import get_form_config
 from ringo.lib.table import get_table_config
 from ringo.lib.sql import DBSession
-from ringo.lib.sql.cache import regions
+from ringo.lib.sql.cache import (
+    regions,
+    get_item_list_key,
+    get_cached_items,
+    set_cached_items
+)
 from ringo.lib.sql.query import FromCache, set_relation_caching
+from ringo.lib.sql.loading import (
+    eager_load,
+    get_eager_load_plan,
+    get_form_load_plan,
+    get_load_plan_tables,
+    get_table_load_plan,
+    prune_columns
+)
 from ringo.lib.alchemy import get_columns_from_instance
+from ringo.lib.fuzzyindex import FuzzyIndex, get_dmetaphone
 from ringo.model import Base
-from ringo.model.mixins import StateMixin, Owned
+from ringo.model.mixins import StateMixin, Owned, Searchable, Blob
 
 log = logging.getLogger(__name__)
 
@@ -101,26 +119,14 @@ opmapping = {
 
 
 def load_modul(item):
-    """Will load the related modul for the given item. First we try to
-    get the bound session from the object and reuse this session to load
-    the modul item. If the item has no bound session then call the
-    get_item_modul method with no request.
+    """Will load the related modul for the given item from the process
+    wide registry of the moduls.
 
     :item: item
     :returns: modul instance
 
     """
-    from ringo.model.modul import ModulItem
-    session = Session.object_session(item)
-    mid = item.__class__._modul_id
-    # Loading the modul is expensive! So try to cache it.
-    if not CACHE_MODULES.get(mid):
-        if session:
-            modul = session.query(ModulItem).get(mid)
-        else:
-            modul = get_item_modul(None, item)
-        CACHE_MODULES.set(modul.id, modul)
-    return CACHE_MODULES.get(mid)
+    return get_item_modul(None, item)
 
 
 class BaseItem(object):
@@ -211,8 +217,10 @@ class BaseItem(object):
         return BaseFactory(cls, request)
 
     @classmethod
-    def get_item_list(cls, request=None, user=None, cache="", items=None):
-        return get_item_list(request, cls, user, cache=cache, items=items)
+    def get_item_list(cls, request=None, user=None, cache="", items=None,
+                      table=None, projection=False):
+        return get_item_list(request, cls, user, cache=cache, items=items,
+                             table=table, projection=projection)
 
     @classmethod
     def _get_permissions(cls, modul, item, request):
@@ -306,37 +314,7 @@ class BaseItem(object):
             else:
                 obj = self
 
-            # Expanding the value means to get the "literal" value for the
-            # given value from the form.
-            form_config = get_form_config(obj, form_id)
-            try:
-                field_config = form_config.get_field(name)
-                options = []
-                for option in field_config.options:
-                    # Handle "list" values "{"",1,2}"
-                    if (str(raw_value).startswith("{")
-                            and str(raw_value).endswith("}")):
-                        for value in (raw_value.strip("}").strip("{")
-                                      .split(",")):
-                            if str(value) == str(option[1]):
-                                options.append(option[0])
-                    elif str(raw_value) == str(option[1]):
-                        options.append(option[0])
-                        break
-                # If we can not match a value we return the raw value.
-                # This can also happen if the user tries to expand value
-                # which do not have options.
-                if len(options) > 0:
-                    return ", ".join(options)
-                return raw_value
-            except KeyError:
-                # If the field/value which should to be expanded is not
-                # included in the form the form library will raise a
-                # KeyError exception. However this is not a big deal as
-                # we still have the raw value and only the expandation
-                # fails. So silently ignore this one. The exception is
-                # already logged in the form library.
-                pass
+            return expand_value(obj, name, raw_value, form_id)
         return raw_value
 
     def get_values(self, include_relations=False, serialized=False):
@@ -429,10 +407,12 @@ class BaseItem(object):
                     # ensure that relations to items which where not
                     # included in the submitted values does not get lost.
                     if request:
-                        from ringo.lib.security import has_permission
+                        from ringo.lib.security import has_permission_many
                         # Oldvalue contains all actually linked items.
-                        for ov in oldvalue:
-                            if not has_permission("link", ov, request):
+                        linkable = has_permission_many("link", oldvalue,
+                                                       request)
+                        for ov, allowed in zip(oldvalue, linkable):
+                            if not allowed:
                                 # It the item was linked by the user is
                                 # not allowed to link it (is not part of
                                 # the submitted values), we must keep
@@ -553,19 +533,136 @@ class BaseItem(object):
                     else:
                         log.warning("Inheritance of group '%s' failed. "
                                     "Was None" % gid_relation)
+
+        if isinstance(self, Searchable):
+            update_search_index(request, self)
         return self
 
+
+def _get_option_key(value):
+    if isinstance(value, unicode):
+        return value
+    return str(value)
+
+
+class OptionLookup(object):
+    """Precompiled lookup of the literal values of the options of a
+    field. See :func:`get_option_lookup`."""
+
+    def __init__(self, options):
+        self.options = []
+        """List of tuples (value, label) of the options. If more than
+        one option has the same value only the first option is
+        included."""
+        self._labels = {}
+        self._positions = {}
+        for position, option in enumerate(options):
+            key = _get_option_key(option[1])
+            self._positions.setdefault(key, []).append((position,
+                                                        option[0]))
+            if key not in self._labels:
+                self._labels[key] = option[0]
+                self.options.append((option[1], option[0]))
+
+    def expand(self, raw_value):
+        """Returns the literal value of the given raw value or None if
+        no option matches. "List" values like "{1,2}" are expanded to a
+        comma separated list of the labels in order of the options.
+
+        :raw_value: Value of the field
+        :returns: Expanded value or None
+        """
+        if not self._labels:
+            return None
+        key = _get_option_key(raw_value)
+        if key.startswith("{") and key.endswith("}"):
+            labels = []
+            for value in raw_value.strip("}").strip("{").split(","):
+                labels.extend(self._positions.get(value, []))
+            if not labels:
+                return None
+            labels.sort(key=operator.itemgetter(0))
+            return ", ".join([label for position, label in labels])
+        return self._labels.get(key)
+
+
+_option_lookups = weakref.WeakKeyDictionary()
+"""Option lookups per form config. See :func:`get_option_lookup`"""
+
+
+def get_option_lookup(item, name, form_id="read"):
+    """Returns the :class:`OptionLookup` for the field with the given
+    name in the form with the given form_id. The lookup is compiled
+    once per form config. If the field is not included in the form None
+    is returned.
+
+    :item: Item or class of the form
+    :name: Name of the field
+    :form_id: ID of the form
+    :returns: :class:`OptionLookup` or None
+    """
+    form_config = get_form_config(item, form_id)
+    lookups = _option_lookups.get(form_config)
+    if lookups is None:
+        lookups = _option_lookups[form_config] = {}
+    try:
+        return lookups[name]
+    except KeyError:
+        pass
+    try:
+        options = form_config.get_field(name).options
+        # Options which are defined by an expression are not expanded.
+        if not isinstance(options, list):
+            options = []
+        lookup = OptionLookup(options)
+    except KeyError:
+        # If the field/value which should to be expanded is not
+        # included in the form the form library will raise a
+        # KeyError exception. However this is not a big deal as
+        # we still have the raw value and only the expandation
+        # fails. So silently ignore this one. The exception is
+        # already logged in the form library.
+        lookup = None
+    lookups[name] = lookup
+    return lookup
+
+
+def expand_value(item, name, raw_value, form_id="read"):
+    """Returns the "literal" value of the raw value of the field with
+    the given name. The literal value is the label of the option in the
+    form with the given form_id. If the value can not be expanded the
+    raw value is returned. See :meth:`BaseItem.get_value`.
+
+    :item: Item or class of the form
+    :name: Name of the field
+    :raw_value: Value of the field
+    :form_id: ID of the form which will be used for expansion
+    :returns: Expanded value
+    """
+    lookup = get_option_lookup(item, name, form_id)
+    if lookup is not None:
+        # If we can not match a value we return the raw value.
+        # This can also happen if the user tries to expand value
+        # which do not have options.
+        value = lookup.expand(raw_value)
+        if value is not None:
+            return value
+    return raw_value
+
+
 ########################################################################
 #                               BaseList                               #
 ########################################################################
 
 
-def get_item_list(request, clazz, user=None, cache="", items=None):
+def get_item_list(request, clazz, user=None, cache="", items=None,
+                  table=None, projection=False):
     """Returns a :class:`.BaseList` instance with items of the given
-    clazz. You can optionally provide a user object. If provided the
-    list will only contain items which are readable by user in the
-    current request.  Further you can define a caching region to cache
-    the results of the sqlquery. If not provided no caching is done.
+    clazz. You can optionally provide a user object or the
+    :class:`.UserSnapshot` of the user. If provided the list will only
+    contain items which are readable by user in the current request.
+    Further you can define a caching region to cache the results of the
+    sqlquery. If not provided no caching is done.
 
     :request: Current request
     :clazz: Clazz for with the items in the baselist will be loaded.
@@ -575,19 +672,57 @@ def get_item_list(request, clazz, user=None, cache="", items=None):
             done.
     :items: Set items of the Baselist. If provided no items will be
     loaded.
+    :table: Name of the table config of the overview the list is used
+            for. If provided relations displayed in the overview are
+            eager loaded and large columns which are not displayed are
+            deferred.
+    :projection: If True the items are loaded as read only
+                 :class:`ProjectionRow` instances if possible. Requires
+                 a table.
     :returns: BaseList instance
 
+    If the process wide cache of item lists is enabled loaded lists
+    are also cached between the requests until items of the modul or
+    of displayed related items are modified. See
+    :func:`ringo.lib.sql.cache.get_item_list_key`.
     """
     if user:
         user_key = user.id
     else:
         user_key = None
     key = "%s-%s" % (clazz._modul_id, user_key)
+    if projection:
+        key += "-projection"
     if not request.cache_item_list.get(key):
-        listing = BaseList(clazz, request.db, cache, items)
+        criterion = None
+        list_key = None
+        if items is None and cache not in regions.keys():
+            list_key = get_item_list_key(request, clazz, user,
+                                         ("list", table, projection))
+            cached = get_cached_items(request, list_key)
+            if cached is not None:
+                listing = BaseList(clazz, request.db, items=cached[0])
+                request.cache_item_list.set(key, listing)
+                return listing
+            version = CACHE_ITEM_LISTS.version()
+        if user and items is None:
+            # Only load items from the database which are readable.
+            from ringo.lib.security import get_permission_filter
+            criterion = get_permission_filter('read', clazz, request)
+        listing = BaseList(clazz, request.db, cache, items, criterion,
+                           table, projection)
         if user:
             listing = filter_itemlist_for_user(request, listing)
         if items is None:
+            if list_key is not None:
+                if table is not None:
+                    plan = get_table_load_plan(
+                        clazz, get_table_config(clazz, table), request)
+                else:
+                    plan = get_eager_load_plan(clazz, [])
+                set_cached_items(list_key, listing.items,
+                                 get_load_plan_tables(clazz, plan), version,
+                                 plan=plan)
             request.cache_item_list.set(key, listing)
             return listing
         else:
@@ -608,21 +743,172 @@ def filter_itemlist_for_user(request, baselist):
     :returns: Filtered BaseList instance
 
     """
-    from ringo.lib.security import has_permission
-    filtered_items = []
-    if request.user and not request.user.has_role("admin"):
-        # Iterate over all items and check if the user has generally
-        # access to the item.
-        for item in baselist.items:
-            # Only check ownership if the item provides a uid.
-            if has_permission('read', item, request):
-                filtered_items.append(item)
-        baselist.items = filtered_items
+    from ringo.lib.security import (
+        has_permission_many,
+        get_permission_grants,
+        check_permission_grants,
+        get_identity
+    )
+    identity = get_identity(request)
+    if identity and not identity.admin:
+        # Check the permissions against the grants of the user which
+        # are build only once for all items. Only if the clazz
+        # implements its own permission checks we need to check the
+        # permissions of the items.
+        grants = get_permission_grants('read', baselist.clazz, request)
+        if grants is None:
+            allowed = has_permission_many('read', baselist.items, request)
+        else:
+            allowed = [check_permission_grants(grants, item, request)
+                       for item in baselist.items]
+        baselist.items = [item for item, flag
+                          in zip(baselist.items, allowed) if flag]
         # Mark this listing to be prefilterd for a user.
-        baselist._user = request.user
+        baselist._user = identity
     return baselist
 
 
+class ProjectionRow(object):
+    """Lightweight read only representation of an item in an overview.
+    Instead of a full SQLAlchemy instance the row only holds the values
+    of the columns selected in the projection as slots. Rows are
+    instances of a subclass for the clazz of the items which is build by
+    :func:`get_projection_class`. See :func:`get_projection_columns` for
+    the conditions which must be met to use rows."""
+    __slots__ = ()
+    __model__ = None
+    """Clazz of the items"""
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def __getitem__(self, name):
+        return self.get_value(name)
+
+    def __unicode__(self):
+        format_str, fields = get_item_modul(None, self).get_str_repr()
+        if format_str:
+            return format_str % tuple([prettify(None, self.get_value(f))
+                                       for f in fields])
+        return "%s" % str(self.id or self.__model__)
+
+    def __str__(self):
+        return self.__unicode__()
+
+    def render(self, request=None):
+        return self.__unicode__()
+
+    def get_value(self, name, form_id="read", expand=False, strict=True):
+        """Return the value of the given column. See
+        :meth:`BaseItem.get_value`"""
+        try:
+            raw_value = getattr(self, name)
+        except AttributeError:
+            if strict:
+                log.error("Attribute '%s' not found in projection of '%s'"
+                          "; id:%s" % (name, self.__model__, self.id))
+            raw_value = None
+        if expand:
+            return expand_value(self.__model__, name, raw_value, form_id)
+        return raw_value
+
+
+_projection_classes = {}
+
+
+def get_projection_class(clazz, columns):
+    """Returns a subclass of :class:`ProjectionRow` for items of the
+    clazz with the given columns.
+
+    :clazz: Clazz of the items
+    :columns: List of column names
+    :returns: Subclass of ProjectionRow
+    """
+    key = (clazz, tuple(columns))
+    if key not in _projection_classes:
+        _projection_classes[key] = type("%sRow" % clazz.__name__,
+                                        (ProjectionRow,),
+                                        {"__slots__": tuple(columns),
+                                         "__model__": clazz,
+                                         "__tablename__": clazz.__tablename__,
+                                         "_modul_id": clazz._modul_id})
+    return _projection_classes[key]
+
+
+def _is_plain_column(clazz, name):
+    mapper = class_mapper(clazz)
+    if not mapper.has_property(name):
+        return False
+    prop = mapper.get_property(name)
+    return isinstance(prop, ColumnProperty) and len(prop.columns) == 1
+
+
+def get_projection_columns(clazz, table_config, request=None):
+    """Returns a list of names of the columns which must be loaded to
+    display the items of the clazz in the overview of the given table
+    config using :class:`ProjectionRow` instances. Besides the columns
+    of the table the list includes the columns of the string
+    representation, the default sort column and the columns needed to
+    check the permissions and to search.
+
+    Rows can not be used and None is returned if
+
+     * a column of the table is not a plain column of the clazz (e.g
+       dotted names, relations or values of a Blob),
+     * a column of the table has a renderer as the renderer needs
+       the item,
+     * the string representation is not build from plain columns or
+     * the clazz implements its own permission checks.
+
+    :clazz: Clazz of the items
+    :table_config: :class:`.TableConfig` of the overview
+    :request: Current request
+    :returns: List of column names or None
+    """
+    if (issubclass(clazz, Blob) or clazz._get_permissions.__func__
+       is not BaseItem._get_permissions.__func__):
+        return None
+    columns = ["id"]
+    for col in table_config.get_columns():
+        if "renderer" in col or not _is_plain_column(clazz, col["name"]):
+            return None
+        columns.append(col["name"])
+    for field in get_item_modul(request, clazz).get_str_repr()[1]:
+        if not _is_plain_column(clazz, field):
+            return None
+        columns.append(field)
+    sort_field = table_config.get_default_sort_column()
+    if sort_field and _is_plain_column(clazz, sort_field):
+        columns.append(sort_field)
+    for name in ["uid", "gid"]:
+        if _is_plain_column(clazz, name):
+            columns.append(name)
+    columns.extend(getattr(clazz, "_statemachines", {}).keys())
+    if issubclass(clazz, Searchable):
+        columns.extend(["search_document", "search_phonetics"])
+    result = []
+    for name in columns:
+        if name not in result:
+            result.append(name)
+    return result
+
+
+def get_projection_rows(query, clazz, columns):
+    """Returns a list of :class:`ProjectionRow` instances with the given
+    columns of the items selected by the query.
+
+    :query: Query of items of the clazz
+    :clazz: Clazz of the items
+    :columns: List of column names. See :func:`get_projection_columns`
+    :returns: List of rows
+    """
+    row = get_projection_class(clazz, columns)
+    query = query.with_entities(*[getattr(clazz, name)
+                                  for name in columns])
+    return [row(*values) for values in query]
+
+
 class BaseList(object):
     """Base class for listing of items in Ringo. The class provides
     methods for sorting and filtering the items of the list.
@@ -637,7 +923,8 @@ class BaseList(object):
     The other way is to initiate the list with a list of preloaded
     items.
     """
-    def __init__(self, clazz, db, cache="", items=None):
+    def __init__(self, clazz, db, cache="", items=None, criterion=None,
+                 table=None, projection=False):
         """A List object of. A list can be filterd, and sorted.
 
         :clazz: Class of items which will be loaded.
@@ -646,34 +933,65 @@ class BaseList(object):
                 done.
         :items: Set items of the Baselist. If provided no items will be
         loaded.
+        :criterion: Optional SQL criterion to filter the items on
+        loading.
+        :table: Optional name of the table config. If provided the
+        relations displayed in the table are eager loaded and large
+        columns which are not displayed are deferred.
+        :projection: If True and a table is provided the items are
+        loaded as :class:`ProjectionRow` instances with only the
+        columns needed for the table if possible. See
+        :func:`get_projection_columns`.
         """
         self.clazz = clazz
         self.db = db
         if items is None:
             q = self.db.query(self.clazz)
-
-            if cache in regions.keys():
-                q = set_relation_caching(q, self.clazz, cache)
-                q = q.options(FromCache(cache))
-
-            # Added support for eager loading of items in the overview:
-            # http://docs.sqlalchemy.org/en/latest/orm/loading_relationships.html#relationship-loading-techniques
-            # This also support loading along paths to support
-            # releations which are deeper than one level.
-            for relation in self.clazz._sql_eager_loads:
-                joinedload_path = None
-                # Load along path
-                for rel in relation.split("."):
-                    if joinedload_path is None:
-                        joinedload_path = joinedload(rel)
-                    else:
-                        joinedload_path = joinedload_path.joinedload(rel)
-                q = q.options(joinedload_path)
-            self.items = q.all()
+            if criterion is not None:
+                q = q.filter(criterion)
+
+            columns = None
+            if (projection and table is not None and
+               cache not in regions.keys()):
+                columns = get_projection_columns(
+                    self.clazz, get_table_config(self.clazz, table))
+            if columns:
+                # Rows only include the values of the columns. No
+                # related items are loaded.
+                self.items = get_projection_rows(q, self.clazz, columns)
+            else:
+                if cache in regions.keys():
+                    q = set_relation_caching(q, self.clazz, cache)
+                    q = q.options(FromCache(cache))
+
+                # Added support for eager loading of items in the overview:
+                # http://docs.sqlalchemy.org/en/latest/orm/loading_relationships.html#relationship-loading-techniques
+                # Besides the configured relations the relations
+                # displayed in the table are loaded. See
+                # :mod:`ringo.lib.sql.loading`.
+                if table is not None:
+                    fields = {}
+                    plan = get_table_load_plan(self.clazz,
+                                               get_table_config(self.clazz,
+                                                                table),
+                                               fields=fields)
+                else:
+                    plan = get_eager_load_plan(self.clazz, [])
+                q = eager_load(q, self.clazz, plan)
+                # Large columns which are not displayed in the table are
+                # not loaded. Cached items can not load deferred columns
+                # later, so do not prune if the query is cached.
+                if table is not None and cache not in regions.keys():
+                    q = prune_columns(q, self.clazz, plan, fields)
+                self.items = q.all()
         else:
             self.items = items
         self.search_filter = []
 
+        self._values = {}
+        """Cache for the materialized values of the items in the list.
+        See :meth:`materialize`."""
+
         self._user = None
         """Internal variable which is set by the `filter_itemlist_for_user`
         method to indicate that the list has been build for this user
@@ -686,48 +1004,119 @@ class BaseList(object):
     def is_prefiltered_for_user(self):
         return self._user is not None
 
-    def sort(self, field, order, expand=False):
-        """Will return a sorted item list. Sorting is done based on the
-        string version of the value in the sort field.
+    def materialize(self, key, func, *args):
+        """Returns the result of calling func with the given args. The
+        result is cached under the given key for the lifetime of the
+        list, so that values of the items which are needed on filtering,
+        sorting and rendering the list are only computed once. The key
+        should include the item itself.
+
+        :key: Hashable key of the value
+        :func: Callable to compute the value
+        :returns: Cached or computed value
+        """
+        try:
+            return self._values[key]
+        except KeyError:
+            value = self._values[key] = func(*args)
+            return value
+
+    def get_value(self, item, field, expand=False, strict=True):
+        """Returns the value of the field of the item. See
+        :meth:`BaseItem.get_value`. The value is only computed once."""
+        return self.materialize((item, "value", field,
+                                 bool(expand), bool(strict)),
+                                item.get_value, field, "read",
+                                expand, strict)
+
+    def get_search_value(self, request, item, field, col, table_config):
+        """Returns the value and the pretty value of the field of the
+        item used in the search. See :func:`get_search_value`. The
+        values are only computed once."""
+        return self.materialize((item, "search", field, table_config.name),
+                                get_search_value, request, item, field,
+                                col, table_config, self)
+
+    def get_display_value(self, request, item, col, table_config):
+        """Returns the value of the column of the item as rendered in
+        the overview. If the column has a renderer the value is rendered
+        by the renderer. Otherwise the prettified value is returned.
+        Expanded values are translated. If the value can not be
+        determined "NaF" is returned. The value is only computed once.
+
+        :request: Current request
+        :item: Instance of BaseItem
+        :col: Configuration of the column in the table config
+        :table_config: :class:`.TableConfig` used for rendering
+        :returns: Rendered value
+        """
+        def render():
+            try:
+                renderer = table_config.get_renderer(col)
+                if renderer:
+                    return renderer(request, item, col, table_config)
+                value = prettify(request,
+                                 self.get_value(item, col.get('name'),
+                                                col.get('expand'),
+                                                col.get('strict', True)))
+                if col.get('expand'):
+                    # In contrast to "freeform" fields expanded values
+                    # coming from a selection usually needs to be
+                    # translated as they are stored as static text in a
+                    # specific language in the form config.
+                    value = request.translate(value)
+                return value
+            except AttributeError:
+                return "NaF"
+        return self.materialize((item, "display", col.get('name'),
+                                 table_config.name), render)
+
+    def sort(self, field, order, expand=False, limit=None):
+        """Will sort the items of the list. Sorting is done based on the
+        collation key of the value in the sort field (See
+        :func:`get_collation_key`). The keys are only computed once per
+        list.
+
+        If a limit is given only the first items up to the limit are
+        sorted using a partial heap based sort. The remaining items are
+        appended in their former order. This is sufficient if only the
+        first pages of the list are displayed.
 
         :field: Name of the field on which the sort will be done
         :order: If "desc" then the order will be reverted.
         :expand: If True, then the sorting will be done on the expanded values.
-        :returns: Sorted item list
-
+        :limit: Number of items which must be sorted.
         """
-        def attrgetter(field, expand):
-            def g(obj):
-                value = obj.get_value(field, expand=expand)
-                # As long as we have a model instance we will do the
-                # comparison on the string representation.
-                if isinstance(value, Base):
-                    return unicode(value)
-                return value
-            return g
-
-        def nonecmp(a, b):
-            if a is None and b is None:
-                return 0
-            if a is None:
-                return -1
-            if b is None:
-                return 1
-            return cmp(a, b)
-
-        sorted_items = sorted(self.items,
-                              cmp=nonecmp,
-                              key=attrgetter(field, expand))
-        if order == "desc":
-            sorted_items.reverse()
-        self.items = sorted_items
+        def get_key(item):
+            value = self.get_value(item, field, expand=expand)
+            return get_collation_key(value)
+
+        # Decorate the items with their key and position. The position
+        # makes the sorting stable and prevents comparing the items.
+        decorated = [(self.materialize((item, "sortkey", field,
+                                        bool(expand)), get_key, item),
+                      num, item) for num, item in enumerate(self.items)]
+        if limit is not None and limit < len(decorated):
+            if order == "desc":
+                top = heapq.nlargest(limit, decorated)
+            else:
+                top = heapq.nsmallest(limit, decorated)
+            selected = set([num for key, num, item in top])
+            self.items = ([item for key, num, item in top] +
+                          [item for key, num, item in decorated
+                           if num not in selected])
+        else:
+            decorated.sort(reverse=(order == "desc"))
+            self.items = [item for key, num, item in decorated]
 
     def paginate(self, total=None, page=0, size=None):
         """This function will set some internal values for the
         pagination function based on the given params.
 
         :total: Number of items in the list. Can be usually determined
-        from the list directly.
+        from the list directly. If the number is an
+        :class:`.ApproximateCount` the kind of the number is available
+        in `pagination_count` to adapt the pagination.
         :page: Integer of the current page
         :size: Items per page
         :returns:
@@ -747,9 +1136,18 @@ class BaseList(object):
         """Start index for slicing the items list on the current page"""
         self.pagination_end = None
         """End index for slicing the items list on the current page"""
+        self.pagination_prev_cursor = None
+        """Cursor of the previous page in keyset pagination"""
+        self.pagination_next_cursor = None
+        """Cursor of the next page in keyset pagination"""
 
         if total is None:
             total = len(self.items)
+        self.pagination_total = total
+        """Number of items in the list"""
+        self.pagination_count = getattr(total, "kind", "exact")
+        """Kind of the number of items: "exact", "estimated" or "next"
+        if only known that there is a next page"""
 
         # Calulate the slicing indexes for paginating and the total
         # number of pages.
@@ -783,6 +1181,38 @@ class BaseList(object):
         if total == len(self.items):
             self.items = self.items[self.pagination_start:self.pagination_end]
 
+    def _filter_fuzzy(self, search, fields, request,
+                      table_columns, table_config):
+        """Returns the items with at least one value in the given fields
+        matching the search in a fuzzy search (See :func:`smatch`).
+        The values of all items are added to a :class:`.FuzzyIndex` so
+        that only a few values need to be compared in detail. If the
+        items provide precomputed phonetic codes these are used."""
+        index = FuzzyIndex()
+        use_phonetics = (issubclass(self.clazz, Searchable) and
+                         table_config.name == self.clazz._search_table)
+        for num, item in enumerate(self.items):
+            phonetics = {}
+            if use_phonetics and item.search_phonetics:
+                phonetics = json.loads(item.search_phonetics)
+            for field in fields:
+                value = self.get_search_value(request, item, field,
+                                              table_columns[field],
+                                              table_config)[0]
+                value = self.materialize((item, "fuzzy", field,
+                                          table_config.name),
+                                         _get_fuzzy_value, request, value)
+                codes = phonetics.get(field)
+                # Only use the precomputed codes if the value has not
+                # changed since the codes were computed.
+                if codes and codes[0] == value:
+                    index.add(num, value, tuple(codes[1:]))
+                else:
+                    index.add(num, value)
+        matches = index.search(search)
+        return [item for num, item in enumerate(self.items)
+                if num in matches]
+
     def filter(self, filter_stack, request=None, table="overview"):
         """This function will filter the items by only leaving
         those items in the list which match all search criteria in the
@@ -855,29 +1285,33 @@ class BaseList(object):
                 fields = [search_field]
             else:
                 fields = table_columns.keys()
+            use_document = (search_field == "" and not search_op and
+                            issubclass(self.clazz, Searchable) and
+                            table_config.name == self.clazz._search_table)
+            if use_document:
+                doc_expr = re.compile(re_expr.pattern,
+                                      re.IGNORECASE | re.MULTILINE)
+                doc_fields = self.clazz.get_search_fields(table_config)
+                other_fields = [field for field in fields
+                                if field not in doc_fields]
+            if search_op == "~":
+                self.items = self._filter_fuzzy(search, fields, request,
+                                                table_columns, table_config)
+                continue
             for item in self.items:
-                for field in fields:
-                    expand = table_columns[field].get('expand')
-                    renderer = table_config.get_renderer(
-                        table_columns[field])
-                    if renderer:
-                        value = renderer(request, item, field,
-                                         table_config)
-                    else:
-                        value = item.get_value(field, expand=expand)
-                    if hasattr(value, 'render'):
-                        pretty_value = value.render(request)
-                    elif isinstance(value, list):
-                        if request and expand:
-                            value = ", ".join([request.translate(
-                                unicode(v)) for v in value])
-                        else:
-                            value = ", ".join([unicode(v) for v in value])
-                        pretty_value = value
-                    else:
-                        pretty_value = unicode(prettify(request, value))
-                        if request and expand:
-                            pretty_value = request.translate(pretty_value)
+                item_fields = fields
+                if use_document and item.search_document is not None:
+                    # The search document already includes the values
+                    # of the plain string columns. Only the other
+                    # columns need to be checked one by one.
+                    if doc_expr.search(item.search_document):
+                        filtered_items.append(item)
+                        continue
+                    item_fields = other_fields
+                for field in item_fields:
+                    value, pretty_value = self.get_search_value(
+                        request, item, field,
+                        table_columns[field], table_config)
                     if search_op:
                         if request:
                             value = request.translate(unicode(value))
@@ -893,6 +1327,139 @@ class BaseList(object):
             self.items = filtered_items
 
 
+def get_collation_key(value):
+    """Returns a key to sort the given value. None values are sorted
+    after all other values like NULL values when sorting in the
+    database (See :func:`ringo.lib.sql.listing.sort_query`). Strings
+    are compared case insensitive and ignoring accents first and only
+    on equality by their original value. Model instances are sorted by
+    their string representation.
+
+    The comparison does not depend on the locale of the request or the
+    database. Language specific rules (e.g. sorting the Scandinavian
+    "\xe5" after "z") are not applied.
+
+    :value: Value to be sorted
+    :returns: Tuple
+    """
+    if value is None:
+        return (1,)
+    if isinstance(value, Base):
+        value = unicode(value)
+    if isinstance(value, str):
+        value = value.decode("utf-8", "replace")
+    if isinstance(value, unicode):
+        folded = u"".join([c for c in unicodedata.normalize("NFKD", value)
+                           if not unicodedata.combining(c)])
+        return (0, folded.lower(), value)
+    return (0, value)
+
+
+def get_search_phonetics(request, item):
+    """Returns the phonetic codes of the values of all searchable
+    columns in the table config of the item as JSON. The codes are used
+    for the fuzzy search. See :class:`.Searchable`.
+
+    :request: Current request
+    :item: Instance of BaseItem
+    :returns: JSON string
+    """
+    table_config = get_table_config(item.__class__, item._search_table)
+    phonetics = {}
+    for col in table_config.get_columns():
+        if not col.get("searchable", True):
+            continue
+        value = get_search_value(request, item, col.get('name'),
+                                 col, table_config)[0]
+        value = _get_fuzzy_value(request, value)
+        phonetics[col.get('name')] = [value] + list(get_dmetaphone(value))
+    return json.dumps(phonetics)
+
+
+def update_search_index(request, item):
+    """Updates the search document and the phonetic codes of the item.
+    See :class:`.Searchable`.
+
+    :request: Current request
+    :item: Instance of BaseItem
+    """
+    item.search_document = get_search_document(request, item)
+    item.search_phonetics = get_search_phonetics(request, item)
+
+
+def _get_fuzzy_value(request, value):
+    """Returns the lowered string of the value as used in the fuzzy
+    search."""
+    if request:
+        value = request.translate(unicode(value))
+    else:
+        value = unicode(value)
+    return value.lower()
+
+
+def get_search_value(request, item, field, col, table_config, listing=None):
+    """Returns a tuple of the value and the pretty value of the field
+    of the item as used in the search of :func:`BaseList.filter`. The
+    value is either the rendered value if the column has a renderer or
+    the (expanded) value of the item. The pretty value is the localized
+    and translated string representation of the value.
+
+    :request: Current request
+    :item: Instance of BaseItem
+    :field: Name of the field
+    :col: Configuration of the column in the table config
+    :table_config: :class:`.TableConfig` used for the search
+    :listing: Optional :class:`BaseList` to get the cached value of
+              the item from.
+    :returns: Tuple of value and pretty value
+    """
+    expand = col.get('expand')
+    renderer = table_config.get_renderer(col)
+    if renderer:
+        value = renderer(request, item, field, table_config)
+    elif listing is not None:
+        value = listing.get_value(item, field, expand=expand)
+    else:
+        value = item.get_value(field, expand=expand)
+    if hasattr(value, 'render'):
+        pretty_value = value.render(request)
+    elif isinstance(value, list):
+        if request and expand:
+            value = ", ".join([request.translate(
+                unicode(v)) for v in value])
+        else:
+            value = ", ".join([unicode(v) for v in value])
+        pretty_value = value
+    else:
+        pretty_value = unicode(prettify(request, value))
+        if request and expand:
+            pretty_value = request.translate(pretty_value)
+    return value, pretty_value
+
+
+def get_search_document(request, item):
+    """Returns the search document of the item. The search document is
+    a text including the values of the searchable columns in the table
+    config of the item which do not depend on the locale, one per line.
+    See :class:`.Searchable`.
+
+    The document is the same for every request, so the request is only
+    kept for compatibility.
+
+    :request: Current request
+    :item: Instance of BaseItem
+    :returns: Search document as string
+    """
+    table_config = get_table_config(item.__class__, item._search_table)
+    columns = dict([(col.get('name'), col)
+                    for col in table_config.get_columns()])
+    values = []
+    for field in item.get_search_fields(table_config):
+        values.append(get_search_value(None, item, field, columns[field],
+                                       table_config)[1])
+    return u"\n".join(values)
+
+
 class BaseFactory(object):
     """Factory class to create new instances of :class:`.BaseItem` or
     derived classes. Usually the factory for items of a certain module
@@ -940,7 +1507,8 @@ class BaseFactory(object):
                 item.set_values(values)
         return item
 
-    def load(self, id, db=DBSession, cache="", uuid=False, field=None):
+    def load(self, id, db=DBSession, cache="", uuid=False, field=None,
+             form=None):
         """Loads the item with id from the database and returns it.
 
         :id: Primary key or field value (if field is given) of the item to
@@ -951,6 +1519,9 @@ class BaseFactory(object):
         :uuid: (deprecated) If True the given id is a uuid. Defaults to False
         :field: If given, id is expected to be a unique value of the given
                 field. Defaults to None
+        :form: Name of the form the item will be displayed in. If given
+               the relations of the fields in the form are eager
+               loaded. Defaults to None
         :returns: Instance of clazz
 
         """
@@ -958,8 +1529,11 @@ class BaseFactory(object):
         if cache in regions.keys():
             q = set_relation_caching(q, self._clazz, cache)
             q = q.options(FromCache(cache))
-        for relation in self._clazz._sql_eager_loads:
-            q = q.options(joinedload(relation))
+        if form:
+            plan = get_form_load_plan(self._clazz, form)
+        else:
+            plan = get_eager_load_plan(self._clazz, [])
+        q = eager_load(q, self._clazz, plan)
         if field:
             return q.filter(getattr(self._clazz, field) == id).one()
         if uuid:
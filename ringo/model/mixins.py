@@ -42,12 +42,15 @@ from sqlalchemy import (
     Integer,
     DateTime,
     ForeignKey,
-    Table
+    Table,
+    Index
 )
 
 from sqlalchemy.orm import (
     relationship,
-    backref
+    backref,
+    class_mapper,
+    ColumnProperty
 )
 from formbar.converters import to_date
 from ringo.model import Base
@@ -391,6 +394,70 @@ class Owned(object):
             return False
 
 
+class Searchable(object):
+    """Mixin to add a search document to the items. The search document
+    is a text including the pretty values of all searchable columns of
+    the overview of the item (See :func:`ringo.model.base.get_search_document`).
+    The document is updated on every save and import of the item.
+
+    A search in all columns of the overview is done on the search
+    document only instead of rendering the value of every column. On
+    PostgreSQL the search document has a trigram index which is used for
+    the search in SQL. The index requires the pg_trgm extension::
+
+        CREATE EXTENSION pg_trgm;
+
+    Additionally the mixin stores the Double Metaphone codes of the
+    values of the searchable columns. They are used in the fuzzy search
+    ("~" operator) to avoid computing the codes on every search (See
+    :class:`ringo.lib.fuzzyindex.FuzzyIndex`).
+
+    The document only includes the values of columns which do not depend
+    on the locale of the user or on other items. These are plain string
+    columns without a renderer and without expanding the value (See
+    :meth:`get_search_fields`). All other searchable columns are still
+    searched one by one additionally to the document.
+
+    Existing items need to be updated after adding the mixin. Use
+    ``ringo-admin db rebuildsearch <modul>`` to build the search
+    documents. The columns and the index are added to the given tables
+    by ``ringo-admin db upgrade --searchable <tables>``."""
+    _search_table = "overview"
+    """Name of the table configuration of the searchable columns"""
+    search_document = Column(Text)
+    search_phonetics = Column(Text)
+
+    @classmethod
+    def get_search_fields(cls, table_config):
+        """Returns the names of the searchable columns of the table
+        config which are included in the search document.
+
+        :table_config: :class:`.TableConfig` of the search table
+        :returns: List of column names
+        """
+        mapper = class_mapper(cls)
+        fields = []
+        for col in table_config.get_columns():
+            name = col.get("name")
+            if (not col.get("searchable", True) or col.get("renderer")
+               or col.get("expand") or not mapper.has_property(name)):
+                continue
+            prop = mapper.get_property(name)
+            if (isinstance(prop, ColumnProperty) and len(prop.columns) == 1
+               and isinstance(prop.columns[0].type, String)):
+                fields.append(name)
+        return fields
+
+    @classmethod
+    def __declare_last__(cls):
+        name = "ix_%s_search_document" % cls.__tablename__
+        if name in [index.name for index in cls.__table__.indexes]:
+            return
+        Index(name, cls.__table__.c.search_document,
+              postgresql_using="gin",
+              postgresql_ops={"search_document": "gin_trgm_ops"})
+
+
 class Nested(object):
     """Mixin to make nested (self-reference) Items possible. Each item
     can have a parent item and many children. The class will add two
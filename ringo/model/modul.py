@@ -291,6 +291,41 @@ class ModulItem(BaseItem, Base):
         except:
             return ("%s", ["id"])
 
+
+modul_versions = sa.Table(
+    'modul_versions', Base.metadata,
+    sa.Column('id', sa.Integer, primary_key=True),
+    sa.Column('version', sa.Integer, nullable=False, default=0)
+)
+"""Table with a single row holding the version of the configuration of
+the moduls. The version is increased if moduls, actions or roles are
+modified and used to refresh the process wide registry of the moduls.
+See :class:`ringo.lib.cache.ModulRegistry`."""
+
+
+def get_modul_version(db):
+    """Returns the current version of the configuration of the moduls.
+
+    :db: Database session
+    :returns: Version or None if no version has been stored yet.
+    """
+    return db.execute(sa.select([modul_versions.c.version])
+                      .where(modul_versions.c.id == 1)).scalar()
+
+
+def increase_modul_version(db):
+    """Increases the version of the configuration of the moduls. The
+    version is changed within the transaction of the given session.
+
+    :db: Database session
+    :returns: None
+    """
+    result = db.execute(modul_versions.update()
+                        .where(modul_versions.c.id == 1)
+                        .values(version=modul_versions.c.version + 1))
+    if not result.rowcount:
+        db.execute(modul_versions.insert().values(id=1, version=1))
+
 _ = lambda msgid: msgid
 ACTIONS = {
     "list":   ActionItem(name=_("List"),
@@ -92,7 +92,10 @@ class Statemachine(object):
     def __init__(self, item, item_state_attr, init_state=None, request=None):
         """Initialise the statemachine for the given item.
 
-        :item: Attach the state machine to this :class:`BaseItem`
+        :item: Attach the state machine to this :class:`BaseItem`. If
+        None the statemachine is not bound to an item and stays in its
+        root state. This can be used to read the states of the
+        statemachine only.
         :item_state_attr: name of the attribute which store the value of
         the current state of the statemachine in the given item.
         :init_state: Initialize the statemachine with an alternative
@@ -108,7 +111,7 @@ class Statemachine(object):
 
         # Try to set the current state of the statemaching by getting
         # the current state from the item.
-        current_id = getattr(self._item, self._item_state_attr)
+        current_id = getattr(self._item, self._item_state_attr, None)
         if init_state:
             current_id = init_state
         for st in self.get_states(ignore_checks=True):
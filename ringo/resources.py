@@ -53,13 +53,27 @@ class RessourceFactory(object):
         # request in such cases.
         try:
             factory = self.__model__.get_item_factory()
-            return factory.load(id, request.db)
+            return factory.load(id, request.db,
+                                form=self._get_form_name(request))
         except DataError:
             raise HTTPNotFound()
         except NoResultFound:
             raise HTTPNotFound()
 
 
+    def _get_form_name(self, request):
+        """Returns the name of the form the item will be displayed in.
+        The name is the action of the matched route if it is an action
+        displaying the item in a form. Otherwise None is returned.
+        """
+        route = getattr(request, "matched_route", None)
+        if route is None:
+            return None
+        action = route.name.split("-")[-1]
+        if action in ["read", "update"]:
+            return action
+        return None
+
     def _get_item_permissions(self, request):
         return self.__model__._get_permissions(self.__modul__,
                                                self.item, request)
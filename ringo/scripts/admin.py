@@ -35,6 +35,7 @@ from ringo.scripts.db import (
     handle_db_savedata_command,
     handle_db_loaddata_command,
     handle_db_uuid_command,
+    handle_db_rebuildsearch_command,
     handle_db_restrict_command,
     handle_db_unrestrict_command,
     handle_db_fixsequence_command
@@ -175,7 +176,8 @@ def setup_modul_parser(subparsers, parent):
                             nargs="*",
                             choices=['owned', 'meta', 'logged', 'state',
                                      'blob', 'blobform', 'versioned', 'printable',
-                                     'nested', 'commented', 'tagged', 'todo'],
+                                     'nested', 'commented', 'tagged', 'todo',
+                                     'searchable'],
                             default=["owned"],
                             help='Mixins for the generated model')
     add_parser.set_defaults(func=handle_modul_add_command)
@@ -208,6 +210,10 @@ def setup_db_parser(subparsers, parent):
                                 help='Upgrades a database',
                                 parents=[parent])
     upgrade_parser.set_defaults(func=handle_db_upgrade_command)
+    upgrade_parser.add_argument('--searchable',
+                        metavar="tables",
+                        help="Comma separated list of the tables of moduls "
+                             "using the Searchable mixin")
 
     # Downgrade command
     downgrade_parser = sp.add_parser('downgrade',
@@ -285,6 +291,15 @@ def setup_db_parser(subparsers, parent):
                         metavar="modul",
                         help="Name of the Modul")
 
+    # Search document command
+    search_parser = sp.add_parser('rebuildsearch',
+                                  help='Rebuilds the search documents of a given modul',
+                                  parents=[parent])
+    search_parser.set_defaults(func=handle_db_rebuildsearch_command)
+    search_parser.add_argument('modul',
+                        metavar="modul",
+                        help="Name of the Modul")
+
     # Fix sequence command
     upgrade_parser = sp.add_parser('fixsequence',
                                 help='Fixes sequences in postgres databases',
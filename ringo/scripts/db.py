@@ -1,4 +1,5 @@
 import sys
+import argparse
 import logging
 import shutil
 import os
@@ -22,7 +23,8 @@ from ringo.lib.imexport import (
     CSVExporter, CSVImporter,
     ExportConfiguration
 )
-from ringo.model.base import BaseList
+from ringo.model.base import BaseList, update_search_index
+from ringo.model.mixins import Searchable
 from ringo.model.modul import ModulItem
 
 log = logging.getLogger(__name__)
@@ -182,6 +184,10 @@ def handle_db_init_command(args):
 
 def handle_db_upgrade_command(args):
     cfg = get_alembic_config(args)
+    searchable = getattr(args, "searchable", None)
+    if searchable:
+        # Passed to the migrations as "-x searchable=..." argument.
+        cfg.cmd_opts = argparse.Namespace(x=["searchable=%s" % searchable])
     command.upgrade(cfg, "head")
     if cfg.get_main_option("sqlalchemy.url").find("postgres") > -1:
         handle_db_fixsequence_command(args)
@@ -293,6 +299,26 @@ def handle_db_uuid_command(args):
     except:
         print "Reset UUIDs failed!"
 
+
+def handle_db_rebuildsearch_command(args):
+    path = []
+    path.append(args.config)
+    session = get_session(os.path.join(*path))
+    modul = get_modul(args.modul, session)
+    if not issubclass(modul, Searchable):
+        print "Modul %s has no search document" % args.modul
+        return
+    updated = 0
+    for item in session.query(modul).all():
+        update_search_index(None, item)
+        updated += 1
+    try:
+        transaction.commit()
+        print "Updated %s items" % updated
+    except:
+        print "Rebuild of search index failed!"
+
+
 def _get_user_id_function():
     out = []
     out.append("CREATE OR REPLACE FUNCTION uid() RETURNS integer")
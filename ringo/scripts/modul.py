@@ -26,7 +26,8 @@ mixinmap = {
     'blobform': 'Blobform',
     'blob': 'Blob',
     'versioned': 'Versioned',
-    'nested': 'Nested'
+    'nested': 'Nested',
+    'searchable': 'Searchable'
 }
 
 
@@ -73,6 +73,19 @@ $( document ).ready(function() {
       "bFilter": false,
     % endif
 
+    ## Render server-side settings
+    % if tableconfig.is_server_side():
+      "serverSide": true,
+      "processing": true,
+      "searchDelay": 400,
+      "ajax": "${request.route_path(h.get_action_routename(tableconfig.clazz, 'dtlist'), _query={'table': tableconfig.name})}",
+      "createdRow": function(row, data) {
+        if (data.DT_RowAttr["data-link"]) {
+          $('td', row).not('.checkboxrow').addClass("link");
+        }
+      },
+    % endif
+
     ## Render info field
     % if tableconfig.get_settings().get("show-info", True):
       "bInfo": true,
@@ -83,16 +96,30 @@ $( document ).ready(function() {
    "bAutoWidth": false,
    "fnInitComplete":on${table_id}TableRendered,
    "dom":
+   % if tableconfig.is_server_side() and tableconfig.is_paginated():
+   '<"search-widget hidden-print"<"row"<"col-md-12 search-filters"f>>><"row"<"col-md-12"<"pull-right"i>>>rt<"row hidden-print"<"col-md-12"<"pull-right"p>>>',
+   % else:
    '<"search-widget hidden-print"<"row"<"col-md-12 search-filters"f>>><"row"<"col-md-12"<"pull-right"i>>>',
+   % endif
    "columns": [
       % if bundled_actions:
         {
+          % if tableconfig.is_server_side():
+          "name": "",
+          "data": 0,
+          "orderable": false,
+          "className": "checkboxrow",
+          % endif
           "visible": true,
           "searchable": false
         },
       % endif
-      % for field in tableconfig.get_columns(request.user):
+      % for num, field in enumerate(tableconfig.get_columns(request.user)):
         {
+          % if tableconfig.is_server_side():
+          "name": "${field.get('name')}",
+          "data": ${num + (bundled_actions and 1 or 0)},
+          % endif
           "visible":  
             % if field.get('visible', True):
               true,
@@ -109,5 +136,14 @@ $( document ).ready(function() {
       % endfor
    ]
   });
+  % if tableconfig.is_server_side():
+  // Rows are rendered by the plugin after the page has been loaded.
+  $('#${table_id} tbody').on('click', 'td.link', function(event) {
+    var url = $(this).parents('[data-link]').data('link');
+    if (url) {
+      window.location = url;
+    }
+  });
+  % endif
 });
 
@@ -1,5 +1,4 @@
 <%
-from ringo.lib.helpers import prettify
 from ringo.lib.renderer.lists import get_read_update_url
 %>
 <script>
@@ -9,7 +8,7 @@ from ringo.lib.renderer.lists import get_read_update_url
 <table id="${tableid}" class="table table-condensed table-striped table-hover">
   <thead>
     <tr>
-      % if bundled_actions and len(items) > 0:
+      % if bundled_actions and (len(items) > 0 or tableconfig.is_server_side()):
         <th width="2em" class="checkboxrow">
         <input type="checkbox" name="check_all" no-dirtyable onclick="checkAll('id');">
       </th>
@@ -26,7 +25,7 @@ from ringo.lib.renderer.lists import get_read_update_url
   <tbody>
     % for item in items[listing.pagination_start:listing.pagination_end]:
       <%
-      data_link = get_read_update_url(request, item, clazz, listing.is_prefiltered_for_user()) or ""
+      data_link = get_read_update_url(request, item, clazz, listing.is_prefiltered_for_user(), listing) or ""
       %>
       <tr item-id="${item.id}" data-link="${data_link}">
       % if bundled_actions:
@@ -44,20 +43,7 @@ from ringo.lib.renderer.lists import get_read_update_url
         % endif
         >
           <%
-            try:
-              colrenderer = tableconfig.get_renderer(field)
-              if colrenderer:
-                value = colrenderer(request, item, field, tableconfig)
-              else:
-                value = prettify(request, item.get_value(field.get('name'), expand=field.get('expand'), strict=field.get('strict', True)))
-                if field.get('expand'):
-                  ## In contrast to "freeform" fields expanded values coming from a
-                  ## selection usually needs to be translated as they are
-                  ## stored as static text in aspecific language in the
-                  ## form config.
-                  value = _(value)
-            except AttributeError:
-              value = "NaF"
+            value = listing.get_display_value(request, item, field, tableconfig)
           %>
           ${value}
         </td>
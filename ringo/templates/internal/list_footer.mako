@@ -25,6 +25,25 @@
           <div class="pull-right">
             <nav>
               <ul class="pagination">
+                % if tableconfig.is_keyset_paginated():
+                % if listing.pagination_prev_cursor is None:
+                  <li class="disabled"><a href="#">&laquo;</a></li>
+                % else:
+                  <li><a href="${request.current_route_path().split('?')[0]}?pagination_cursor=${listing.pagination_prev_cursor}">&laquo;</a></li>
+                % endif
+                % if listing.pagination_count == "next":
+                  <li class="active"><a href="#">${listing.pagination_current+1}<span class="sr-only">(current)</span></a></li>
+                % elif listing.pagination_count == "estimated":
+                  <li class="active"><a href="#">${listing.pagination_current+1} / ${_('about')} ${listing.pagination_pages}<span class="sr-only">(current)</span></a></li>
+                % else:
+                  <li class="active"><a href="#">${listing.pagination_current+1} / ${listing.pagination_pages}<span class="sr-only">(current)</span></a></li>
+                % endif
+                % if listing.pagination_next_cursor is None:
+                  <li class="disabled"><a href="#">&raquo;</a></li>
+                % else:
+                  <li><a href="${request.current_route_path().split('?')[0]}?pagination_cursor=${listing.pagination_next_cursor}">&raquo;</a></li>
+                % endif
+                % else:
                 % if listing.pagination_current == 0:
                   <li class="disabled"><a href="#">&laquo;</a></li>
                 % else:
@@ -39,11 +58,17 @@
                     <li class="${(page == listing.pagination_current) and 'active'}"><a href="${request.current_route_path().split('?')[0]}?pagination_page=${page}">${page+1}<span class="sr-only">(current)</span></a></li>
                   % endfor
                 % endif
+                % if listing.pagination_count == "next" and listing.pagination_pages > listing.pagination_current+1:
+                  <li class="disabled"><a href="#">${_('more')}</a></li>
+                % elif listing.pagination_count == "estimated":
+                  <li class="disabled"><a href="#">${_('about')} ${listing.pagination_total} ${_('items')}</a></li>
+                % endif
                 % if listing.pagination_pages == listing.pagination_current+1:
                   <li class="disabled"><a href="#">&raquo;</a></li>
                 % else:
                   <li><a href="${request.current_route_path().split('?')[0]}?pagination_page=${listing.pagination_current+1}">&raquo;</a></li>
                 % endif
+                % endif
               </ul>
             </nav>
           </div>
@@ -0,0 +1,96 @@
+<%
+from ringo.lib.renderer.lists import get_read_update_url, render_responsive_class
+from ringo.lib.helpers import literal, escape
+url = request.current_route_path().split("?")[0]
+autoresponsive = tableconfig.is_autoresponsive()
+
+def render_link(request, field, url, value, clazz):
+  out = []
+  # Only take the path of the url and ignore any previous search filters.
+  if data_link:
+    out.append('<a href="%s" ' % (url))
+    out.append('class="">')
+    if hasattr(value, "render"):
+      out.append('%s</a>' % escape(value.render()))
+    else:
+      out.append('%s</a>' % escape(value))
+  else:
+    if hasattr(value, "render"):
+      out.append('%s' % escape(value.render()))
+    else:
+      out.append('%s' % escape(value))
+  return literal(" ".join(out))
+
+
+def render_filter_link(url, request, field, value, clazz):
+  out = []
+  # Only take the path of the url and ignore any previous search filters.
+  params = "form=search&search=%s&field=%s" % (escape(value), field.get('name'))
+  out.append('<a href="%s?%s" ' % (url, params))
+  out.append('class="link filter"')
+  out.append('data-original-title="Filter %s on %s in %s">' % (h.get_item_modul(request, clazz).get_label(plural=True), value, field.get('label')))
+  if hasattr(value, "render"):
+    out.append('%s</a>' % escape(value.render()))
+  else:
+    out.append('%s</a>' % escape(value))
+  return literal(" ".join(out))
+%>
+  % for item in items:
+    <%
+      data_link = get_read_update_url(request, item, clazz, listing.is_prefiltered_for_user(), listing)
+    %>
+    <tr item-id="${item.id}">
+    % if bundled_actions:
+    <td>
+      <input type="checkbox" name="id" value="${item.id}">
+    </td>
+    % endif
+    % for num, field in enumerate(columns):
+      % if autoresponsive:
+        <td class="${num > 0 and 'hidden-xs'}" style="${'display: none;' if not field.get('visible', True) else ''}">
+      % else:
+        <td class="${render_responsive_class(field.get('screen'))}" style="${'display: none;' if not field.get('visible', True) else ''}">
+      % endif
+        <%
+          value = listing.get_display_value(request, item, field, tableconfig)
+        %>
+        % if field.get('filter'):
+          ## Render a filter link. A filter link will a shortcut to tritter a
+          ## a new search based on the clicked value.
+          % if isinstance(value, list):
+            ## TODO: Expandation needed here? As this are very likely
+            ## linked items and the representation is determined by the
+            ## items __unicode__ method (ti) <2013-10-05 12:31> -->
+            <%
+              links = []
+              for v in value:
+                links.append(url, render_filter_link(request, field, v, clazz))
+            %>
+            ${", ".join(links) | n}
+          % else:
+            ${render_filter_link(url, request, field, value, clazz)}
+          % endif
+        % else:
+          % if isinstance(value, list):
+            % for v in value:
+              ${render_link(request, field, data_link, value, clazz)}
+            % endfor
+          % else:
+            ${render_link(request, field, data_link, value, clazz)}
+          % endif
+        % endif
+    </td>
+    % endfor
+  </tr>
+  % endfor
+  % if len(items) == 0:
+  <tr>
+    % if bundled_actions:
+      <td colspan="${len(columns)+1}">
+    % else:
+      <td colspan="${len(columns)}">
+    % endif
+    ${_('No items found')}
+    </td>
+  </tr>
+  % endif
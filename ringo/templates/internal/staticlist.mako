@@ -13,7 +13,7 @@ from ringo.lib.renderer.lists import get_read_update_url
   <tbody>
     % for item in items[listing.pagination_start:listing.pagination_end]:
       <%
-      data_link = get_read_update_url(request, item, clazz, listing.is_prefiltered_for_user())
+      data_link = get_read_update_url(request, item, clazz, listing.is_prefiltered_for_user(), listing)
       %>
       <tr item-id="${item.id}" data-link="${data_link}">
       % for field in tableconfig.get_columns(request.user):
@@ -24,7 +24,7 @@ from ringo.lib.renderer.lists import get_read_update_url
         % endif
           <%
             try:
-              value = _(prettify(request, item.get_value(field.get('name'), expand=field.get('expand'))))
+              value = _(prettify(request, listing.get_value(item, field.get('name'), field.get('expand'))))
             except AttributeError:
               value = "NaF"
           %>
@@ -73,3 +73,23 @@ class TestDelete:
         transaction_begin(app)
         app.get("/modules/delete/1", status=404)
         transaction_rollback(app)
+
+
+class TestRestList:
+
+    def test_GET(self, app):
+        login(app, "admin", "secret")
+        app.get("/rest/modules")
+
+    def test_GET_limit(self, app):
+        login(app, "admin", "secret")
+        result = app.get("/rest/modules", params={"limit": 2})
+        assert result.json["success"] is True
+        assert result.json["params"]["cursor"]
+
+    @pytest.mark.parametrize("limit", ["0", "-1", "foo"])
+    def test_GET_invalid_limit(self, app, limit):
+        login(app, "admin", "secret")
+        result = app.get("/rest/modules", params={"limit": limit},
+                         status=400)
+        assert result.json["success"] is False
@@ -26,6 +26,24 @@ class TestList:
         login(app, "admin", "secret")
         app.get("/users/list")
 
+    def test_GET_dtlist(self, app):
+        login(app, "admin", "secret")
+        params = {"draw": "3", "start": "0", "length": "10",
+                  "columns[0][data]": "0",
+                  "columns[0][name]": "",
+                  "columns[1][data]": "1",
+                  "columns[1][name]": "login",
+                  "columns[1][search][value]": "^admin$",
+                  "columns[1][search][regex]": "true",
+                  "order[0][column]": "1", "order[0][dir]": "desc",
+                  "search[value]": "", "search[regex]": "false"}
+        result = app.get("/users/dtlist", params=params).json
+        assert result["draw"] == 3
+        assert result["recordsFiltered"] == 1
+        assert result["recordsTotal"] >= 1
+        assert result["data"][0]["DT_RowAttr"]["item-id"] == 1
+        assert result["data"][0]["1"] == "admin"
+
 
 class TestRead:
 
@@ -100,3 +100,84 @@ def test_get_item_actions(apprequest):
     assert isinstance(result, list)
     if len(result) > 0:
         assert isinstance(result[0], ActionItem)
+
+
+def test_get_search_value(apprequest):
+    from ringo.model.modul import ModulItem
+    from ringo.model.base import get_search_value
+    from ringo.lib.table import get_table_config
+    item = apprequest.db.query(ModulItem).get(1)
+    table_config = get_table_config(ModulItem)
+    value, pretty_value = get_search_value(apprequest, item, "name",
+                                           {"name": "name"}, table_config)
+    assert value == "modules"
+    assert pretty_value == u"modules"
+
+
+def test_baselist_materialize(apprequest):
+    from ringo.model.modul import ModulItem
+    from ringo.model.base import BaseList
+    listing = BaseList(ModulItem, apprequest.db)
+    calls = []
+
+    def func(value):
+        calls.append(value)
+        return value
+
+    item = listing.items[0]
+    assert listing.materialize((item, "foo"), func, 1) == 1
+    assert listing.materialize((item, "foo"), func, 2) == 1
+    assert calls == [1]
+    assert listing.get_value(item, "name") == item.name
+
+
+def test_get_collation_key():
+    from ringo.model.base import get_collation_key
+    values = [u"b", None, u"\xc4pfel", u"B", u"apfel"]
+    result = sorted(values, key=get_collation_key)
+    assert result == [u"apfel", u"\xc4pfel", u"B", u"b", None]
+
+
+def test_baselist_sort_limit():
+    from ringo.model.modul import ModulItem
+    from ringo.model.base import BaseList
+    items = []
+    for num, name in enumerate([u"d", u"a", None, u"c", u"b"]):
+        item = ModulItem()
+        item.id = num
+        item.name = name
+        items.append(item)
+    listing = BaseList(ModulItem, None, items=items)
+    listing.sort("name", "desc", limit=3)
+    # Empty values are the greatest values like NULL in the database.
+    assert [i.name for i in listing.items[:3]] == [None, u"d", u"c"]
+    assert len(listing.items) == 5
+
+
+def test_get_projection_rows(apprequest):
+    from ringo.model.modul import ModulItem
+    from ringo.model.base import get_projection_rows, ProjectionRow
+    query = apprequest.db.query(ModulItem).filter(ModulItem.id == 1)
+    rows = get_projection_rows(query, ModulItem, ["id", "name"])
+    assert isinstance(rows[0], ProjectionRow)
+    assert rows[0].id == 1
+    assert rows[0].get_value("name") == "modules"
+    assert rows[0].get_value("label", strict=False) is None
+
+
+@pytest.mark.parametrize("raw_value, expected", [
+    ("1", "One"),
+    (2, "Two"),
+    ("{2,1}", "One, Two, Other"),
+    ("{1,1}", "One, One, Other, Other"),
+    ("{3}", "{3}"),
+    ("3", "3"),
+    (None, None)
+])
+def test_option_lookup(raw_value, expected):
+    from ringo.model.base import OptionLookup
+    options = [("One", "1", {}), ("Two", "2", {}), ("Other", "1", {})]
+    lookup = OptionLookup(options)
+    assert lookup.options == [("1", "One"), ("2", "Two")]
+    value = lookup.expand(raw_value)
+    assert (raw_value if value is None else value) == expected
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+import time
+import pytest
+
+
+@pytest.fixture()
+def cache():
+    from ringo.lib.cache import ItemListCache
+    return ItemListCache(maxsize=2)
+
+
+def test_disabled():
+    from ringo.lib.cache import ItemListCache
+    cache = ItemListCache()
+    cache.set("a", [1], ["users"])
+    assert cache.get("a") is None
+
+
+def test_get_set(cache):
+    cache.set("a", [1], ["users"])
+    assert cache.get("a") == [1]
+    assert cache.get("b") is None
+
+
+def test_lru_eviction(cache):
+    cache.set("a", [1], ["users"])
+    cache.set("b", [2], ["users"])
+    cache.get("a")
+    cache.set("c", [3], ["users"])
+    assert cache.get("a") == [1]
+    assert cache.get("b") is None
+    assert cache.get("c") == [3]
+
+
+def test_invalidate_table(cache):
+    cache.set("a", [1], ["users", "usergroups"])
+    cache.set("b", [2], ["modules"])
+    cache.invalidate("usergroups")
+    assert cache.get("a") is None
+    assert cache.get("b") == [2]
+
+
+def test_skip_outdated_version(cache):
+    version = cache.version()
+    cache.invalidate("users")
+    cache.set("a", [1], ["users"], version)
+    assert cache.get("a") is None
+    cache.set("a", [1], ["users"], cache.version())
+    assert cache.get("a") == [1]
+
+
+def test_skip_outdated_version_of_table(cache):
+    version = cache.version()
+    cache.invalidate("users")
+    cache.set("a", [1], ["modules"], version)
+    assert cache.get("a") == [1]
+
+
+def test_timeout(cache, monkeypatch):
+    import time
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    cache.timeout = 10
+    cache.set("a", [1], ["users"])
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert cache.get("a") is None
+
+
+def test_stats(cache):
+    cache.set("a", [1], ["users"])
+    cache.set("b", [2], ["users"])
+    cache.set("c", [3], ["users"])
+    cache.get("a")
+    cache.get("c")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert (stats["evictions"], stats["size"]) == (1, 2)
+
+
+def test_modul_registry(apprequest):
+    from ringo.lib.cache import ModulRegistry
+    from ringo.model.modul import ModulItem
+    registry = ModulRegistry(interval=60)
+    moduls = registry.get_moduls(apprequest.db)
+    assert registry.get_moduls(apprequest.db) is moduls
+    ids = [modul.id for modul in apprequest.db.query(ModulItem).all()]
+    assert sorted(moduls.keys()) == sorted(ids)
+    assert registry.get_clazz(moduls[1]) is ModulItem
+    # The relations are loaded with the detached moduls.
+    for modul in moduls.values():
+        modul.default_group
+        for action in modul.actions:
+            assert action.modul is modul
+            action.roles
+    merged = registry.merge(apprequest.db, 1)
+    assert merged in apprequest.db
+    assert merged.id == 1
+    registry.invalidate()
+    assert registry.get_moduls(apprequest.db) is not moduls
+
+
+def test_modul_cache(apprequest):
+    from ringo.lib.cache import ModulCache
+    cache = ModulCache(apprequest)
+    with pytest.warns(DeprecationWarning):
+        modul = cache.get(1)
+    assert modul.id == 1
+    with pytest.warns(DeprecationWarning):
+        assert 1 in cache.all()
+
+
+def test_cache_clear():
+    from ringo.lib.cache import Cache
+    cache = Cache()
+    cache.set("a", 1)
+    cache.clear()
+    assert cache.get("a") is None
+
+
+def test_cache_validity_period():
+    from ringo.lib.cache import Cache
+    cache = Cache(validity_period=3600)
+    cache.set("a", 1)
+    cache.clear()
+    assert cache.get("a") == 1
+    cache.clear(force=True)
+    assert cache.get("a") is None
+
+
+def test_cache_lru():
+    from ringo.lib.cache import Cache
+    cache = Cache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.all() == {"a": 1, "c": 3}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_ttl(monkeypatch):
+    from ringo.lib.cache import Cache
+    cache = Cache(ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=0)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+
+def test_cache_maxmemory():
+    from ringo.lib.cache import Cache
+    cache = Cache(maxmemory=10, sizeof=len)
+    cache.set("a", "12345")
+    cache.set("b", "12345")
+    cache.set("c", "1")
+    assert cache.all() == {"b": "12345", "c": "1"}
+    assert cache.stats()["memory"] == 6
+
+
+def test_cache_stats():
+    from ringo.lib.cache import Cache
+    cache = Cache()
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+
+def test_file_cache(tmpdir):
+    from ringo.lib.cache import FileCache
+    cache = FileCache()
+    path = tmpdir.join("config.json")
+    path.write("1")
+    loads = []
+
+    def loader(path):
+        loads.append(path)
+        return open(path).read()
+
+    assert cache.get(str(path), loader) == "1"
+    assert cache.get(str(path), loader) == "1"
+    assert len(loads) == 1
+    path.write("22")
+    assert cache.get(str(path), loader) == "22"
+    assert len(loads) == 2
+
+
+def test_table_config_cached(config):
+    from ringo.lib.table import get_table_config
+    from ringo.model.modul import ModulItem
+    table_config = get_table_config(ModulItem)
+    assert get_table_config(ModulItem) is table_config
+    assert table_config.config is get_table_config(ModulItem).config
+
+
+def test_file_cache_interval(tmpdir):
+    from ringo.lib.cache import FileCache
+    cache = FileCache(interval=3600)
+    path = tmpdir.join("config.json")
+    path.write("1")
+    assert cache.get(str(path), lambda path: open(path).read()) == "1"
+    path.write("22")
+    assert cache.get(str(path), lambda path: open(path).read()) == "1"
+    cache.reload()
+    assert cache.get(str(path), lambda path: open(path).read()) == "22"
+
+
+def test_blobform_config_definition():
+    from ringo.lib.form import get_config_from_definition
+    definition = u'<configuration><form id="create"></form></configuration>'
+    config = get_config_from_definition(definition)
+    assert get_config_from_definition(definition) is config
+    assert get_config_from_definition(definition.replace("create",
+                                                         "update")) \
+        is not config
+
+
+def test_cached_items(apprequest):
+    from ringo.lib.cache import CACHE_ITEM_LISTS
+    from ringo.lib.sql.cache import get_cached_items, set_cached_items
+    from ringo.model.modul import ModulItem
+    maxsize = CACHE_ITEM_LISTS.maxsize
+    CACHE_ITEM_LISTS.maxsize = 10
+    try:
+        items = apprequest.db.query(ModulItem).order_by(
+            ModulItem.id.desc()).all()
+        set_cached_items("moduls", items, ["modules"],
+                         CACHE_ITEM_LISTS.version(), len(items))
+        cached, total = get_cached_items(apprequest, "moduls")
+        assert [item.id for item in cached] == [item.id for item in items]
+        assert total == len(items)
+    finally:
+        CACHE_ITEM_LISTS.maxsize = maxsize
+        CACHE_ITEM_LISTS.invalidate("modules")
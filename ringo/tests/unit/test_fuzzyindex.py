@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+
+@pytest.fixture()
+def index():
+    from ringo.lib.fuzzyindex import FuzzyIndex
+    index = FuzzyIndex()
+    for num, value in enumerate([u"Meier", u"Mayer", u"Schmidt",
+                                 u"Müller", u"Huber", u""]):
+        index.add(num, value)
+    return index
+
+
+@pytest.mark.parametrize("search", [u"meier", u"Maier", u"Schmitt",
+                                    u"Mueller", u"Hubert", u"xyz", u""])
+def test_search_equals_smatch(index, search):
+    from ringo.model.base import smatch
+    values = [u"Meier", u"Mayer", u"Schmidt", u"Müller", u"Huber", u""]
+    expected = set([num for num, value in enumerate(values)
+                    if smatch(value, search)])
+    assert index.search(search) == expected
+
+
+def test_search_precomputed_codes():
+    from ringo.lib.fuzzyindex import FuzzyIndex, get_dmetaphone
+    index = FuzzyIndex()
+    index.add("a", u"meier", get_dmetaphone(u"meier"))
+    index.add("b", u"meier")
+    assert index.search(u"Mayer") == set(["a", "b"])
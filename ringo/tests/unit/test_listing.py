@@ -0,0 +1,194 @@
+import pytest
+
+pytestmark = pytest.mark.usefixtures("config")
+
+
+def _compile(clause):
+    from sqlalchemy.dialects import postgresql
+    return unicode(clause.compile(dialect=postgresql.dialect()))
+
+
+def _get_search_clause(search, field="", regexpr=False):
+    from ringo.model.modul import ModulItem
+    from ringo.lib.table import get_table_config
+    from ringo.lib.sql.listing import get_search_clause
+    table_config = get_table_config(ModulItem)
+    return get_search_clause(ModulItem, search, field, regexpr,
+                             table_config, "postgresql")
+
+
+def test_search_clause_substring():
+    result = _compile(_get_search_clause("foo", "name"))
+    assert "ILIKE" in result
+    assert "modules.name" in result
+
+
+def test_search_clause_all_columns():
+    result = _compile(_get_search_clause("foo"))
+    assert "modules.label" in result
+    assert "modules.name" in result
+    assert "modules.display" in result
+
+
+def test_search_clause_regexpr():
+    result = _compile(_get_search_clause("^fo+", "name", True))
+    assert "~*" in result
+
+
+def test_search_clause_operator():
+    result = _compile(_get_search_clause("!= foo", "name"))
+    assert "!=" in result
+
+
+def test_search_clause_fuzzy():
+    assert _get_search_clause("~ foo", "name") is None
+
+
+def test_search_clause_unknown_column():
+    assert _get_search_clause("foo", "actions") is None
+
+
+def test_filter_query(apprequest):
+    from ringo.model.modul import ModulItem
+    from ringo.lib.table import get_table_config
+    from ringo.lib.sql.listing import filter_query
+    table_config = get_table_config(ModulItem)
+    filter_stack = [("modules", "name", False), ("~ foo", "name", False)]
+    query, remaining = filter_query(apprequest.db.query(ModulItem),
+                                    ModulItem, filter_stack, table_config)
+    assert remaining == [("~ foo", "name", False)]
+    assert [m.name for m in query.all()] == ["modules"]
+
+
+def test_cursor_roundtrip():
+    from ringo.model.modul import ModulItem
+    from ringo.lib.sql.listing import encode_cursor, decode_cursor
+    sorting = ("name", "asc")
+    item = ModulItem()
+    item.id = 3
+    item.name = "foo"
+    cursor = decode_cursor(encode_cursor(ModulItem, sorting, 10, 1, item),
+                           sorting, 10)
+    assert cursor["page"] == 1
+    assert cursor["value"] == "foo"
+    assert cursor["id"] == 3
+
+
+def test_cursor_mismatch():
+    from ringo.model.modul import ModulItem
+    from ringo.lib.sql.listing import encode_cursor, decode_cursor
+    cursor = encode_cursor(ModulItem, ("name", "asc"), 10, 1)
+    assert decode_cursor(cursor, ("name", "desc"), 10) is None
+    assert decode_cursor(cursor, ("name", "asc"), 20) is None
+    assert decode_cursor("invalid", ("name", "asc"), 10) is None
+
+
+def test_paginate_query_keyset(apprequest):
+    from ringo.model.modul import ModulItem
+    from ringo.lib.sql.listing import (
+        encode_cursor, decode_cursor, paginate_query_keyset
+    )
+    sorting = ("name", "desc")
+    query = apprequest.db.query(ModulItem)
+    expected = [m.id for m in query.order_by(ModulItem.name.desc(),
+                                             ModulItem.id.desc())]
+    result = []
+    cursor = None
+    for page in range(len(expected) // 3 + 1):
+        items = paginate_query_keyset(query, ModulItem, sorting,
+                                      decode_cursor(cursor, sorting, 3), 3)
+        result.extend([m.id for m in items])
+        if items:
+            cursor = encode_cursor(ModulItem, sorting, 3, page + 1, items[-1])
+    assert result == expected
+
+
+def test_estimate_query_count(apprequest):
+    from ringo.model.modul import ModulItem
+    from ringo.lib.sql.listing import estimate_query_count
+    query = apprequest.db.query(ModulItem)
+    estimate = estimate_query_count(query)
+    if apprequest.db.get_bind().dialect.name == "postgresql":
+        assert estimate >= 0
+    else:
+        assert estimate is None
+
+
+def test_approximate_count_paginate():
+    from ringo.model.modul import ModulItem
+    from ringo.model.base import BaseList
+    from ringo.lib.sql.listing import ApproximateCount
+    listing = BaseList(ModulItem, None, items=range(10))
+    listing.paginate(ApproximateCount(21, "next"), 1, 10)
+    assert listing.pagination_count == "next"
+    assert listing.pagination_pages == 3
+    assert len(listing.items) == 10
+
+
+def test_load_items_custom_permissions(apprequest):
+    """Items of a clazz with its own permission checks are filtered in
+    the application. They can not be counted and paginated in SQL."""
+    from ringo.model.user import User
+    from ringo.lib.security import UserSnapshot
+    from ringo.views.base.list_ import load_items
+    identity = UserSnapshot.__new__(UserSnapshot)
+    identity.id = 999
+    identity.login = "nobody"
+    identity.roles = frozenset(["user"])
+    identity.groups = frozenset([999])
+    identity.principals = ()
+    apprequest._identity = identity
+    list_params = {"search": [], "sorting": ("login", "asc"),
+                   "pagination": (0, 10), "table": "overview"}
+    assert load_items(apprequest, User, list_params) == (None, 0)
+    list_params["projection"] = True
+    assert load_items(apprequest, User, list_params) == (None, 0)
+
+
+def test_item_list_custom_permissions_projection(apprequest):
+    """Items of a clazz with its own permission checks are never
+    loaded as projection rows as the rows can not be checked."""
+    from ringo.model.user import User
+    from ringo.model.base import get_item_list, ProjectionRow
+    listing = get_item_list(apprequest, User, table="overview",
+                            projection=True)
+    assert listing.items
+    assert not any([isinstance(item, ProjectionRow)
+                    for item in listing.items])
+
+
+def _sort_query(apprequest, field, order="asc"):
+    from ringo.model.form import Form
+    from ringo.lib.table import get_table_config
+    from ringo.lib.sql.listing import sort_query
+    query = apprequest.db.query(Form)
+    return sort_query(query, Form, (field, order),
+                      get_table_config(Form), apprequest)
+
+
+def test_sort_query_column(apprequest):
+    query = _sort_query(apprequest, "title", "desc")
+    result = _compile(query.statement)
+    assert "ORDER BY" in result
+    assert "forms.title DESC, forms.id DESC" in result
+
+
+def test_sort_query_relation(apprequest):
+    result = _compile(_sort_query(apprequest, "owner").statement)
+    assert "LEFT OUTER JOIN users" in result
+    assert "login" in result
+
+
+def test_sort_query_dotted(apprequest):
+    result = _compile(_sort_query(apprequest, "owner.login").statement)
+    assert "LEFT OUTER JOIN users" in result
+
+
+def test_sort_query_state(apprequest):
+    result = _compile(_sort_query(apprequest, "review_state").statement)
+    assert "CASE" in result
+    assert "review_state_id" in result
+
+
+def test_sort_query_unsupported(apprequest):
+    assert _sort_query(apprequest, "owner.unknown") is None
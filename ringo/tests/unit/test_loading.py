@@ -0,0 +1,51 @@
+import pytest
+
+pytestmark = pytest.mark.usefixtures("config")
+
+
+def test_eager_load_plan_configured():
+    from ringo.model.modul import ModulItem
+    from ringo.lib.sql.loading import get_eager_load_plan
+    plan = get_eager_load_plan(ModulItem, ["name"])
+    assert plan == {("actions",): "joined"}
+
+
+def test_eager_load_plan_dotted(apprequest):
+    from ringo.model.user import User
+    from ringo.lib.sql.loading import get_eager_load_plan
+    plan = get_eager_load_plan(User, ["usergroup.name", "login"],
+                               apprequest)
+    assert plan[("usergroup",)] == "joined"
+    assert plan[("roles",)] == "joined"
+
+
+def test_eager_load_options():
+    from ringo.lib.sql.loading import get_eager_load_options
+    plan = {("groups",): "joined", ("groups", "members"): "selectin",
+            ("roles",): "joined"}
+    assert len(get_eager_load_options(plan)) == 2
+
+
+def test_eager_load(apprequest):
+    from ringo.model.user import User
+    from ringo.lib.sql.loading import eager_load
+    query = eager_load(apprequest.db.query(User), User,
+                       {("usergroup",): "joined"})
+    assert "LEFT OUTER JOIN usergroups" in unicode(query.statement)
+
+
+def test_get_deferred_columns():
+    from ringo.model.form import Form
+    from ringo.lib.sql.loading import get_deferred_columns
+    assert "definition" in get_deferred_columns(Form, ["title"])
+    assert "definition" not in get_deferred_columns(Form, ["definition"])
+    assert get_deferred_columns(Form, ["title", "unknown"]) == []
+
+
+def test_prune_columns(apprequest):
+    from ringo.model.form import Form
+    from ringo.lib.sql.loading import get_eager_load_plan, prune_columns
+    fields = {}
+    plan = get_eager_load_plan(Form, ["title"], apprequest, fields)
+    query = prune_columns(apprequest.db.query(Form), Form, plan, fields)
+    assert "forms.definition" not in unicode(query.statement)
@@ -91,3 +91,196 @@ def test_equal_values(modulrequest):
     checker = ValueChecker()
     values = modulrequest.context.item.get_values(include_relations=True)
     checker.check(modulrequest.context.item.__class__, values, modulrequest, modulrequest.context.item)
+
+
+def test_permission_grants(apprequest):
+    from ringo.model.user import Usergroup
+    from ringo.lib.security import (
+        has_permission,
+        get_permission_grants,
+        check_permission_grants
+    )
+    grants = get_permission_grants("read", Usergroup, apprequest)
+    for item in apprequest.db.query(Usergroup).all():
+        expected = bool(has_permission("read", item, apprequest))
+        assert check_permission_grants(grants, item, apprequest) == expected
+
+
+def test_permission_filter(apprequest):
+    from ringo.model.user import Usergroup
+    from ringo.lib.security import has_permission, get_permission_filter
+    query = apprequest.db.query(Usergroup)
+    criterion = get_permission_filter("read", Usergroup, apprequest)
+    result = set([item.id for item in query.filter(criterion)])
+    expected = set([item.id for item in query.all()
+                    if has_permission("read", item, apprequest)])
+    assert result == expected
+
+
+def test_permissions_template(apprequest):
+    from ringo.model.user import Usergroup
+    from ringo.lib.cache import CACHE_ACL_TEMPLATES
+    from ringo.lib.helpers import get_item_modul
+    from ringo.lib.security import get_permissions
+    modul = get_item_modul(apprequest, Usergroup)
+    for item in apprequest.db.query(Usergroup).all():
+        acl = get_permissions(modul, item)
+        CACHE_ACL_TEMPLATES.clear()
+        assert get_permissions(modul, item) == acl
+        for allow, principal, permission in acl:
+            if ";uid:" in principal:
+                assert principal.endswith(";uid:%s" % item.uid)
+            elif ";group:" in principal:
+                assert principal.endswith(";group:%s" % item.gid)
+
+
+def _get_test_principal_sets(apprequest):
+    """Returns the principals of every user in the database and some
+    principals of users without a role or without a group."""
+    from pyramid.security import Everyone, Authenticated
+    from ringo.model.user import User
+    from ringo.lib.security import get_user_principals
+    principal_sets = [[Everyone], [Everyone, Authenticated, "uid:999"],
+                      [Everyone, Authenticated, "role:users",
+                       "role:users;uid:999"]]
+    for user in apprequest.db.query(User).all():
+        principal_sets.append([Everyone, Authenticated, user.id] +
+                              get_user_principals(user))
+    return principal_sets
+
+
+@pytest.mark.parametrize("clazzpath", [
+    "ringo.model.modul.ModulItem",
+    "ringo.model.modul.ActionItem",
+    "ringo.model.user.User",
+    "ringo.model.user.Role",
+    "ringo.model.user.Profile",
+    "ringo.model.form.Form",
+])
+def test_permission_principal_set_equivalence(apprequest, clazzpath):
+    """The direct check of the principals must give the same results
+    as checking the ACL with pyramid's ACL authorization policy."""
+    from pyramid.authorization import ACLAuthorizationPolicy
+    from ringo.lib.helpers import get_item_modul, dynamic_import
+    from ringo.lib.security import get_permissions, check_permission
+    clazz = dynamic_import(clazzpath)
+    modul = get_item_modul(apprequest, clazz)
+    policy = ACLAuthorizationPolicy()
+    permissions = set(["list", "create", "read", "update", "delete",
+                       "import", "export", "print", "unknown"])
+    permissions.update([action.permission or action.name.lower()
+                        for action in modul.actions])
+    contexts = [clazz] + apprequest.db.query(clazz).all()
+    for principals in _get_test_principal_sets(apprequest):
+        for context in contexts:
+            acl = get_permissions(modul, context)
+            for permission in permissions:
+                context.__acl__ = acl
+                expected = bool(policy.permits(context, principals,
+                                               permission))
+                result = check_permission(permission, modul, context,
+                                          frozenset(principals))
+                assert result == expected, (principals, context, permission)
+
+
+@pytest.mark.parametrize("clazzpath", [
+    "ringo.model.user.User",
+    "ringo.model.user.Usergroup",
+    "ringo.model.form.Form",
+])
+def test_has_permission_many(apprequest, clazzpath):
+    from ringo.lib.helpers import dynamic_import
+    from ringo.lib.security import has_permission, has_permission_many
+    clazz = dynamic_import(clazzpath)
+    items = [clazz] + apprequest.db.query(clazz).all()
+    for permission in ["list", "read", "update", "link"]:
+        expected = [bool(has_permission(permission, item, apprequest))
+                    for item in items]
+        assert has_permission_many(permission, items, apprequest) == expected
+
+
+def test_has_permission_projection_row(apprequest):
+    """Rows of a projection are restricted to the owner and group of
+    the row like the items themself."""
+    from ringo.model.user import Profile
+    from ringo.model.base import get_projection_class
+    from ringo.lib.security import UserSnapshot, has_permission
+    identity = UserSnapshot.__new__(UserSnapshot)
+    identity.id = 999
+    identity.login = "nobody"
+    identity.roles = frozenset(["user"])
+    identity.groups = frozenset([999])
+    identity.principals = ()
+    apprequest._identity = identity
+    row_class = get_projection_class(Profile, ["id", "uid", "gid"])
+    assert not has_permission("read", row_class(1, 1, 1), apprequest)
+    assert has_permission("read", row_class(1, 999, 1), apprequest)
+    assert has_permission("read", row_class(1, 1, 999), apprequest)
+
+
+def test_get_identity(apprequest):
+    from ringo.lib.security import get_identity, get_user_principals
+    user = apprequest.user
+    identity = get_identity(apprequest)
+    assert get_identity(apprequest) is identity
+    assert identity.id == user.id
+    assert identity.login == user.login
+    assert identity.roles == set([role.name for role in user.roles])
+    assert identity.groups == set([group.id for group in user.groups])
+    assert list(identity.principals) == get_user_principals(user)
+    assert identity.admin == user.has_role("admin")
+
+
+def test_password_pool():
+    from ringo.lib.security import PasswordPool, encrypt_password
+    pool = PasswordPool(concurrency=1, wait=0)
+    pwhash = encrypt_password("secret")
+    assert pool.verify("secret", pwhash) == (True, None)
+    assert pool.verify("wrong", pwhash) == (False, None)
+    md5_pw = "5ebe2294ecd0e0f08eab7690d2a6ee69"
+    valid, pwhash = pool.verify("secret", md5_pw)
+    assert valid and pwhash.startswith("$pbkdf2-sha256$")
+
+
+def test_password_pool_busy():
+    from ringo.lib.security import PasswordPool, PasswordPoolBusyException
+    pool = PasswordPool(concurrency=1, wait=0)
+    pool._acquire()
+    with pytest.raises(PasswordPoolBusyException):
+        pool.verify("secret", "5ebe2294ecd0e0f08eab7690d2a6ee69")
+    pool._release()
+    assert pool.verify("secret", "5ebe2294ecd0e0f08eab7690d2a6ee69")[0]
+
+
+def test_password_pool_timeout():
+    import time
+    from ringo.lib.security import PasswordPool, PasswordPoolBusyException
+    pool = PasswordPool(processes=1, wait=5, timeout=0.2)
+    pool.start()
+    try:
+        # Block the only process of the pool. The check times out but
+        # keeps its slot until the process has finished the job.
+        pool._pool.apply_async(time.sleep, (1,))
+        with pytest.raises(PasswordPoolBusyException):
+            pool.verify("secret", "5ebe2294ecd0e0f08eab7690d2a6ee69")
+        assert pool._running == 1
+        pool.timeout = 5
+        assert pool.verify("secret",
+                           "5ebe2294ecd0e0f08eab7690d2a6ee69")[0]
+        assert pool._running == 0
+    finally:
+        pool._pool.terminate()
+
+
+def test_login_audit_interval(monkeypatch):
+    import threading
+    from ringo.lib.security import LoginAudit
+    audit = LoginAudit(batch=10, interval=0.1)
+    flushed = threading.Event()
+    monkeypatch.setattr(audit, "flush", flushed.set)
+
+    class DummyUser(object):
+        id = 1
+
+    audit.add(DummyUser(), success=True)
+    assert flushed.wait(5)
@@ -99,6 +99,11 @@ class TestSequenceFunctions(unittest.TestCase):
         labels = ", ".join([s._label for s in transitions])
         self.assertEqual(labels, "Resolve")
 
+    def test_unbound_states(self):
+        self.sm = DummyStatemachine(None, 'state')
+        self.assertEqual(self.sm.get_state()._id, 1)
+        self.assertTrue(len(self.sm.get_states(ignore_checks=True)) == 7)
+
 
 if __name__ == '__main__':
     unittest.main()
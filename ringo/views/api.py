@@ -5,9 +5,9 @@ from pyramid.response import Response
 from pyramid.view import view_config
 
 from formbar.form import Form
-from formbar.config import Config, parse
 from formbar.rules import Rule
 
+from ringo.lib.form import get_config_from_definition
 from ringo.views.response import JSONResponse
 from ringo.views.helpers import set_current_form_page as save_form_page
 
@@ -51,7 +51,7 @@ def render(request):
     config_name = request.POST.get("formid")
     out = []
     try:
-        config = Config(parse(form_config))
+        config = get_config_from_definition(form_config)
         form_config = config.get_form(config_name)
         form = Form(form_config, None, request.db,
                     csrf_token=request.session.get_csrf_token())
@@ -20,7 +20,8 @@ from ringo.lib.helpers.appinfo import get_app_title
 from ringo.lib.helpers.misc import dynamic_import
 from ringo.lib.form import get_path_to_form_config
 from ringo.lib.security import login as user_login, request_password_reset, \
-    password_reset, activate_user, encrypt_password, AuthentificationException
+    password_reset, activate_user, encrypt_password, \
+    AuthentificationException, PasswordPoolBusyException
 from ringo.lib.message import Mailer, Mail
 
 User = import_model('ringo.model.user.User')
@@ -64,7 +65,17 @@ def login(request):
         form.validate(request.params)
         username = form.data.get('login')
         password = form.data.get('pass')
-        user = user_login(username, password)
+        try:
+            user = user_login(username, password)
+        except PasswordPoolBusyException:
+            log.warning("Login of '%s' rejected. Too many concurrent "
+                        "logins" % username)
+            msg = _("Too many logins at the moment. Please try again "
+                    "later.")
+            request.session.flash(msg, 'error')
+            return {'form': form.render(),
+                    'registration_enabled': is_registration_enabled(settings),
+                    'pwreminder_enabled': is_pwreminder_enabled(settings)}
         if user is None:
             msg = _("Login failed!")
             request.session.flash(msg, 'error')
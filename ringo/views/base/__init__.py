@@ -4,6 +4,7 @@ from ringo.views.base.create import (
 )
 from ringo.views.base.list_ import (
     list_,
+    dtlist_,
     bundle_,
     rest_list
 )
@@ -39,6 +40,7 @@ web_action_view_mapping = {
         "import": import_,
         "export": export,
         "bundle": bundle_,
+        "dtlist": dtlist_,
         "ownership": ownership
     }
 }
@@ -7,6 +7,7 @@ from ringo.views.helpers import (
     render_item_form,
 )
 from ringo.views.request import (
+    handle_event,
     handle_POST_request,
     handle_redirect_on_success,
     get_return_value
@@ -102,6 +103,7 @@ def rest_create(request, callback=None):
                 csrf_token=request.session.get_csrf_token())
     if form.validate(request.params):
             sitem = form.save()
+            handle_event(request, sitem, 'create')
             return JSONResponse(True, sitem)
     else:
         # Validation fails! return item
@@ -10,6 +10,7 @@ from ringo.lib.helpers import (
 from ringo.views.response import JSONResponse
 from ringo.views.request import (
     handle_callback,
+    handle_event,
     get_item_from_request
 )
 from ringo.views.base.list_ import set_bundle_action_handler
@@ -88,6 +89,7 @@ def _handle_delete_request(request, items, callback):
         for item in items:
             handle_callback(request, callback, item=item, mode="pre,default")
             request.db.delete(item)
+            handle_event(request, item, 'delete')
             handle_callback(request, callback, item=item, mode="post")
         # Invalidate cache
         invalidate_cache()
@@ -142,6 +144,7 @@ def rest_delete(request, callback=None):
     """
     item = get_item_from_request(request)
     request.db.delete(item)
+    handle_event(request, item, 'delete')
     return JSONResponse(True, item)
 
 set_bundle_action_handler("delete", _handle_delete_request)
@@ -1,13 +1,49 @@
+import re
 import uuid
 import logging
-from sqlalchemy import or_
-from ringo.model.base import BaseFactory, get_item_list
+import itertools
+from pyramid.renderers import render
+from ringo.model.base import (
+    BaseFactory,
+    BaseList,
+    get_item_list,
+    get_projection_class,
+    get_projection_columns,
+    get_projection_rows
+)
 from ringo.model.user import User
-from ringo.lib.alchemy import is_relation
+from ringo.lib.sql.listing import (
+    ApproximateCount,
+    estimate_query_count,
+    filter_query,
+    get_column_config,
+    get_keyset_column,
+    encode_cursor,
+    decode_cursor,
+    order_query_keyset,
+    paginate_query_keyset,
+    sort_query
+)
+from ringo.lib.sql.loading import (
+    eager_load,
+    get_load_plan_tables,
+    get_table_load_plan,
+    prune_columns
+)
+from ringo.lib.sql.cache import (
+    get_item_list_key,
+    get_cached_items,
+    set_cached_items
+)
+from ringo.lib.cache import CACHE_ITEM_LISTS, CACHE_ITEM_COUNTS
 from ringo.lib.table import get_table_config
 from ringo.lib.helpers.misc import get_item_modul
-from ringo.lib.helpers import literal
-from ringo.lib.security import has_permission
+from ringo.lib.helpers import literal, escape, HTML
+from ringo.lib.security import (
+    has_permission_many,
+    get_permission_filter,
+    get_identity
+)
 from ringo.lib.renderer import (
     ListRenderer,
     DTListRenderer
@@ -15,7 +51,8 @@ from ringo.lib.renderer import (
 from ringo.lib.renderer.dialogs import (
     WarningDialogRenderer
 )
-from ringo.views.response import JSONResponse
+from ringo.lib.renderer.lists import get_read_update_url
+from ringo.views.response import JSONResponse, ChunkedBody
 
 # The dictionary will hold the request handlers for bundled actions. The
 # dictionary will be filled from the view definitions
@@ -45,7 +82,11 @@ def set_bundle_action_handler(key, handler, module="default"):
 def handle_paginating(clazz, request):
     """Returns a tupe of current page and pagesize. The default page and
     size is page on and all items on one page. This is also the default
-    if pagination is not enabled for the table."""
+    if pagination is not enabled for the table.
+
+    If keyset pagination is enabled for the table the current page is
+    not a number but an opaque cursor (or None for the first page). See
+    :func:`ringo.lib.sql.listing.encode_cursor`."""
 
     name = clazz.__tablename__
     # Default pagination options
@@ -60,12 +101,20 @@ def handle_paginating(clazz, request):
     else:
         return (0, None)
 
+    if table_config.is_keyset_paginated():
+        page_key = "pagination_cursor"
+        default_page = None
+    else:
+        page_key = "pagination_page"
+
     # Get pagination from session
-    page = request.session.get('%s.list.pagination_page' % name, default_page)
+    page = request.session.get('%s.list.%s' % (name, page_key), default_page)
     size = request.session.get('%s.list.pagination_size' % name, default_size)
 
     # Overwrite options with options from get request
-    page = int(request.GET.get('pagination_page', page))
+    page = request.GET.get(page_key, page)
+    if page_key == "pagination_page":
+        page = int(page)
     size = request.GET.get('pagination_size', size)
     if size:
         size = int(size)
@@ -73,10 +122,10 @@ def handle_paginating(clazz, request):
         size = None
 
     if 'reset' in request.params:
-        request.session['%s.list.pagination_page' % name] = default_page
+        request.session['%s.list.%s' % (name, page_key)] = default_page
         request.session['%s.list.pagination_size' % name] = default_size
     else:
-        request.session['%s.list.pagination_page' % name] = page
+        request.session['%s.list.%s' % (name, page_key)] = page
         request.session['%s.list.pagination_size' % name] = size
     request.session.save()
 
@@ -211,32 +260,13 @@ def get_search(clazz, request):
 
 
 def _query_add_permission_filter(query, request, clazz):
-    modul = get_item_modul(request, clazz)
-    is_admin = False
-    is_allowed = True
-    for role in request.user.roles:
-        if role.name == "admin":
-            is_admin = True
-            break
-        for permission in role.permissions:
-            if permission.mid != modul.id or permission.name.lower() != "read":
-                continue
-            elif permission.admin or role.admin:
-                is_admin = True
-                break
-            else:
-                is_allowed = True
-    if is_admin:
-        # User is allowd to read all items
-        return query
-    elif is_allowed:
-        # User is not allowd to read items based on the uid and groups
-        usergroups = [g.id for g in request.user.groups]
-        query = query.filter(or_(clazz.uid == request.user.id, clazz.gid.in_(usergroups)))
-        return query
-    else:
-        # User is not allowd to read anything
+    """Returns the query filtered on the items readable by the user of
+    the request. If the permissions can not be checked in SQL None is
+    returned."""
+    criterion = get_permission_filter("read", clazz, request)
+    if criterion is None:
         return None
+    return query.filter(criterion)
 
 
 def load_items(request, clazz, list_params):
@@ -254,16 +284,24 @@ def load_items(request, clazz, list_params):
     already include aspects like sorting, filtering and pagination to
     reduce the load in the application. If not provided all filtering
     etc must be done later in the application. See related methods of
-    the :class:BaseList.
+    the :class:BaseList. If the "keyset" param is True the page in the
+    pagination param is a cursor and the items are loaded using keyset
+    pagination if possible.
     loaded.
-    :returns: List of class:BaseItem objects.
-    """
+    :returns: Tuple of a list of class:BaseItem objects and the total
+    number of items. The list is None if the items can not be loaded
+    this way (e.g. because the clazz implements its own permission
+    checks).
 
-    if list_params["search"]:
-        # Search is currently not supported in optimized loading. So
-        # return None and do the work on application side using the
-        # Baselist methods.
-        return None, 0
+    If the process wide cache of item lists is enabled the loaded items
+    are cached for the given list params.
+    """
+    list_key = get_item_list_key(request, clazz, get_identity(request),
+                                 ("load_items", list_params))
+    cached = get_cached_items(request, list_key)
+    if cached is not None:
+        return cached
+    version = CACHE_ITEM_LISTS.version()
 
     #################################
     #  Filter query on permissions  #
@@ -271,43 +309,197 @@ def load_items(request, clazz, list_params):
     query = request.db.query(clazz)
     query = _query_add_permission_filter(query, request, clazz)
     if query is None:
-        return [], 0
+        # The clazz implements its own permission checks. As the items
+        # are filtered later in the application counting and
+        # paginating must be done in the application too.
+        return None, 0
+
+    ###############
+    #  Searching  #
+    ###############
+    # Filters which can not be expressed in SQL (e.g. on columns with
+    # renderers or fuzzy search) will remain in the search stack and
+    # are applied later in the application.
+    table_config = get_table_config(clazz, list_params.get("table"))
+    query, search = filter_query(query, clazz,
+                                 list_params["search"], table_config)
 
     ############################
     #  Sorting and paginating  #
     ############################
-    if list_params["sorting"]:
-        try:
-            sort_column = getattr(clazz, list_params["sorting"][0])
-        except AttributeError:
+    sorting = list_params["sorting"]
+    page, size = list_params["pagination"]
+    # Keyset pagination is only possible on plain columns which are
+    # not expanded.
+    keyset = (list_params.get("keyset") and sorting and
+              get_keyset_column(clazz, sorting[0]) is not None and
+              not get_column_config(table_config, sorting[0]).get("expand"))
+    if list_params.get("keyset"):
+        cursor = decode_cursor(page, sorting, size)
+        page = cursor and cursor.get("page") or 0
+
+    # Relations which are displayed in the overview are loaded
+    # together with the items. Large columns which are not displayed
+    # are not loaded. In projection mode only the displayed columns
+    # are loaded as rows. Rows are only used for clazzes which permissions
+    # can be checked in SQL (See get_projection_columns), so the rows are
+    # never filtered after counting and paginating.
+    fields = {}
+    plan = get_table_load_plan(clazz, table_config, request, fields)
+    columns = None
+    if list_params.get("projection"):
+        columns = get_projection_columns(clazz, table_config, request)
+
+    # In keyset mode the ordering is done while paginating.
+    if sorting and not keyset:
+        query = sort_query(query, clazz, sorting, table_config, request)
+        if query is None:
             return None, 0
 
-        # Sorting is only supported on a few attributes.
-        if isinstance(sort_column, property):
-            return None, 0
-        if is_relation(clazz, list_params["sorting"][0]):
-            return None, 0
-
-        sort_order = list_params["sorting"][1]
-        if sort_order == "asc":
-            query = query.order_by(sort_column)
+    if search:
+        # Remaining filters are applied on the sorted items. As we do
+        # not know which items will pass the filter paginating must be
+        # done later in the application too.
+        if keyset:
+            query = order_query_keyset(query, clazz, sorting)
+        if columns:
+            items = get_projection_rows(query, clazz, columns)
         else:
-            query = query.order_by(sort_column.desc())
-
-    total = query.count()
-    if list_params["pagination"] and list_params["pagination"][1]:
-        start = list_params["pagination"][0] * list_params["pagination"][1]
-        end = start + list_params["pagination"][1]
+            query = eager_load(query, clazz, plan)
+            query = prune_columns(query, clazz, plan, fields)
+            items = query.all()
+        listing = BaseList(clazz, request.db, items=items)
+        listing.filter(search, request, list_params.get("table"))
+        items = listing.items
+        if size:
+            items = items[page * size:(page + 1) * size]
+        set_cached_items(list_key, items, get_load_plan_tables(clazz, plan),
+                         version, len(listing.items), plan)
+        return items, len(listing.items)
+
+    total = count_query(request, query, clazz, table_config,
+                        list_params["search"])
+    if columns:
+        query = query.with_entities(*[getattr(clazz, name)
+                                      for name in columns])
+    else:
+        query = eager_load(query, clazz, plan)
+        query = prune_columns(query, clazz, plan, fields)
+    if size and keyset:
+        items = paginate_query_keyset(query, clazz, sorting, cursor, size)
+    elif size:
+        start = page * size
+        end = start + size
+        if total is None:
+            # Load one more item to know if there is a next page.
+            end += 1
         items = query.slice(start, end)
+    elif keyset:
+        items = order_query_keyset(query, clazz, sorting).all()
     else:
         items = query.all()
 
     # Items must be a list otherwise we get TypeError: object of type
     # 'CachingQuery' has no len() later.
-    items = [item for item in items]
+    if columns:
+        row = get_projection_class(clazz, columns)
+        items = [row(*values) for values in items]
+    else:
+        items = [item for item in items]
+
+    if total is None and size:
+        if keyset:
+            more = False
+            if len(items) == size:
+                next_cursor = decode_cursor(
+                    encode_cursor(clazz, sorting, size, page + 1, items[-1]),
+                    sorting, size)
+                more = bool(paginate_query_keyset(query, clazz, sorting,
+                                                  next_cursor, 1))
+        else:
+            more = len(items) > size
+            items = items[:size]
+        total = ApproximateCount(page * size + len(items) + int(more),
+                                 "next")
+    elif total is None:
+        total = len(items)
+    elif isinstance(total, ApproximateCount) and size:
+        # The estimate might be lower than the number of items already
+        # seen. On the last page we know the exact number.
+        if len(items) < size:
+            total = page * size + len(items)
+        else:
+            total = ApproximateCount(max(total, (page + 1) * size),
+                                     "estimated")
+    set_cached_items(list_key, items, get_load_plan_tables(clazz, plan),
+                     version, total, plan)
     return items, total
 
 
+def count_query(request, query, clazz, table_config, search):
+    """Returns the number of items loaded by the query using the count
+    strategy of the table config (See
+    :meth:`.TableConfig.get_count_strategy`). Estimated numbers are
+    returned as :class:`.ApproximateCount`. If the strategy is "next"
+    the items are not counted and None is returned.
+
+    :request: Current request
+    :query: Query of the items of the listing
+    :clazz: Class of the items
+    :table_config: :class:`.TableConfig` of the listing
+    :search: Filter stack of the listing. Used to cache the number.
+    :returns: Number of items or None
+    """
+    strategy = table_config.get_count_strategy()
+    if strategy == "next":
+        return None
+    elif strategy == "estimated":
+        estimate = estimate_query_count(query)
+        if (estimate is not None
+           and estimate >= table_config.get_count_threshold()):
+            return ApproximateCount(estimate, "estimated")
+    elif strategy == "cached":
+        key = get_item_list_key(request, clazz, get_identity(request),
+                                ("count", table_config.name, search),
+                                CACHE_ITEM_COUNTS)
+        if key is not None:
+            total = CACHE_ITEM_COUNTS.get(key)
+            if total is None:
+                version = CACHE_ITEM_COUNTS.version()
+                total = query.count()
+                CACHE_ITEM_COUNTS.set(key, total, [clazz.__tablename__],
+                                      version)
+            return total
+    return query.count()
+
+
+def get_pagination_cursors(clazz, sorting, page, size, total, items):
+    """Returns a tuple with the cursors of the previous and the next
+    page for keyset pagination. If there is no previous or next page
+    the cursor is None.
+
+    :clazz: Class of the items
+    :sorting: Tuple of fieldname and sortorder of the listing.
+    :page: Number of the current page.
+    :size: Number of items per page.
+    :total: Number of all items in the listing.
+    :items: Loaded items of the current page. Please note that the
+    items must not be filtered on permissions yet.
+    :returns: Tuple of cursors
+    """
+    prev_cursor = None
+    next_cursor = None
+    if not size or not items:
+        return prev_cursor, next_cursor
+    if page > 0:
+        prev_cursor = encode_cursor(clazz, sorting, size, page - 1,
+                                    items[0], "prev")
+    if (page + 1) * size < total:
+        next_cursor = encode_cursor(clazz, sorting, size, page + 1,
+                                    items[-1], "next")
+    return prev_cursor, next_cursor
+
+
 def bundle_(request):
     clazz = request.context.__model__
     module = get_item_modul(request, clazz)
@@ -347,12 +539,13 @@ def bundle_(request):
     factory = clazz.get_item_factory()
     items = []
     ignored_items = []
-    for id in ids:
+    loaded = [factory.load(id) for id in ids]
+    allowed = has_permission_many(bundle_action.lower(), loaded, request)
+    for item, flag in zip(loaded, allowed):
         # Check if the user is allowed to call the requested action on
         # the loaded item. If so append it the the bundle, if not ignore
         # it.
-        item = factory.load(id)
-        if has_permission(bundle_action.lower(), item, request):
+        if flag:
             items.append(item)
         else:
             ignored_items.append(item)
@@ -391,6 +584,19 @@ def get_list_renderer(listing, request, table=None):
         return DTListRenderer(listing, table)
 
 
+def get_sort_limit(page, size):
+    """Returns the number of items which must be sorted to display the
+    given page of a paginated list. None if all items must be sorted.
+
+    :page: Integer of the current page
+    :size: Items per page
+    :returns: Number of items or None
+    """
+    if size is None:
+        return None
+    return (page + 1) * size
+
+
 def get_base_list(clazz, request, user, table):
     """Helper function in views to get a BaseList instance for the
     given clazz. In contrast to the known "get_item_list" function
@@ -402,7 +608,8 @@ def get_base_list(clazz, request, user, table):
 
     :clazz: Class of item which will be loaded.
     :request: Current request.
-    :user: Current user. If None, than all items of a class will be loaded.
+    :user: Current user or its :class:`.UserSnapshot`. If None, than all
+           items of a class will be loaded.
     :table: Name of the table configuration which is used for the listing.
     :returns: BaseList instance
     """
@@ -423,6 +630,12 @@ def get_base_list(clazz, request, user, table):
     list_params["search"] = search
     list_params["sorting"] = sorting
     list_params["pagination"] = (pagination_page, pagination_size)
+    list_params["table"] = table
+    list_params["keyset"] = get_table_config(clazz).is_keyset_paginated()
+    list_params["projection"] = get_table_config(clazz, table).is_projected()
+    if list_params["keyset"]:
+        cursor = decode_cursor(pagination_page, sorting, pagination_size)
+        pagination_page = cursor and cursor.get("page") or 0
 
     # Try to do an optimized loading of items. If the loading succeeds
     # the loaded items will be used to build an item list. If for some
@@ -430,19 +643,37 @@ def get_base_list(clazz, request, user, table):
     # loading etc will be done completely in application.
     if request.ringo.feature.dev_optimized_list_load:
         items, total = load_items(request, clazz, list_params)
-        listing = get_item_list(request, clazz, user=user, items=items)
+        listing = get_item_list(request, clazz, user=user, items=items,
+                                table=table,
+                                projection=list_params["projection"])
         # Ok no items are loaded. We will need to do sorting and filtering
         # on out own.
         if items is None:
-            listing.sort(sorting[0], sorting[1])
             listing.filter(search, request, table)
+            listing.sort(sorting[0], sorting[1],
+                         limit=get_sort_limit(pagination_page,
+                                              pagination_size))
+            total = len(listing.items)
+        else:
+            # Searching is already done while loading. Anyway set the
+            # filter stack to make it available in the renderers.
+            listing.search_filter = search
     else:
-        listing = get_item_list(request, clazz, user=user)
-        listing.sort(sorting[0], sorting[1])
+        items = None
+        listing = get_item_list(request, clazz, user=user, table=table,
+                                projection=list_params["projection"])
         listing.filter(search, request, table)
+        listing.sort(sorting[0], sorting[1],
+                     limit=get_sort_limit(pagination_page, pagination_size))
+        total = len(listing.items)
 
-    total = len(listing.items)
     listing.paginate(total, pagination_page, pagination_size)
+    if list_params["keyset"]:
+        if items is None:
+            items = listing.items
+        (listing.pagination_prev_cursor,
+         listing.pagination_next_cursor) = get_pagination_cursors(
+            clazz, sorting, pagination_page, pagination_size, total, items)
 
     # Only save the search if there are items
     if len(listing.items) > 0:
@@ -450,7 +681,7 @@ def get_base_list(clazz, request, user, table):
         if (request.params.get('form') == "search"):
             if "save" in request.params:
                 query_name = request.params.get('save')
-                user = BaseFactory(User).load(request.user.id)
+                user = BaseFactory(User).load(get_identity(request).id)
                 searches_dic = user.settings.get('searches', {})
                 searches_dic_search = searches_dic.get(clazz.__tablename__, {})
 
@@ -467,7 +698,7 @@ def get_base_list(clazz, request, user, table):
                 request.db.flush()
             elif "delete" in request.params:
                 query_key = request.params.get('delete')
-                user = BaseFactory(User).load(request.user.id)
+                user = BaseFactory(User).load(get_identity(request).id)
                 searches_dic = user.settings.get('searches', {})
                 searches_dic_search = searches_dic.get(clazz.__tablename__, {})
                 try:
@@ -481,10 +712,56 @@ def get_base_list(clazz, request, user, table):
     return listing
 
 
+def is_server_side(clazz, request, table=None):
+    """Returns True if the items of the overview are loaded by the
+    DataTables plugin from the server. This is only possible for
+    overviews which are rendered with the :class:`.DTListRenderer`."""
+    tableconfig = get_table_config(clazz, table)
+    settings = request.registry.settings
+    default = settings.get("layout.advanced_overviews") == "true"
+    return (tableconfig.is_server_side() and
+            not tableconfig.is_advancedsearch(default))
+
+
+def render_streamed(request, clazz, listing, renderer):
+    """Returns a response with the overview page which is sent to the
+    client in chunks. The header of the page is sent first, the rows of
+    the listing are rendered while the response is sent. See
+    :func:`.ListRenderer.render_chunked`.
+
+    :request: Current request.
+    :clazz: Class of the items in the listing.
+    :listing: BaseList instance
+    :renderer: ListRenderer for the listing
+    :returns: Response
+    """
+    header, rows, footer = renderer.render_chunked(request)
+    placeholder = renderer.rows_placeholder
+    rvalue = {}
+    rvalue['clazz'] = clazz
+    rvalue['listing'] = literal(placeholder)
+    rvalue['itemlist'] = listing
+    page = render('/default/list.mako', rvalue, request=request)
+    page_header, page_footer = page.split(placeholder, 1)
+    response = request.response
+    response.app_iter = ChunkedBody(itertools.chain(
+        [page_header, header], rows, [footer, page_footer]))
+    return response
+
+
 def list_(request):
     clazz = request.context.__model__
-    listing = get_base_list(clazz, request, request.user, "overview")
-    renderer = get_list_renderer(listing, request, request.params.get("table"))
+    table = request.params.get("table")
+    if is_server_side(clazz, request, table):
+        # The items are loaded later by the DataTables plugin. See
+        # dtlist_.
+        listing = BaseList(clazz, request.db, items=[])
+    else:
+        listing = get_base_list(clazz, request, get_identity(request),
+                                "overview")
+    renderer = get_list_renderer(listing, request, table)
+    if isinstance(renderer, ListRenderer) and renderer.is_streamed():
+        return render_streamed(request, clazz, listing, renderer)
     rendered_page = renderer.render(request)
     rvalue = {}
     rvalue['clazz'] = clazz
@@ -493,14 +770,255 @@ def list_(request):
     return rvalue
 
 
+def _get_dt_param(request, name, default=None, type=int):
+    try:
+        return type(request.params.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _get_dt_search(request, key, search_field):
+    """Returns a filter for the filter stack from the search with the
+    given key in the request. Invalid regular expressions are searched
+    literally. If the search is empty None is returned."""
+    search = request.params.get("%s[value]" % key, "")
+    if not search:
+        return None
+    regexpr = request.params.get("%s[regex]" % key) == "true"
+    if regexpr:
+        try:
+            re.compile(search)
+        except re.error:
+            regexpr = False
+    return (search, search_field, regexpr)
+
+
+def get_dt_params(request, table_config):
+    """Returns a dictionary with the parameters of a request of the
+    DataTables plugin in server-side mode. See
+    https://datatables.net/manual/server-side for the protocol. The
+    parameters are translated into the parameters of the overviews:
+
+    * *draw*: Counter of the request. Must be returned unchanged.
+    * *start*: Index of the first item of the current page.
+    * *size*: Number of items per page. None if all items are
+      requested.
+    * *columns*: List with the names of the requested columns. The
+      name is None if the column is not part of the table config (e.g
+      the column for the checkboxes of the bundled actions).
+    * *sorting*: Tuple of fieldname and sortorder. Only the first
+      ordering is used. Defaults to the default sorting of the table.
+    * *search*: Filter stack (See :func:`.BaseList.filter`) with the
+      global search and the searches in the single columns (e.g from
+      the filters of the table config). The searches have the same
+      semantic as in the advanced overview.
+
+    :request: Current request.
+    :table_config: :class:`.TableConfig` of the overview.
+    :returns: Dictionary with parameters
+    """
+    configured = {}
+    for col in table_config.get_columns(get_identity(request)):
+        configured[col.get("name")] = col
+
+    columns = []
+    search = []
+    filter_ = _get_dt_search(request, "search", "")
+    if filter_:
+        search.append(filter_)
+    while "columns[%s][data]" % len(columns) in request.params:
+        key = "columns[%s]" % len(columns)
+        name = request.params.get("%s[name]" % key)
+        if name not in configured:
+            columns.append(None)
+            continue
+        columns.append(name)
+        if configured[name].get("searchable", True):
+            filter_ = _get_dt_search(request, "%s[search]" % key, name)
+            if filter_:
+                search.append(filter_)
+
+    field = table_config.get_default_sort_column()
+    order = table_config.get_default_sort_order()
+    num = _get_dt_param(request, "order[0][column]")
+    if num is not None and 0 <= num < len(columns) and columns[num]:
+        field = columns[num]
+        if request.params.get("order[0][dir]") == "desc":
+            order = "desc"
+        else:
+            order = "asc"
+
+    size = _get_dt_param(request, "length", -1)
+    params = {}
+    params["draw"] = _get_dt_param(request, "draw", 0)
+    params["start"] = max(_get_dt_param(request, "start", 0), 0)
+    params["size"] = size > 0 and size or None
+    params["columns"] = columns
+    params["sorting"] = (field, order)
+    params["search"] = search
+    return params
+
+
+def _count_items(request, clazz):
+    """Returns the number of items of the clazz readable by the user of
+    the request. If the permissions can not be checked in SQL the items
+    are loaded and filtered in the application."""
+    criterion = get_permission_filter("read", clazz, request)
+    if criterion is None:
+        user = get_identity(request)
+        return len(get_item_list(request, clazz, user=user).items)
+    return request.db.query(clazz).filter(criterion).count()
+
+
+def _get_dt_row(request, listing, item, columns, table_config):
+    """Returns a row of the overview in the format of the DataTables
+    plugin. The cells are indexed by the number of the column. Columns
+    without a config are rendered as checkbox for bundled actions."""
+    clazz = listing.clazz
+    data_link = get_read_update_url(request, item, clazz,
+                                    listing.is_prefiltered_for_user(),
+                                    listing) or ""
+    row = {}
+    row["DT_RowAttr"] = {"item-id": item.id, "data-link": data_link}
+    for num, col in enumerate(columns):
+        if col is None:
+            value = HTML.tag("input", type="checkbox", name="id",
+                             value=item.id)
+        else:
+            value = listing.get_display_value(request, item, col,
+                                              table_config)
+        row[str(num)] = unicode(escape(value))
+    return row
+
+
+def dtlist_(request):
+    """Returns a JSON object with the current page of the overview for
+    the DataTables plugin in server-side mode (See *server-side* option
+    of the table config). Searching, sorting and paginating is done
+    like in the advanced overview. In contrast to the overview the
+    search and sorting is not saved in the session.
+
+    The number of items ("recordsTotal") and of the found items
+    ("recordsFiltered") only include items readable by the user. If
+    the permissions can not be checked in SQL all items are loaded and
+    counted in the application.
+
+    :request: Current request.
+    :returns: JSON object.
+    """
+    clazz = request.context.__model__
+    table = request.params.get("table") or "overview"
+    table_config = get_table_config(clazz, table)
+    params = get_dt_params(request, table_config)
+    start, size = params["start"], params["size"]
+    sorting = params["sorting"]
+    search = params["search"]
+    projection = table_config.is_projected()
+
+    items = None
+    if request.ringo.feature.dev_optimized_list_load:
+        # Pages are loaded by their number. If the start is not the
+        # beginning of a page all items up to the end of the page are
+        # loaded.
+        if size and start % size == 0:
+            pagination, offset = (start // size, size), 0
+        else:
+            pagination, offset = (0, size and start + size), start
+        list_params = {}
+        list_params["search"] = search
+        list_params["sorting"] = sorting
+        list_params["pagination"] = pagination
+        list_params["table"] = table
+        list_params["projection"] = projection
+        items, filtered = load_items(request, clazz, list_params)
+    if items is None:
+        # The items are counted after they are filtered on the
+        # permissions of the user.
+        listing = get_item_list(request, clazz, user=get_identity(request),
+                                table=table, projection=projection)
+        total = len(listing.items)
+        listing.filter(search, request, table)
+        listing.sort(sorting[0], sorting[1],
+                     limit=size and start + size)
+        filtered = len(listing.items)
+        if size:
+            items = listing.items[start:start + size]
+        else:
+            items = listing.items[start:]
+    else:
+        listing = get_item_list(request, clazz, user=get_identity(request),
+                                items=items[offset:], table=table,
+                                projection=projection)
+        items = listing.items
+        if search:
+            total = _count_items(request, clazz)
+        else:
+            total = filtered
+
+    col_config = {}
+    for col in table_config.get_columns(get_identity(request)):
+        col_config[col.get("name")] = col
+    columns = [col_config.get(name) for name in params["columns"]]
+    rvalue = {}
+    rvalue["draw"] = params["draw"]
+    rvalue["recordsTotal"] = total
+    rvalue["recordsFiltered"] = filtered
+    rvalue["data"] = [_get_dt_row(request, listing, item, columns,
+                                  table_config)
+                      for item in items]
+    return rvalue
+
+
 def rest_list(request):
     """Returns a JSON objcet with all item of a clazz. The list does not
-    have any capabilities for sorting or filtering
+    have any capabilities for sorting or filtering.
+
+    The list can be paginated by providing the number of items per page
+    in the "limit" param. The limit must be a positive integer. Else the
+    request fails with status 400. The items are sorted by the default sorting
+    of the overview. The params of the response include the "cursor" of
+    the next page which can be provided in the "cursor" param of the
+    following request. If there is no next page the cursor is None.
 
     :request: Current request.
     :returns: JSON object.
 
     """
     clazz = request.context.__model__
-    listing = get_item_list(request, clazz, user=request.user)
-    return JSONResponse(True, listing)
+    limit = request.GET.get("limit")
+    if not limit:
+        listing = get_item_list(request, clazz, user=get_identity(request))
+        return JSONResponse(True, listing)
+
+    try:
+        size = int(limit)
+    except ValueError:
+        size = 0
+    if size <= 0:
+        request.response.status = 400
+        return JSONResponse(False, None, {"msg": "Invalid limit"})
+    table_config = get_table_config(clazz)
+    sorting = (table_config.get_default_sort_column(),
+               table_config.get_default_sort_order())
+    cursor = decode_cursor(request.GET.get("cursor"), sorting, size)
+    page = cursor and cursor.get("page") or 0
+
+    list_params = {}
+    list_params["search"] = []
+    list_params["sorting"] = sorting
+    list_params["pagination"] = (request.GET.get("cursor"), size)
+    list_params["keyset"] = True
+    items = None
+    if request.ringo.feature.dev_optimized_list_load:
+        items, total = load_items(request, clazz, list_params)
+    if items is None:
+        listing = get_item_list(request, clazz, user=get_identity(request))
+        listing.sort(sorting[0], sorting[1],
+                     limit=get_sort_limit(page, size))
+        total = len(listing.items)
+        items = listing.items[page * size:(page + 1) * size]
+    listing = get_item_list(request, clazz, user=get_identity(request),
+                            items=items)
+    next_cursor = get_pagination_cursors(clazz, sorting, page,
+                                         size, total, items)[1]
+    return JSONResponse(True, listing, {"cursor": next_cursor})
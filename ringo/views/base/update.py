@@ -5,6 +5,7 @@ from ringo.views.helpers import (
     render_item_form
 )
 from ringo.views.request import (
+    handle_event,
     handle_POST_request,
     handle_redirect_on_success,
     get_item_from_request,
@@ -66,6 +67,7 @@ def rest_update(request, callback=None):
     form = get_item_form('update', request)
     if form.validate(request.params):
         item.save(form.data, request)
+        handle_event(request, item, 'update')
         return JSONResponse(True, item)
     else:
         # Validation fails! return item
@@ -1,9 +1,5 @@
 import logging
 from pyramid.httpexceptions import HTTPBadRequest
-from formbar.config import (
-    Config,
-    parse
-)
 from formbar.form import Form, create_dependencies
 from ringo.lib.helpers import (
         get_item_modul,
@@ -13,8 +9,10 @@ from ringo.lib.helpers import (
 from ringo.lib.form import (
     get_eval_url,
     get_form_config,
+    get_config_from_blobform,
     get_ownership_form as _get_ownership_form
 )
+from ringo.lib.cache import MODUL_REGISTRY
 from ringo.lib.i18n import locale_negotiator
 from ringo.lib.security import has_role
 from ringo.lib.renderer import add_renderers
@@ -51,17 +49,20 @@ def get_blobform_config(request, item, formname):
         log.debug("Stage 3: User has submitted data to create a new item")
         setattr(item, 'fid', fid)
         formfactory = BlobformForm.get_item_factory()
-        formconfig = Config(parse(formfactory.load(fid).definition))
+        formconfig = get_config_from_blobform(formfactory.load(fid))
         return item, formconfig.get_form(formname)
     elif blobform:
         log.debug("Stage 2: User has selected a blobform %s " % blobform)
         setattr(item, 'fid', blobform)
         formfactory = BlobformForm.get_item_factory()
-        formconfig = Config(parse(formfactory.load(blobform).definition))
+        formconfig = get_config_from_blobform(formfactory.load(blobform))
         return item, formconfig.get_form(formname)
     else:
         log.debug("Stage 1: User is selecting a blobform")
-        modul = get_item_modul(request, item)
+        # The modul in the registry of the moduls is detached from the
+        # session. Merge it into the session to get the forms of the
+        # modul.
+        modul = MODUL_REGISTRY.merge(request.db, item._modul_id)
         formconfig = get_form_config(modul, "blobform")
         return modul, formconfig
 
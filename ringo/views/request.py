@@ -7,7 +7,7 @@ from ringo.lib.security import (
     ValueChecker
 )
 from ringo.lib.helpers import import_model, get_action_routename, literal
-from ringo.lib.sql.cache import invalidate_cache
+from ringo.lib.sql.cache import invalidate_cache, invalidate_item_lists
 from ringo.views.callbacks import Callback
 from ringo.views.helpers import (
     get_item_from_request,
@@ -69,7 +69,9 @@ def is_confirmed(request):
 
 def handle_event(request, item, event):
     """Will call the event listeners for the given event on every base
-    class of the given item."""
+    class of the given item. Further the cached item lists depending on
+    the modul of the item are invalidated."""
+    invalidate_item_lists(request, item)
     for class_ in item.__class__.__bases__:
         if hasattr(class_, event + '_handler'):
             handler = getattr(class_, event + '_handler')
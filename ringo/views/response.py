@@ -50,3 +50,25 @@ class JSONResponse(object):
         rvalue['data'] = self._data
         rvalue['params'] = self._params
         return rvalue
+
+
+class ChunkedBody(object):
+    """Body of a response which is sent to the client chunk by chunk.
+    It can be used as `app_iter` of a response.
+
+    The body is iterated after the transaction of the request has been
+    committed and the session has been closed. Therefore the chunks
+    may be rendered lazily but must not access the database anymore."""
+
+    def __init__(self, chunks):
+        """Create a new ChunkedBody.
+
+        :chunks: Iterable (e.g. a generator) of (unicode) strings.
+        """
+        self._chunks = chunks
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            if isinstance(chunk, unicode):
+                chunk = chunk.encode("utf-8")
+            yield chunk